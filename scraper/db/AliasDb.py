@@ -0,0 +1,26 @@
+from .ConnectionManager import ConnectionManager, SingleConnection
+from models import Alias
+from .genericDb import GenericDatabase, PK, Index
+
+
+class AliasDatabase(GenericDatabase[Alias]):
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
+        super().__init__(
+            connections,
+            Alias,
+            PK(Alias, ["kind", "name"]),
+            "aliases",
+            [],
+            [Index(Alias, "aliasEntityIndex", "aliases", ["kind", "entityId"])],
+        )
+
+    def record(self, aliases: list[Alias]) -> None:
+        """Stores newly learned aliases, the ones already there, corrected or not, stay as they are"""
+        self.insertOrIgnoreMany(aliases)
+
+    def correct(self, kind: str, name: str, entityId: str) -> Alias:
+        """Points name at entityId for good, a manual alias counts as reviewed"""
+        alias = Alias(kind, name, entityId, "manual", 1)
+        self.insertOrUpdateMany([alias])
+
+        return alias
@@ -0,0 +1,219 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterator, List, Tuple, TypeVar
+
+from . import Database
+from .ConnectionManager import ConnectionManager, SingleConnection, TurnTaken, waitsForTurn
+from .ResultDb import ResultDatabase
+from .genericDb import GenericDatabase
+
+T = TypeVar("T")
+
+# (shared executor, executor of the transaction the current task is in)
+lanes: contextvars.ContextVar[Tuple[Executor, Executor]] = contextvars.ContextVar("lanes", default=(None, None))
+
+
+async def runIn(executor: Executor, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs func on the executor, or on the one of the caller's transaction instead, in a copy
+    of the caller's context so the connection manager sees who owns the transaction
+    """
+    loop = asyncio.get_running_loop()
+    shared, lane = lanes.get()
+    if shared is executor:
+        executor = lane
+
+    return await loop.run_in_executor(
+        executor, functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    )
+
+
+def withoutWaiting(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    waitsForTurn.set(False)
+    return func(*args, **kwargs)
+
+
+async def turnFree(connections: ConnectionManager) -> None:
+    loop = asyncio.get_running_loop()
+    free = loop.create_future()
+
+    def wake() -> None:
+        if not free.done():
+            free.set_result(None)
+
+    def onFree() -> None:
+        try:
+            loop.call_soon_threadsafe(wake)
+        except RuntimeError:
+            # the loop is closed, nobody is waiting anymore
+            pass
+
+    connections.whenFree(onFree)
+    await free
+
+
+async def runInTurn(
+    executor: Executor, connections: ConnectionManager | None, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """
+    runIn for calls that may write. When another caller's transaction is open, the call
+    waits for it to end on the loop and starts over, rather than blocking a thread of the
+    executor the readers need too
+    """
+    if connections is None:
+        return await runIn(executor, func, *args, **kwargs)
+
+    while True:
+        try:
+            return await runIn(executor, withoutWaiting, func, *args, **kwargs)
+        except TurnTaken:
+            await turnFree(connections)
+
+
+class AsyncTable:
+    """
+    Awaitable mirror of a GenericDatabase or ResultDatabase: every public method is a
+    coroutine running the original on the database executor, and iter* methods become
+    async iterators that pull one batch per executor call
+    """
+    # methods that only build something and never touch sqlite stay synchronous
+    LOCAL = {"query"}
+
+    def __init__(
+        self, table: GenericDatabase | ResultDatabase, executor: Executor, connections: ConnectionManager = None
+    ) -> None:
+        self.sync = table
+        self.__executor = executor
+        # to wait for other callers' transactions on, None for a single connection
+        self.__connections = connections
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.sync, name)
+
+        if isinstance(attr, (GenericDatabase, ResultDatabase)):
+            wrapped = AsyncTable(attr, self.__executor, self.__connections)
+        elif not callable(attr) or name.startswith("_") or name in self.LOCAL:
+            return attr
+        elif name.startswith("iter"):
+            wrapped = self.__asyncIterator(attr)
+        else:
+            wrapped = self.__coroutine(attr)
+
+        # looked up once, later calls skip __getattr__
+        setattr(self, name, wrapped)
+        return wrapped
+
+    def __coroutine(self, method: Callable[..., T]) -> Callable[..., Any]:
+        executor, connections = self.__executor, self.__connections
+
+        @functools.wraps(method)
+        async def coroutine(*args: Any, **kwargs: Any) -> T:
+            return await runInTurn(executor, connections, method, *args, **kwargs)
+
+        return coroutine
+
+    def __asyncIterator(self, method: Callable[..., Iterator[T]]) -> Callable[..., AsyncIterator[T]]:
+        executor = self.__executor
+
+        @functools.wraps(method)
+        async def iterate(*args: Any, batchSize: int = 500, **kwargs: Any) -> AsyncIterator[T]:
+            # a generator that reads each batch as a job of its own, nothing is held between them
+            iterator = method(*args, batchSize=batchSize, **kwargs)
+            # a cancelled batch keeps running on its thread, closing waits for it
+            running = threading.Lock()
+
+            def pull() -> List[T]:
+                with running:
+                    return list(islice(iterator, batchSize))
+
+            def close() -> None:
+                with running:
+                    iterator.close()
+
+            try:
+                while batch := await runIn(executor, pull):
+                    for item in batch:
+                        yield item
+            finally:
+                await runIn(executor, close)
+
+        return iterate
+
+
+class AsyncDatabase(AsyncTable):
+    """
+    Awaitable mirror of Database, `await db.races.getAll()`, so handlers and scrape tasks
+    never run sqlite on the event loop. Calls run on a thread pool of their own and
+    concurrent writes end up batched by the writer thread. A transaction's calls run on a
+    thread of its own. Other callers' writes, commits and transactions wait for it to end
+    on the loop, not on a thread of the pool, so they can't starve the readers
+    """
+    def __init__(self, db: Database, workers: int = None) -> None:
+        # a lone in-memory connection can't be shared by threads at once, one worker uses it
+        self.__singleConnection = isinstance(db.connections, SingleConnection)
+        if workers is None:
+            workers = 1 if self.__singleConnection else getattr(db.connections, "maxReaders", 4) + 1
+
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="db")
+        super().__init__(db, self.executor, None if self.__singleConnection else db.connections)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Runs any synchronous function on the database executor"""
+        return await runInTurn(
+            self.executor, None if self.__singleConnection else self.sync.connections, func, *args, **kwargs
+        )
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["AsyncDatabase"]:
+        """
+        Database.transaction for the current task and the tasks it starts, begun and ended
+        on the executor
+        """
+        connections = self.sync.connections
+        if connections.owns():
+            yield self
+            return
+
+        claim = connections.claim()
+        lane = None if self.__singleConnection else ThreadPoolExecutor(1, thread_name_prefix="db-transaction")
+        resetLane = lanes.set((self.executor, lane)) if lane else None
+        try:
+            await self.__begin()
+            try:
+                yield self
+            except BaseException:
+                await self.run(connections.end, False)
+                raise
+
+            await self.run(connections.end, True)
+        finally:
+            if resetLane:
+                lanes.reset(resetLane)
+                lane.shutdown(wait=False)
+            connections.release(claim)
+
+    async def __begin(self) -> None:
+        connections = self.sync.connections
+        begin = asyncio.ensure_future(self.run(connections.begin))
+        try:
+            # begin() runs on a thread, cancelling the wait for it doesn't stop it
+            await asyncio.shield(begin)
+        except asyncio.CancelledError:
+            # so the transaction it opens is ended as soon as it's open, as its owner
+            context = contextvars.copy_context()
+
+            def endBegun(begun: asyncio.Future) -> None:
+                if not begun.cancelled() and begun.exception() is None:
+                    self.executor.submit(context.run, connections.end, False)
+
+            begin.add_done_callback(endBegun)
+            raise
+
+    async def close(self) -> None:
+        await self.run(self.sync.close)
+        self.executor.shutdown(wait=False)
@@ -1,13 +1,13 @@
 
-import sqlite3
+from .ConnectionManager import ConnectionManager, SingleConnection
 from models import Circuit
 from .genericDb import GenericDatabase, PK
 
 
 class CircuitDatabase(GenericDatabase[Circuit]):
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
         super().__init__(
-            cursor,
+            connections,
             Circuit,
             PK(Circuit, ["id_"]),
             "circuits",
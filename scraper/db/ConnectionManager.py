@@ -0,0 +1,368 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, TypeVar
+
+from .SqliteProfile import SqliteProfile
+
+T = TypeVar("T")
+Job = Callable[[sqlite3.Connection], T]
+
+# per connection manager, the transaction the current thread or task claimed; tasks started
+# inside it inherit the claim and the async facade runs its calls in a copy of the context
+unitsOfWork: ContextVar[Dict[object, object]] = ContextVar("unitsOfWork", default={})
+
+# whether a call that finds another caller's transaction open waits for it on its thread,
+# or raises TurnTaken so it can wait without holding the thread, see ConnectionManager.whenFree
+waitsForTurn: ContextVar[bool] = ContextVar("waitsForTurn", default=True)
+
+
+class TurnTaken(sqlite3.OperationalError):
+    """Another caller's transaction is open, raised instead of waiting for it to end"""
+
+
+def beginTransaction(conn: sqlite3.Connection) -> None:
+    # uncommitted writes made outside any transaction are not this transaction's to roll back
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN")
+
+
+def endTransaction(conn: sqlite3.Connection, commit: bool) -> None:
+    if not commit:
+        conn.rollback()
+        return
+
+    try:
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+class SingleConnection:
+    """
+    Reads and writes run inline on one connection, for in-memory databases (every
+    connection to :memory: is a database of its own) and for tables built on a bare cursor.
+    There is no other thread to wait on, so writing while another caller's transaction is
+    open is an error
+    """
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.__owner: object = None
+
+    def claim(self) -> Token:
+        return unitsOfWork.set({**unitsOfWork.get(), self: object()})
+
+    def release(self, claim: Token) -> None:
+        unitsOfWork.reset(claim)
+
+    def owns(self) -> bool:
+        return self.__owner is not None and unitsOfWork.get().get(self) is self.__owner
+
+    def __checkTurn(self) -> None:
+        # the connection only has the one thread, waiting for another caller's transaction
+        # to end would wait forever
+        if self.__owner is not None and not self.owns():
+            raise sqlite3.OperationalError("Another caller's transaction is open on this connection")
+
+    def begin(self) -> None:
+        self.__checkTurn()
+        self.__owner = unitsOfWork.get()[self]
+        beginTransaction(self.conn)
+
+    def end(self, commit: bool) -> None:
+        try:
+            endTransaction(self.conn, commit)
+        finally:
+            self.__owner = None
+
+    def read(self, job: Job[T]) -> T:
+        return job(self.conn)
+
+    def write(self, job: Job[T], control: bool = False) -> T:
+        self.__checkTurn()
+        return job(self.conn)
+
+    def commit(self) -> None:
+        self.__checkTurn()
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class ConnectionManager:
+    """
+    A dedicated writer thread owns the only read-write connection and runs the queued
+    write jobs in order, in batches, with the commits requested by a batch done as one.
+    Reads run on a pool of read-only connections and see what was last committed.
+
+    A transaction belongs to the thread or task that claimed it before begin(). Until
+    end(), the writes and commits of every other caller wait for it, so they can neither
+    be rolled back with it nor commit half of it. Its owner's reads run on the writer, to
+    see the transaction's own writes
+    """
+    __STOP = object()
+
+    def __init__(
+        self, path: str | Path, profile: SqliteProfile, readers: int = 4, maxBatch: int = 256
+    ) -> None:
+        self.path = Path(path)
+        self.profile = profile
+        self.maxBatch = maxBatch
+
+        self.__jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self.__lock = threading.Lock()
+        # the claim of the open transaction, other callers wait for their turn on it
+        self.__owner: object = None
+        self.__turn = threading.Condition(self.__lock)
+        self.__whenFree: List[Callable[[], None]] = []
+        self.__closed = False
+
+        self.__readers: queue.LifoQueue = queue.LifoQueue()
+        self.__readerConnections: List[sqlite3.Connection] = []
+        self.maxReaders = readers
+
+        self.__startupError: BaseException = None
+        self.__conn: sqlite3.Connection = None
+        ready = threading.Event()
+        self.__writer = threading.Thread(target=self.__run, args=(ready,), name="db-writer", daemon=True)
+        self.__writer.start()
+        ready.wait()
+
+        if self.__startupError:
+            raise self.__startupError
+
+    def __connectWriter(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA foreign_keys = 1")
+        self.profile.apply(conn)
+
+        return conn
+
+    def __run(self, ready: threading.Event) -> None:
+        try:
+            conn = self.__conn = self.__connectWriter()
+        except BaseException as error:
+            self.__startupError = error
+            ready.set()
+            return
+
+        ready.set()
+
+        running = True
+        while running:
+            batch = [self.__jobs.get()]
+            while len(batch) < self.maxBatch:
+                try:
+                    batch.append(self.__jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            commits: List[Future] = []
+            for job in batch:
+                if job is self.__STOP:
+                    running = False
+                    continue
+
+                fn, future, kind = job
+                if kind == "commit":
+                    commits.append(future)
+                    continue
+
+                # transaction control must not have an earlier commit request moved past it
+                if kind == "control" and commits:
+                    self.__commit(conn, commits)
+                    commits = []
+
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(self.__settle(fn(conn)))
+                    except BaseException as error:
+                        future.set_exception(error)
+
+            if commits:
+                self.__commit(conn, commits)
+
+        conn.close()
+
+    @staticmethod
+    def __settle(result: T) -> T:
+        # a cursor released on the caller's thread resets its statement there, while the
+        # writer may be running the same cached statement for another job
+        if isinstance(result, sqlite3.Cursor):
+            result.close()
+            return None
+
+        return result
+
+    @staticmethod
+    def __commit(conn: sqlite3.Connection, futures: List[Future]) -> None:
+        try:
+            conn.commit()
+        except BaseException as error:
+            for future in futures:
+                future.set_exception(error)
+            return
+
+        for future in futures:
+            future.set_result(None)
+
+    def claim(self) -> Token:
+        """
+        Makes the current thread or task, and the tasks it starts from now on, the owner of
+        the transaction it begins next. release() with the token returned when it's over
+        """
+        return unitsOfWork.set({**unitsOfWork.get(), self: object()})
+
+    def release(self, claim: Token) -> None:
+        unitsOfWork.reset(claim)
+
+    def owns(self) -> bool:
+        """Whether the caller is inside the transaction that is open"""
+        return self.__owner is not None and unitsOfWork.get().get(self) is self.__owner
+
+    def __awaitTurn(self) -> None:
+        # with the lock held
+        claim = unitsOfWork.get().get(self)
+        while self.__owner is not None and self.__owner is not claim and not self.__closed:
+            if not waitsForTurn.get():
+                raise TurnTaken("Another caller's transaction is open")
+            self.__turn.wait()
+
+    def whenFree(self, callback: Callable[[], None]) -> None:
+        """Calls callback, from any thread, once no transaction is open, right away if none is"""
+        with self.__lock:
+            if self.__owner is not None and not self.__closed:
+                self.__whenFree.append(callback)
+                return
+
+        callback()
+
+    def begin(self) -> None:
+        """Opens a transaction owned by the caller's claim, once no other one is open"""
+        claim = unitsOfWork.get().get(self)
+        if claim is None:
+            raise sqlite3.ProgrammingError("A transaction must be claimed before it begins")
+
+        with self.__lock:
+            self.__awaitTurn()
+            self.__owner = claim
+
+        try:
+            self.write(beginTransaction, control=True)
+        except BaseException:
+            self.__release()
+            raise
+
+    def end(self, commit: bool) -> None:
+        """Commits or rolls back the caller's transaction and lets the callers waiting on it go"""
+        try:
+            self.write(lambda conn: endTransaction(conn, commit), control=True)
+        finally:
+            self.__release()
+
+    def __release(self) -> None:
+        with self.__lock:
+            self.__owner = None
+            self.__turn.notify_all()
+            callbacks, self.__whenFree = self.__whenFree, []
+
+        for callback in callbacks:
+            callback()
+
+    def __submit(self, fn: Job[T], kind: str) -> Future:
+        future = Future()
+        with self.__lock:
+            self.__awaitTurn()
+            if self.__closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
+            self.__jobs.put((fn, future, kind))
+
+        # the call can't be retried from the start once it has submitted something, the rest
+        # of it waits for its turn on the thread
+        waitsForTurn.set(True)
+        return future
+
+    def __inWriter(self) -> bool:
+        return threading.current_thread() is self.__writer
+
+    def write(self, job: Job[T], control: bool = False) -> T:
+        """
+        Runs job on the writer connection and waits for it. Control jobs (BEGIN, SAVEPOINT,
+        COMMIT...) are never batched with a commit request queued before them. Jobs
+        submitted from inside a job run right away, as part of it. A cursor returned by a
+        job is closed on the writer and None handed back
+        """
+        if self.__inWriter():
+            return job(self.__conn)
+
+        return self.__submit(job, "control" if control else "write").result()
+
+    def commit(self) -> None:
+        """Commits once the writes queued so far have run, together with concurrent commits"""
+        if self.__inWriter():
+            self.__conn.commit()
+            return
+
+        self.__submit(None, "commit").result()
+
+    def __readsOnWriter(self) -> bool:
+        # a job on the writer and the owner of the open transaction read their own writes,
+        # everyone else gets what was last committed, without waiting on the writer
+        return self.__inWriter() or self.owns()
+
+    @contextmanager
+    def __reader(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self.__readers.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self.__lock:
+                if len(self.__readerConnections) < self.maxReaders:
+                    conn = self.__connectReader()
+                    self.__readerConnections.append(conn)
+            if conn is None:
+                conn = self.__readers.get()
+
+        try:
+            yield conn
+        finally:
+            self.__readers.put(conn)
+
+    def __connectReader(self) -> sqlite3.Connection:
+        # handed from thread to thread, but only ever used by one at a time
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        self.profile.apply(conn, readOnly=True)
+
+        return conn
+
+    def read(self, job: Job[T]) -> T:
+        if self.__readsOnWriter():
+            return self.write(job)
+
+        with self.__reader() as conn:
+            return job(conn)
+
+    def close(self) -> None:
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__jobs.put(self.__STOP)
+            self.__turn.notify_all()
+            callbacks, self.__whenFree = self.__whenFree, []
+
+        for callback in callbacks:
+            callback()
+
+        self.__writer.join()
+
+        for conn in self.__readerConnections:
+            conn.close()
@@ -1,11 +1,11 @@
-import sqlite3
+from .ConnectionManager import ConnectionManager, SingleConnection
 from models import Constructor
 from .genericDb import GenericDatabase, PK, FK
 
 class ConstructorDatabase(GenericDatabase[Constructor]):
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
         super().__init__(
-            cursor,
+            connections,
             Constructor,
             PK(Constructor, ["id_"]),
             "constructors",
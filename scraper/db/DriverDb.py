@@ -1,11 +1,11 @@
-import sqlite3
+from .ConnectionManager import ConnectionManager, SingleConnection
 from models import Driver, Constructor
 from .genericDb import GenericDatabase, PK, FK, FKActions
 
 class DriverDatabase(GenericDatabase[Driver]):
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
         super().__init__(
-            cursor,
+            connections,
             Driver,
             PK(Driver, ["id_"]),
             "drivers",
@@ -1,13 +1,13 @@
-from sqlite3 import Cursor
+from .ConnectionManager import ConnectionManager, SingleConnection
 from .genericDb.ForeignKey import FK, FKActions
 from .genericDb.PrimaryKey import PK
 from .genericDb import GenericDatabase, Index
 from models import DriverStandings, Driver
 
 class DriverStandingsDatabase(GenericDatabase[DriverStandings]):
-    def __init__(self, cursor: Cursor) -> None:
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
         super().__init__(
-            cursor,
+            connections,
             DriverStandings,
             PK(DriverStandings, ["year", "position"]),
             "driverStandings",
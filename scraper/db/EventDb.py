@@ -1,11 +1,11 @@
-import sqlite3
+from .ConnectionManager import ConnectionManager, SingleConnection
 from models import Race, RaceEvent
 from .genericDb import GenericDatabase, PK, FK, Index, FKActions
 
 class EventDatabase(GenericDatabase[RaceEvent]):
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
         super().__init__(
-            cursor,
+            connections,
             RaceEvent,
             PK(RaceEvent, ["id_"]),
             "events",
@@ -1,11 +1,11 @@
-import sqlite3
+from .ConnectionManager import ConnectionManager, SingleConnection
 from models import Race, Circuit
 from .genericDb import GenericDatabase, PK, FK, FKActions, Index
 
 class RaceDatabase(GenericDatabase[Race]):
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
         super().__init__(
-            cursor,
+            connections,
             Race,
             PK(Race, ["id_"]),
             "races",
@@ -1,20 +1,27 @@
 
-import sqlite3
-from typing import List
+from .ConnectionManager import ConnectionManager, SingleConnection
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Tuple, Type
 from models import Constructor, RaceEvent, Result, EventType, QualifyingResult, RaceResult, PracticeResult, Driver
-from .genericDb import GenericDatabase, PK, FK, Index, FKActions
+from .genericDb import GenericDatabase, PK, FK, Index, FKActions, Query
 
 class ResultDatabase():
+    # every result table under one view, a row's result type follows from its eventId
+    VIEW_NAME = "results"
+    # index names are global in SQLite, these used to exist on raceResults alone
+    LEGACY_INDEXES = ["eventIndex", "driverIndex", "constructorIndex"]
+    
     def __getIndices(self, tableName: str) -> List[Index]:
+        # history lookups get the eventId range from the composite indexes too
         return [
-            Index(Result, "eventIndex", tableName, ["eventId"]),
-            Index(Result, "driverIndex", tableName, ["driverId"]),
-            Index(Result, "constructorIndex", tableName, ["constructorId"])
+            Index(Result, f"{tableName}EventIndex", tableName, ["eventId"]),
+            Index(Result, f"{tableName}DriverEventIndex", tableName, ["driverId", "eventId"]),
+            Index(Result, f"{tableName}ConstructorEventIndex", tableName, ["constructorId", "eventId"]),
         ]
         
-    def __init__(self, cursor: sqlite3.Cursor) -> None:
+    def __init__(self, connections: ConnectionManager | SingleConnection) -> None:
         pk = PK(Result, ["eventId", "driverId"])
         self.pk = pk
+        self.__connections = connections
         
         self.fks = [
             FK(Result, "eventId", RaceEvent, "events", "id_", onDelete=FKActions.CASCADE),
@@ -23,7 +30,7 @@ class ResultDatabase():
         ]
         
         self.race = GenericDatabase[RaceResult](
-            cursor,
+            connections,
             RaceResult,
             pk,
             "raceResults",
@@ -32,7 +39,7 @@ class ResultDatabase():
         )
         
         self.quali = GenericDatabase[QualifyingResult](
-            cursor,
+            connections,
             QualifyingResult,
             pk,
             "qualifyingResults",
@@ -41,7 +48,7 @@ class ResultDatabase():
         )
         
         self.practice = GenericDatabase[PracticeResult](
-            cursor,
+            connections,
             PracticeResult,
             pk,
             "practiceResults",
@@ -49,20 +56,56 @@ class ResultDatabase():
             self.__getIndices("practiceResults")
         )
         
+        # the view has the shared Result columns first, then every type's own columns,
+        # NULL where a table doesn't have them
+        self.viewFields = list(Result.__dataclass_fields__.keys())
+        for table in (self.race, self.quali, self.practice):
+            self.viewFields.extend(field for field in table.fields if field not in self.viewFields)
+        
+        self.createViewStatement = f"CREATE VIEW IF NOT EXISTS {self.VIEW_NAME} AS " + " UNION ALL ".join(
+            f"SELECT {', '.join(field if field in table.fields else f'NULL AS {field}' for field in self.viewFields)} "
+            f"FROM {table.tableName}"
+            for table in (self.race, self.quali, self.practice)
+        )
+        self.dropViewStatement = f"DROP VIEW IF EXISTS {self.VIEW_NAME}"
+        self.__fieldIndexes: Dict[Type[Result], List[int]] = {
+            type_: [self.viewFields.index(field) for field in type_.__dataclass_fields__]
+            for type_ in (RaceResult, QualifyingResult, PracticeResult)
+        }
+        self.__viewTypes = {
+            field.name: field.type
+            for type_ in (RaceResult, QualifyingResult, PracticeResult)
+            for field in type_.__dataclass_fields__.values()
+        }
+        self.__eventTypes: Dict[str, Type[Result]] = {}
+        
         
     def createTables(self) -> None:
         self.race.createTable()
         self.quali.createTable()
         self.practice.createTable()
+        self.createView()
     
     
     def dropTables(self) -> None:
+        self.dropView()
         self.race.dropTable()
         self.quali.dropTable()
         self.practice.dropTable()
         
     
+    def createView(self) -> None:
+        self.__connections.write(lambda conn: conn.execute(self.createViewStatement))
+        
+    
+    def dropView(self) -> None:
+        self.__connections.write(lambda conn: conn.execute(self.dropViewStatement))
+        
+    
     def createIndexes(self) -> None:
+        for index in self.LEGACY_INDEXES:
+            self.__connections.write(lambda conn: conn.execute(f"DROP INDEX IF EXISTS {index}"))
+        
         self.race.createIndexes()
         self.quali.createIndexes()
         self.practice.createIndexes()
@@ -78,10 +121,112 @@ class ResultDatabase():
         self.initialize()
         
     
+    def tableFor(self, eventId: str) -> GenericDatabase:
+        eventTitle = RaceEvent.getEventTitle(eventId)
+        type_ = EventType.getType(eventTitle)
+        
+        if type_ == EventType.PRACTICE:
+            return self.practice
+        
+        if type_ == EventType.QUALIFYING or type_ == EventType.SPRINT_QUALIFYING:
+            return self.quali
+        
+        return self.race
+        
+    
     def getAll(self) -> List[Result]:
         return self.race.getAll() + self.quali.getAll() + self.practice.getAll()
     
     
+    def iterAll(self, batchSize: int = 500, raw: bool = False) -> Iterator[Result | Tuple]:
+        """
+        Streams the race, qualifying and practice results one table after the other,
+        raw rows differ in shape between the tables
+        """
+        yield from self.race.iterAll(batchSize, raw)
+        yield from self.quali.iterAll(batchSize, raw)
+        yield from self.practice.iterAll(batchSize, raw)
+    
+    
+    def iterByKeys(self, batchSize: int = 500, raw: bool = False, **kwargs) -> Iterator[Result | Tuple]:
+        if "eventId" in kwargs:
+            yield from self.tableFor(kwargs["eventId"]).iterByKeys(batchSize, raw, **kwargs)
+            return
+        
+        yield from self.race.iterByKeys(batchSize, raw, **kwargs)
+        yield from self.quali.iterByKeys(batchSize, raw, **kwargs)
+        yield from self.practice.iterByKeys(batchSize, raw, **kwargs)
+    
+    
+    def __hydrate(self, row: Tuple) -> Result:
+        """A row of the view as the result type of its event, eventId is the first column"""
+        eventId = row[0]
+        type_ = self.__eventTypes.get(eventId)
+        if type_ is None:
+            type_ = self.__eventTypes[eventId] = Result.typeFor(eventId)
+        
+        fields = type_.__dataclass_fields__
+        return type_(**dict(zip(fields, (row[idx] for idx in self.__fieldIndexes[type_]))))
+    
+    
+    def __getHistory(self, column: str, value: str, year: int = None) -> List[Result]:
+        """
+        Results of every type with column = value, of one season if year is given, in one
+        query on the view. SQLite pushes the WHERE into each table of the UNION ALL where
+        the (column, eventId) index serves it, eventIds start with the year
+        """
+        statement = f"SELECT * FROM {self.VIEW_NAME} WHERE {column} = ?"
+        parameters: Tuple = (value,)
+        
+        if year is not None:
+            # "2023_" <= eventId < "2023`", backtick being the character after underscore
+            statement += " AND eventId >= ? AND eventId < ?"
+            parameters += (f"{year}_", f"{year}`")
+        
+        rows = self.__connections.read(lambda conn: conn.execute(statement, parameters).fetchall())
+        
+        return list(map(self.__hydrate, rows))
+    
+    
+    def query(self) -> Query:
+        """A query on the results view, see Query"""
+        return Query(self.VIEW_NAME, tuple(self.viewFields), tuple(self.pk.columns), self.__viewTypes)
+    
+    
+    def __queryRowMapper(self, query: Query, raw: bool) -> Callable[[Tuple], Result | Tuple]:
+        if raw or query.projection:
+            return query.strip
+        
+        return lambda row: self.__hydrate(query.strip(row))
+    
+    
+    def iterQuery(self, query: Query, batchSize: int = 500, raw: bool = False) -> Iterator[Result | Tuple]:
+        """GenericDatabase.iterQuery over the results view, raw rows have every view column"""
+        page, nextKey = self.getPage(query, batchSize, raw)
+        yield from page
+        
+        while nextKey is not None:
+            page, nextKey = self.getPage(query.after(nextKey), batchSize, raw)
+            yield from page
+    
+    
+    def getPage(self, query: Query, size: int, raw: bool = False) -> Tuple[List[Result | Tuple], Tuple]:
+        """GenericDatabase.getPage over the results view"""
+        statement, parameters = query.limit(size + 1).build()
+        rows = self.__connections.read(lambda conn: conn.execute(statement, parameters).fetchall())
+        nextKey = query.keyOf(rows[size - 1]) if len(rows) > size else None
+        
+        return list(map(self.__queryRowMapper(query, raw), rows[:size])), nextKey
+    
+    
+    def getByDriverId(self, driverId: str, year: int = None) -> List[Result]:
+        return self.__getHistory("driverId", driverId, year)
+    
+    
+    def getByConstructorId(self, constructorId: str, year: int = None) -> List[Result]:
+        return self.__getHistory("constructorId", constructorId, year)
+    
+    
     def getByEventId(self, eventId: str) -> List[Result]:
         eventTitle = RaceEvent.getEventTitle(eventId)
         type_ = EventType.getType(eventTitle)
@@ -145,30 +290,83 @@ class ResultDatabase():
             
             return self.race.exists(**kwargs)
         
-        return (
-            self.practice.exists(**kwargs) or
-            self.quali.exists(**kwargs) or 
-            self.race.exists(**kwargs)
+        # one query over the view rather than one per table
+        statement = (
+            f"SELECT EXISTS (SELECT 1 FROM {self.VIEW_NAME} "
+            f"WHERE {' AND '.join(f'{key} = ?' for key in kwargs)})"
         )
+        parameters = tuple(kwargs.values())
+        
+        return bool(self.__connections.read(lambda conn: conn.execute(statement, parameters).fetchone()[0]))
+        
+    
+    def existsMany(self, keys: Iterable[Hashable], columns: Sequence[str] = None) -> List[bool]:
+        """
+        Batched exists over the result tables, see GenericDatabase.existsMany. Keys that
+        include the eventId are only looked up in their event's table
+        """
+        columns = columns if columns else self.pk.columns
+        keys = list(keys)
+        
+        if "eventId" not in columns:
+            return [
+                any(found)
+                for found in zip(
+                    self.race.existsMany(keys, columns),
+                    self.quali.existsMany(keys, columns),
+                    self.practice.existsMany(keys, columns),
+                )
+            ]
+        
+        eventIdx = columns.index("eventId")
+        groups: dict[int, tuple[GenericDatabase, List[int]]] = {}
+        for idx, key in enumerate(keys):
+            table = self.tableFor(key[eventIdx] if len(columns) > 1 else key)
+            groups.setdefault(id(table), (table, []))[1].append(idx)
         
+        exists = [False] * len(keys)
+        for table, indices in groups.values():
+            for idx, found in zip(indices, table.existsMany([keys[idx] for idx in indices], columns)):
+                exists[idx] = found
+                
+        return exists
+    
+    
+    def missingKeys(self, keys: Iterable[Hashable], columns: Sequence[str] = None) -> List[Hashable]:
+        keys = list(dict.fromkeys(keys))
+        
+        return [key for key, exists in zip(keys, self.existsMany(keys, columns)) if not exists]
+    
     
     def insertOrUpdate(self, result: Result) -> int:
         """
         Inserts and returns 0 if a result with the same primary keys does not exist, 
         otherwise updates and returns 1
         """
-        pk = self.pk.columns
-        pkValues = tuple(getattr(result, pk) for pk in pk)
-        searchKeys = dict(zip(pk, pkValues))
-        
-        if self.exists(**searchKeys):
-            self.update(result)
-            return 1
-        else:
-            self.insert(result)
-            return 0
+        return self.tableFor(result.eventId).insertOrUpdate(result)
         
     
     def insertOrUpdateMany(self, results: List[Result]) -> None:
+        races: List[RaceResult] = []
+        qualis: List[QualifyingResult] = []
+        practices: List[PracticeResult] = []
+        
         for result in results:
-            self.insertOrUpdate(result)
\ No newline at end of file
+            if result.type_ == EventType.PRACTICE:
+                practices.append(result)
+            elif result.type_ == EventType.QUALIFYING or result.type_ == EventType.SPRINT_QUALIFYING:
+                qualis.append(result)
+            else:
+                races.append(result)
+        
+        self.race.insertOrUpdateMany(races)
+        self.quali.insertOrUpdateMany(qualis)
+        self.practice.insertOrUpdateMany(practices)
+            
+    
+    def insertOrUpdateRows(self, eventId: str, rows: List[Tuple]) -> None:
+        """
+        Upserts the results of one event given as value tuples in the field order of
+        the event's result type (see Result.rowsFromTable)
+        """
+        self.tableFor(eventId).insertOrUpdateRows(rows)
\ No newline at end of file
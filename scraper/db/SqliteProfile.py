@@ -0,0 +1,78 @@
+import os
+import sqlite3
+from dataclasses import dataclass, replace
+from typing import List
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """
+    Named set of PRAGMAs applied to every connection right after it is opened,
+    None leaves SQLite's own default for that setting
+    """
+    name: str
+    journalMode: str = None
+    synchronous: str = None
+    mmapSize: int = None
+    cacheSize: int = None
+    tempStore: str = None
+    busyTimeout: int = None
+
+    def pragmas(self, readOnly: bool = False) -> List[str]:
+        """The journal mode is a property of the file, read-only connections can't set it"""
+        settings = {
+            "journal_mode": None if readOnly else self.journalMode,
+            "synchronous": self.synchronous,
+            "mmap_size": self.mmapSize,
+            "cache_size": self.cacheSize,
+            "temp_store": self.tempStore,
+            "busy_timeout": self.busyTimeout,
+        }
+
+        return [f"PRAGMA {pragma} = {value}" for pragma, value in settings.items() if value is not None]
+
+    def apply(self, conn: sqlite3.Connection, readOnly: bool = False) -> None:
+        for pragma in self.pragmas(readOnly):
+            conn.execute(pragma)
+
+    @staticmethod
+    def get(name: str) -> "SqliteProfile":
+        if name not in PROFILES:
+            raise ValueError(f"Unknown SQLite profile {name}, expected one of {', '.join(PROFILES)}")
+
+        return PROFILES[name]
+
+    @staticmethod
+    def fromEnv() -> "SqliteProfile":
+        """
+        The profile named by DB_PROFILE (performance by default), with DB_MMAP_SIZE,
+        DB_CACHE_SIZE and DB_BUSY_TIMEOUT overriding its values when set
+        """
+        profile = SqliteProfile.get(os.getenv("DB_PROFILE", "performance"))
+        overrides = {
+            field: int(os.getenv(env))
+            for field, env in (
+                ("mmapSize", "DB_MMAP_SIZE"),
+                ("cacheSize", "DB_CACHE_SIZE"),
+                ("busyTimeout", "DB_BUSY_TIMEOUT"),
+            )
+            if os.getenv(env)
+        }
+
+        return replace(profile, **overrides)
+
+
+PROFILES = {
+    # SQLite as it comes: rollback journal, full fsync on every commit
+    "default": SqliteProfile("default"),
+    # WAL lets the API read while the scraper writes and NORMAL only fsyncs on checkpoints
+    "performance": SqliteProfile(
+        "performance",
+        journalMode="WAL",
+        synchronous="NORMAL",
+        mmapSize=256 * 1024 * 1024,
+        cacheSize=-64 * 1024,  # negative is KiB, so 64 MiB
+        tempStore="MEMORY",
+        busyTimeout=5000,
+    ),
+}
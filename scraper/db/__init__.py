@@ -3,6 +3,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 import sqlite3
+from contextlib import contextmanager
 from .RaceDb import RaceDatabase
 from .EventDb import EventDatabase
 from .CircuitDb import CircuitDatabase
@@ -11,9 +12,14 @@ from .DriverDb import DriverDatabase
 from .ResultDb import ResultDatabase
 from .DriverStandingsDb import DriverStandingsDatabase
 from .ConstructorStandingsDb import ConstructorStandingsDatabase
+from .AliasDb import AliasDatabase
+from .SqliteProfile import SqliteProfile, PROFILES
+from .ConnectionManager import ConnectionManager, SingleConnection
 from utils import Utils
 
-from typing import List, Any, Dict
+from typing import List, Any, Callable, Dict, Iterator, TypeVar
+
+T = TypeVar("T")
 
 class Database:
     def __getDatabaseDependencyGraph(self) -> Dict[str, List[str]]:
@@ -31,21 +37,37 @@ class Database:
         return dependencyGraph               
     
     
-    def __init__(self, path: str = Path(__file__).parent / "db.sqlite3"):
+    def __init__(
+        self,
+        path: str = Path(__file__).parent / "db.sqlite3",
+        profile: str | SqliteProfile = "performance",
+        readers: int = 4,
+    ):
         if not path:
             path = Path(__file__).parent / "db.sqlite3"
-        self.__conn = sqlite3.connect(path)
-        self.__conn.execute("PRAGMA foreign_keys = 1")
-        self.__cursor = self.__conn.cursor()
-        
-        self.races = RaceDatabase(self.__cursor)
-        self.events = EventDatabase(self.__cursor)
-        self.circuits = CircuitDatabase(self.__cursor)
-        self.constructors = ConstructorDatabase(self.__cursor)
-        self.drivers = DriverDatabase(self.__cursor)
-        self.results = ResultDatabase(self.__cursor)
-        self.driverStandings = DriverStandingsDatabase(self.__cursor)
-        self.constructorStandings = ConstructorStandingsDatabase(self.__cursor)
+        self.profile = profile if isinstance(profile, SqliteProfile) else SqliteProfile.get(profile)
+        
+        # a writer thread plus a pool of readers, an in-memory database only exists
+        # inside its one connection, which AsyncDatabase uses from its one worker thread
+        if str(path) == ":memory:":
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = 1")
+            self.profile.apply(conn)
+            self.connections = SingleConnection(conn)
+        else:
+            self.connections = ConnectionManager(path, self.profile, readers)
+        
+        self.__savepoints = 0
+        
+        self.races = RaceDatabase(self.connections)
+        self.events = EventDatabase(self.connections)
+        self.circuits = CircuitDatabase(self.connections)
+        self.constructors = ConstructorDatabase(self.connections)
+        self.drivers = DriverDatabase(self.connections)
+        self.results = ResultDatabase(self.connections)
+        self.driverStandings = DriverStandingsDatabase(self.connections)
+        self.constructorStandings = ConstructorStandingsDatabase(self.connections)
+        self.aliases = AliasDatabase(self.connections)
 
         dependencyGraph = self.__getDatabaseDependencyGraph()
         
@@ -54,9 +76,7 @@ class Database:
     
     
     def rawDogg(self, statement: str) -> List[Any]:
-        self.__cursor.execute(statement)
-        
-        return self.__cursor.fetchall()
+        return self.connections.write(lambda conn: conn.execute(statement).fetchall())
     
     
     def createTables(self) -> None:
@@ -80,12 +100,78 @@ class Database:
             
     
     def commit(self) -> None:
-        self.__conn.commit()
+        """
+        Commits, unless the caller is inside its own transaction(), which commits when it
+        ends. Outside of it, the commit waits for another caller's transaction to end
+        """
+        if self.connections.owns():
+            return
+        
+        self.connections.commit()
+        
+    
+    @contextmanager
+    def transaction(self) -> Iterator["Database"]:
+        """
+        Unit of work: every write inside the block, including the ones of code that calls
+        commit() itself, goes into one transaction that is committed once at the end, or
+        rolled back if the block raises. The transaction is the calling thread's or task's,
+        nested blocks join it and other callers' writes wait until it ends
+        """
+        if self.connections.owns():
+            yield self
+            return
+        
+        claim = self.connections.claim()
+        try:
+            self.connections.begin()
+            try:
+                yield self
+            except BaseException:
+                self.connections.end(commit=False)
+                raise
+            
+            self.connections.end(commit=True)
+        finally:
+            self.connections.release(claim)
+            
+    
+    @contextmanager
+    def savepoint(self) -> Iterator[None]:
+        """
+        Writes inside the block are rolled back on their own if it raises, leaving the rest
+        of the transaction alone. The block must not await, another task's writes would
+        end up inside the savepoint
+        """
+        self.__savepoints += 1
+        name = f"sp{self.__savepoints}"
+        
+        self.connections.write(lambda conn: conn.execute(f"SAVEPOINT {name}"), control=True)
+        try:
+            yield
+        except BaseException:
+            self.connections.write(
+                lambda conn: conn.execute(f"ROLLBACK TO {name}").execute(f"RELEASE {name}"),
+                control=True,
+            )
+            raise
+        
+        self.connections.write(lambda conn: conn.execute(f"RELEASE {name}"), control=True)
+        
+        
+    def atomic(self, job: Callable[["Database"], T]) -> T:
+        """
+        Runs job(self) as a single job on the writer, so no other thread's writes can land
+        in the middle of it, e.g. inside a savepoint it opens
+        """
+        return self.connections.write(lambda conn: job(self), control=True)
         
         
     def close(self) -> None:
-        self.__conn.close()
+        self.connections.close()
         
     def printAttrs(self) -> None:
         for attr in dir(self):
-            print(attr)
\ No newline at end of file
+            print(attr)
+
+from .AsyncDatabase import AsyncDatabase, AsyncTable
@@ -0,0 +1,141 @@
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    SELECT on one table or view, built up by chaining: every method returns a new Query.
+    Columns are checked against the source's fields and values are always bound, so
+    client supplied filters can go straight in. The sort key is the ORDER BY columns
+    followed by the primary key, which makes it unique so pages can be cut at a key
+    """
+    OPERATORS = ("=", "!=", "<", "<=", ">", ">=")
+
+    source: str
+    fields: Tuple[str, ...]
+    primaryKey: Tuple[str, ...]
+    types: Dict[str, type]
+    conditions: Tuple[Tuple[str, Tuple], ...] = ()
+    ordering: Tuple[Tuple[str, bool], ...] = ()
+    projection: Tuple[str, ...] = ()
+    afterKey: Tuple = None
+    limitCount: int = None
+
+    def __column(self, column: str) -> str:
+        if column not in self.fields:
+            raise ValueError(f"Unknown column {column} for {self.source}, expected one of {', '.join(self.fields)}")
+
+        return column
+
+    def coerce(self, column: str, value: Any) -> Any:
+        """Converts a value given as text, e.g. a query parameter, to the column's type"""
+        type_ = self.types.get(self.__column(column))
+        if isinstance(value, str) and type_ in (int, float):
+            try:
+                return type_(value)
+            except ValueError:
+                raise ValueError(f"Invalid value {value} for {column}, expected {type_.__name__}")
+
+        return value
+
+    def where(self, column: str, operator: str, value: Any) -> "Query":
+        if operator not in self.OPERATORS:
+            raise ValueError(f"Unknown operator {operator}, expected one of {', '.join(self.OPERATORS)}")
+
+        condition = (f"{self.__column(column)} {operator} ?", (value,))
+        return replace(self, conditions=self.conditions + (condition,))
+
+    def whereIn(self, column: str, values: Iterable[Any]) -> "Query":
+        values = tuple(values)
+        # IN () is a syntax error in SQLite, an empty list matches nothing
+        clause = f"{self.__column(column)} IN ({', '.join('?' for _ in values)})" if values else "0"
+
+        return replace(self, conditions=self.conditions + ((clause, values),))
+
+    def orderBy(self, column: str, descending: bool = False) -> "Query":
+        return replace(self, ordering=self.ordering + ((self.__column(column), descending),))
+
+    def select(self, *columns: str) -> "Query":
+        return replace(self, projection=tuple(map(self.__column, columns)))
+
+    def after(self, key: Sequence[Any]) -> "Query":
+        """Starts after the row with this sort key, the nextKey of the previous page"""
+        if len(key) != len(self.sortKey):
+            raise ValueError(f"Expected a key of {len(self.sortKey)} values, got {len(key)}")
+
+        return replace(self, afterKey=tuple(key))
+
+    def limit(self, count: int) -> "Query":
+        if count < 1:
+            raise ValueError(f"Limit must be positive, got {count}")
+
+        return replace(self, limitCount=count)
+
+    @property
+    def sortKey(self) -> List[Tuple[str, bool]]:
+        ordered = [column for column, _ in self.ordering]
+
+        return list(self.ordering) + [(column, False) for column in self.primaryKey if column not in ordered]
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """The columns of the rows returned, in order"""
+        return self.projection if self.projection else self.fields
+
+    def __selected(self) -> List[str]:
+        return list(self.columns) + [column for column, _ in self.sortKey if column not in self.columns]
+
+    @staticmethod
+    def __beyond(column: str, descending: bool, value: Any) -> Tuple[str, Tuple]:
+        # SQLite sorts NULLs first, so they are before every value ascending and after it descending
+        if value is None:
+            return ("0", ()) if descending else (f"{column} IS NOT NULL", ())
+
+        return (f"({column} < ? OR {column} IS NULL)", (value,)) if descending else (f"{column} > ?", (value,))
+
+    def __keyCondition(self) -> Tuple[str, Tuple]:
+        # (a, b) after (x, y) is a > x OR (a IS x AND b > y), < for descending columns
+        alternatives, parameters = [], []
+        for idx, (column, descending) in enumerate(self.sortKey):
+            equal = [f"{previous} IS ?" for previous, _ in self.sortKey[:idx]]
+            beyond, values = self.__beyond(column, descending, self.afterKey[idx])
+            alternatives.append(f"({' AND '.join(equal + [beyond])})")
+            parameters.extend(self.afterKey[:idx] + values)
+
+        return " OR ".join(alternatives), tuple(parameters)
+
+    def build(self) -> Tuple[str, Tuple]:
+        """
+        The statement and its parameters. Sort key columns missing from the projection
+        are selected after the projected ones, so keyOf works on every row
+        """
+        statement = f"SELECT {', '.join(self.__selected())} FROM {self.source}"
+
+        conditions = list(self.conditions)
+        if self.afterKey is not None:
+            conditions.append(self.__keyCondition())
+
+        parameters: Tuple = ()
+        if conditions:
+            statement += f" WHERE {' AND '.join(f'({clause})' for clause, _ in conditions)}"
+            parameters = tuple(value for _, values in conditions for value in values)
+
+        statement += " ORDER BY " + ", ".join(
+            f"{column} DESC" if descending else column for column, descending in self.sortKey
+        )
+
+        if self.limitCount is not None:
+            statement += f" LIMIT {int(self.limitCount)}"
+
+        return statement, parameters
+
+    def keyOf(self, row: Tuple) -> Tuple:
+        """The sort key of a row returned by the built statement"""
+        selected = self.__selected()
+
+        return tuple(row[selected.index(column)] for column, _ in self.sortKey)
+
+    def strip(self, row: Tuple) -> Tuple:
+        """A row returned by the built statement without the extra sort key columns"""
+        return row[:len(self.columns)]
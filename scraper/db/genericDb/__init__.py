@@ -4,19 +4,25 @@ from pathlib import Path
 from models import BaseModel
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from typing import Generic, TypeVar, List, Tuple
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, Iterator, TypeVar, List, Set, Tuple, Sequence
+from operator import attrgetter
 from .ForeignKey import FK, FKActions
 from .PrimaryKey import PK
 from .Index import Index
+from .Query import Query
+from ..ConnectionManager import ConnectionManager, SingleConnection
 import sqlite3
 
 
 T = TypeVar("T")
 
 class GenericDatabase(Generic[T]):
+    # bound parameters per statement for the batched key lookups, well under SQLite's limit
+    MAX_PARAMETERS = 900
+    
     def __init__(
         self, 
-        cursor: sqlite3.Cursor, 
+        connections: ConnectionManager | SingleConnection | sqlite3.Cursor, 
         type_: BaseModel, 
         primaryKey: PK, 
         tableName: str = None, 
@@ -25,13 +31,17 @@ class GenericDatabase(Generic[T]):
     ) -> None:
         
         self.type = type_
-        self.__cursor = cursor
+        # reads and writes are jobs run on a connection by the Database's connection manager
+        if isinstance(connections, sqlite3.Cursor):
+            connections = SingleConnection(connections.connection)
+        self.__connections = connections
         
         # table info
         self.tableName = tableName if tableName else type_.__name__
         self.pk = primaryKey
         self.fks = foreignKeys
         self.indexes = indexes
+        self.__keyedStatements: Dict[Tuple[str, Tuple[str, ...]], str] = {}
         
         # statements 
         self.createTableStatement = self.getCreateTableStatement(
@@ -39,10 +49,60 @@ class GenericDatabase(Generic[T]):
         )
         self.dropTableStatement = f"DROP TABLE IF EXISTS {self.tableName}"
         self.selectAllStatement = f"SELECT * FROM {self.tableName}"
+        self.countStatement = f"SELECT COUNT(*) FROM {self.tableName}"
+        self.deleteStatement = f"DELETE FROM {self.tableName}"
+        
+        # column order, value extractors and row statements are compiled once here so
+        # the per row paths below do no reflection or string building
+        self.fields = tuple(type_.__dataclass_fields__.keys())
+        self.getValues = self.__compileGetter(self.fields)
+        self.getPrimaryKey = self.__compileGetter(primaryKey.columns)
+        self.hydrate = self.__compileHydrator(type_, self.fields)
+        
+        self.insertRowStatement = self.insertStatement(self.fields)
+        self.upsertRowStatement = self.upsertStatement(self.fields)
+        self.insertOrIgnoreRowStatement = (
+            f"{self.insertRowStatement} ON CONFLICT ({', '.join(primaryKey.columns)}) DO NOTHING"
+        )
+        self.updateRowStatement = (
+            f"UPDATE {self.tableName} SET {', '.join(f'{field} = ?' for field in self.fields)} "
+            f"WHERE {self.__formatKeys(primaryKey.columns)}"
+        )
+        
+    
+    @staticmethod
+    def __compileGetter(fields: Sequence[str]) -> Callable[[T], Tuple]:
+        getter = attrgetter(*fields)
+        if len(fields) == 1:
+            return lambda instance: (getter(instance),)
         
+        return getter
+    
+    
+    @staticmethod
+    def __compileHydrator(type_: BaseModel, fields: Sequence[str]) -> Callable[[Tuple], T]:
+        # rows come back in field order, so plain positional dataclasses can take them as is
+        dataclassFields = type_.__dataclass_fields__.values()
+        if all(field.init and not field.kw_only for field in dataclassFields):
+            return lambda row: type_(*row)
+        
+        return lambda row: type_(**dict(zip(fields, row)))
+    
+    
+    @staticmethod
+    def __formatKeys(keys: Sequence[str]) -> str:
+        return " AND ".join(f"{key} = ?" for key in keys)
+    
+    
+    def __keyedStatement(self, prefix: str, keys: Sequence[str]) -> str:
+        """prefix + WHERE clause on the given keys, built once per distinct set of keys"""
+        cacheKey = (prefix, tuple(keys))
+        statement = self.__keyedStatements.get(cacheKey)
+        if statement is None:
+            statement = f"{prefix} WHERE {self.__formatKeys(keys)}"
+            self.__keyedStatements[cacheKey] = statement
         
-    def __getFields(self) -> List[str]:
-        return [field for field in self.type.__dataclass_fields__.keys()]
+        return statement
         
         
     def getCreateTableStatement(
@@ -71,17 +131,33 @@ class GenericDatabase(Generic[T]):
         return statement
     
     
+    def __execute(self, statement: str, parameters: Tuple = ()) -> None:
+        self.__connections.write(lambda conn: conn.execute(statement, parameters))
+        
+    
+    def __executeMany(self, statement: str, parameters: Iterable[Tuple]) -> None:
+        self.__connections.write(lambda conn: conn.executemany(statement, parameters))
+        
+    
+    def __fetchAll(self, statement: str, parameters: Tuple = ()) -> List[Tuple]:
+        return self.__connections.read(lambda conn: conn.execute(statement, parameters).fetchall())
+        
+    
+    def __fetchOne(self, statement: str, parameters: Tuple = ()) -> Tuple:
+        return self.__connections.read(lambda conn: conn.execute(statement, parameters).fetchone())
+    
+    
     def createTable(self) -> None:
-        self.__cursor.execute(self.createTableStatement)
+        self.__execute(self.createTableStatement)
         
     
     def dropTable(self) -> None:
-        self.__cursor.execute(self.dropTableStatement)
+        self.__execute(self.dropTableStatement)
         
     
     def createIndexes(self) -> None:
         for index in self.indexes:
-            self.__cursor.execute(str(index))
+            self.__execute(str(index))
             
             
     def initialize(self) -> None:
@@ -101,95 +177,187 @@ class GenericDatabase(Generic[T]):
         return f"INSERT INTO {self.tableName} ({formattedFields}) VALUES ({formattedValues})"
     
     
-    def getByKeysStatement(self, **kwargs) -> str:
-        formattedKeys = " AND ".join(f"{key} = ?" for key in kwargs.keys())
+    def upsertStatement(self, fields: List[str]) -> str:
+        """
+        Insert that updates every non key column in place when a row with the same
+        primary key already exists, one statement instead of exists + insert/update
+        """
+        nonKeyFields = [field for field in fields if field not in self.pk.columns]
+        conflictTarget = ", ".join(self.pk.columns)
         
-        return f"SELECT * FROM {self.tableName} WHERE {formattedKeys}"
+        if not nonKeyFields:
+            return f"{self.insertStatement(fields)} ON CONFLICT ({conflictTarget}) DO NOTHING"
         
+        assignments = ", ".join(f"{field} = excluded.{field}" for field in nonKeyFields)
+        
+        return f"{self.insertStatement(fields)} ON CONFLICT ({conflictTarget}) DO UPDATE SET {assignments}"
     
-    def insert(self, instance: T) -> None:
-        fields = self.__getFields()
-        values = tuple(getattr(instance, field) for field in fields)
+    
+    def getByKeysStatement(self, **kwargs) -> str:
+        return self.__keyedStatement(self.selectAllStatement, kwargs.keys())
         
-        self.__cursor.execute(self.insertStatement(fields), values)
+    
+    def insert(self, instance: T) -> None:
+        self.__execute(self.insertRowStatement, self.getValues(instance))
         
     
     def getAll(self) -> List[T]:
-        self.__cursor.execute(self.selectAllStatement)
-        
-        instances = [
-            self.type(
-                **dict(zip(self.__getFields(), row))
-            )
+        return list(map(self.hydrate, self.__fetchAll(self.selectAllStatement)))
+    
+    
+    def __iterRows(
+        self, keys: Dict[str, Any], batchSize: int, raw: bool
+    ) -> Iterator[T | Tuple]:
+        """
+        The rows with the given key values in rowid order, each batch a read of its own that
+        resumes after the last rowid, so no connection stays checked out between batches
+        """
+        condition = f"{self.__formatKeys(keys)} AND " if keys else ""
+        statement = f"SELECT rowid, * FROM {self.tableName} WHERE {condition}rowid > ? ORDER BY rowid LIMIT ?"
+        # below every rowid SQLite assigns, those start at 1
+        lastRowid = -(2 ** 63)
+        
+        while rows := self.__fetchAll(statement, (*keys.values(), lastRowid, batchSize)):
+            lastRowid = rows[-1][0]
+            for row in rows:
+                yield row[1:] if raw else self.hydrate(row[1:])
             
-            for row in self.__cursor.fetchall()
-        ]
+            if len(rows) < batchSize:
+                return
+    
+    
+    def iterAll(self, batchSize: int = 500, raw: bool = False) -> Iterator[T | Tuple]:
+        """
+        Streams the table batchSize rows at a time instead of loading all of it,
+        as instances or, with raw, as the row tuples in field order
+        """
+        return self.__iterRows({}, batchSize, raw)
+    
+    
+    def iterByKeys(self, batchSize: int = 500, raw: bool = False, **kwargs) -> Iterator[T | Tuple]:
+        """Streaming version of getByKeysMany, see iterAll"""
+        return self.__iterRows(kwargs, batchSize, raw)
+    
+    
+    def query(self) -> Query:
+        """A query on this table to filter, sort, project and page, see Query"""
+        types = {field.name: field.type for field in self.type.__dataclass_fields__.values()}
         
-        return instances
+        return Query(self.tableName, self.fields, tuple(self.pk.columns), types)
     
     
-    def getByKeys(self, **kwargs) -> T:
-        self.__cursor.execute(self.getByKeysStatement(**kwargs), tuple(kwargs.values()))
+    def __queryRowMapper(self, query: Query, raw: bool) -> Callable[[Tuple], T | Tuple]:
+        # projected rows can't become instances, they stay tuples of the selected columns
+        if raw or query.projection:
+            return query.strip
+        
+        return lambda row: self.hydrate(query.strip(row))
+    
+    
+    def iterQuery(self, query: Query, batchSize: int = 500, raw: bool = False) -> Iterator[T | Tuple]:
+        """Streams the rows of a query, one getPage after the other, see iterAll"""
+        page, nextKey = self.getPage(query, batchSize, raw)
+        yield from page
+        
+        while nextKey is not None:
+            page, nextKey = self.getPage(query.after(nextKey), batchSize, raw)
+            yield from page
+    
+    
+    def getPage(self, query: Query, size: int, raw: bool = False) -> Tuple[List[T | Tuple], Tuple]:
+        """
+        Up to size rows of the query and the key of the last one, to get the next page with
+        query.after(key), None when there are no more rows. Pages start at the key rather
+        than at an OFFSET that has to step over every row of the pages before
+        """
+        statement, parameters = query.limit(size + 1).build()
+        rows = self.__fetchAll(statement, parameters)
+        nextKey = query.keyOf(rows[size - 1]) if len(rows) > size else None
         
-        row = self.__cursor.fetchone()
+        return list(map(self.__queryRowMapper(query, raw), rows[:size])), nextKey
+    
+    
+    def getByKeys(self, **kwargs) -> T:
+        row = self.__fetchOne(self.getByKeysStatement(**kwargs), tuple(kwargs.values()))
         
-        return self.type(
-            **dict(zip(self.__getFields(), row))
-        )
+        return self.hydrate(row)
         
         
     def getByKeysMany(self, **kwargs) -> List[T]:
-        self.__cursor.execute(self.getByKeysStatement(**kwargs), tuple(kwargs.values()))
+        rows = self.__fetchAll(self.getByKeysStatement(**kwargs), tuple(kwargs.values()))
         
-        instances = [
-            self.type(
-                **dict(zip(self.__getFields(), row))
-            )
-            
-            for row in self.__cursor.fetchall()
-        ]
-        
-        return instances
+        return list(map(self.hydrate, rows))
         
     
     def insertMany(self, instances: List[T]) -> None:
-        fields = self.__getFields()
-        values = [tuple(getattr(instance, field) for field in fields) for instance in instances]
-        
-        self.__cursor.executemany(self.insertStatement(fields), values)
+        self.__executeMany(self.insertRowStatement, list(map(self.getValues, instances)))
     
     
     def update(self, instance: T) -> None:
-        fields = self.__getFields()
-        values = tuple(getattr(instance, field) for field in fields)
-        pk = self.pk.columns
-        pkValues = tuple(getattr(instance, pk) for pk in pk)
-        searchKeys = dict(zip(pk, pkValues))
-        
-        formattedKeys = " AND ".join(f"{key} = ?" for key in searchKeys.keys())
-        
-        self.__cursor.execute(
-            f"UPDATE {self.tableName} SET {', '.join(f'{field} = ?' for field in fields)} WHERE {formattedKeys}",
-            values + tuple(searchKeys.values())
+        self.__execute(
+            self.updateRowStatement, self.getValues(instance) + self.getPrimaryKey(instance)
         )
         
         
     def delete(self, **kwargs) -> None:
-        formattedKeys = " AND ".join(f"{key} = ?" for key in kwargs.keys())
-        
-        self.__cursor.execute(
-            f"DELETE FROM {self.tableName} WHERE {formattedKeys}", tuple(kwargs.values())
+        self.__execute(
+            self.__keyedStatement(self.deleteStatement, kwargs.keys()), tuple(kwargs.values())
         )
         
     
     def exists(self, **kwargs) -> bool:
-        formattedKeys = " AND ".join(f"{key} = ?" for key in kwargs.keys())
-        
-        self.__cursor.execute(
-            f"SELECT COUNT(*) FROM {self.tableName} WHERE {formattedKeys}", tuple(kwargs.values())
+        row = self.__fetchOne(
+            self.__keyedStatement(self.countStatement, kwargs.keys()), tuple(kwargs.values())
         )
         
-        return self.__cursor.fetchone()[0] > 0
+        return row[0] > 0
+    
+    
+    def __existingKeys(self, keys: List[Tuple], columns: Sequence[str]) -> Set[int]:
+        """Indices of the keys that have at least one matching row, a query per chunk of keys"""
+        width = len(columns)
+        chunkSize = max(1, self.MAX_PARAMETERS // (width + 1))
+        
+        keyColumns = ", ".join(f"k{i}" for i in range(width))
+        placeholder = f"({', '.join('?' for _ in range(width + 1))})"
+        matches = " AND ".join(f"{self.tableName}.{column} = keys.k{i}" for i, column in enumerate(columns))
+        
+        def lookup(conn: sqlite3.Connection) -> Set[int]:
+            found = set()
+            for start in range(0, len(keys), chunkSize):
+                chunk = keys[start:start + chunkSize]
+                statement = (
+                    f"WITH keys(idx, {keyColumns}) AS (VALUES {', '.join(placeholder for _ in chunk)}) "
+                    f"SELECT idx FROM keys WHERE EXISTS (SELECT 1 FROM {self.tableName} WHERE {matches})"
+                )
+                parameters = [value for idx, key in enumerate(chunk, start) for value in (idx, *key)]
+                
+                found.update(idx for (idx,) in conn.execute(statement, parameters))
+                
+            return found
+        
+        return self.__connections.read(lookup)
+    
+    
+    def existsMany(self, keys: Iterable[Hashable], columns: Sequence[str] = None) -> List[bool]:
+        """
+        Whether each key has a matching row, in one query per few hundred keys instead of
+        one per key. Keys are values of columns, the primary key by default, given as
+        tuples or as plain values for a single column
+        """
+        columns = columns if columns else self.pk.columns
+        keys = list(keys)
+        keyTuples = keys if len(columns) > 1 else [(key,) for key in keys]
+        found = self.__existingKeys(keyTuples, columns)
+        
+        return [idx in found for idx in range(len(keys))]
+    
+    
+    def missingKeys(self, keys: Iterable[Hashable], columns: Sequence[str] = None) -> List[Hashable]:
+        """The distinct keys without a matching row, in the order given, see existsMany"""
+        keys = list(dict.fromkeys(keys))
+        
+        return [key for key, exists in zip(keys, self.existsMany(keys, columns)) if not exists]
     
     
     def insertOrUpdate(self, instance: T) -> int:
@@ -197,20 +365,32 @@ class GenericDatabase(Generic[T]):
         Inserts and returns 0 if an instance with the same primary keys does not exist, 
         otherwise updates and returns 1
         """
-        pk = self.pk.columns
-        pkValues = tuple(getattr(instance, pk) for pk in pk)
-        searchKeys = dict(zip(pk, pkValues))
+        values = self.getValues(instance)
         
-        if self.exists(**searchKeys):
-            self.update(instance)
+        # one job so nothing else gets written in between, and no lookup first: the insert
+        # reports through changes() whether the key was taken
+        def insertOrUpdate(conn: sqlite3.Connection) -> int:
+            if conn.execute(self.insertOrIgnoreRowStatement, values).rowcount:
+                return 0
+            
+            conn.execute(self.updateRowStatement, values + self.getPrimaryKey(instance))
             return 1
-        else:
-            self.insert(instance)
-            return 0
+        
+        return self.__connections.write(insertOrUpdate)
         
     
     def insertOrUpdateMany(self, instances: List[T]) -> None:
-        for instance in instances:
-            self.insertOrUpdate(instance)
+        self.__executeMany(self.upsertRowStatement, list(map(self.getValues, instances)))
             
-            
\ No newline at end of file
+    
+    def insertOrIgnoreMany(self, instances: List[T]) -> None:
+        """Inserts the instances whose primary key isn't taken yet, existing rows are left as they are"""
+        self.__executeMany(self.insertOrIgnoreRowStatement, list(map(self.getValues, instances)))
+            
+    
+    def insertOrUpdateRows(self, rows: List[Tuple]) -> None:
+        """
+        Same as insertOrUpdateMany for rows that are already value tuples in field order,
+        so callers don't have to build an instance per row
+        """
+        self.__executeMany(self.upsertRowStatement, rows)
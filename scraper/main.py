@@ -1,43 +1,253 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 
 from pathlib import Path
 import sys 
 sys.path.append(str(Path(__file__).parent))
 
+import base64
 import json
+import multiprocessing
 import uvicorn
-from scraper.Scraper import Scraper
+from scraper import Scraper, Parser, HttpClient, ResponseCache
+from scraper import ResponseArchive, RecordingClient, ReplayClient
 import os
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Mapping, Tuple
 from dotenv import load_dotenv
 
-from db import Database
+from db import AsyncDatabase, AsyncTable, Database, SqliteProfile
+from db.genericDb import Query
+from models import BaseModel, EntityResolver
 from utils import Utils
 
 load_dotenv()
 dbPath = os.getenv("DB_PATH")
+# DB_PROFILE picks the SQLite PRAGMA set, DB_MMAP_SIZE/DB_CACHE_SIZE/DB_BUSY_TIMEOUT tune it
+dbProfile = SqliteProfile.fromEnv()
+dbReaders = int(os.getenv("DB_READERS", 4))
 port = os.getenv("PORT")
-
-print("Database path", dbPath)
-print("PORT", port)
+maxConnections = int(os.getenv("HTTP_MAX_CONNECTIONS", 32))
+maxConnectionsPerHost = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", 8))
+requestsPerSecond = float(os.getenv("HTTP_REQUESTS_PER_SECOND", 10))
+htmlParser = os.getenv("HTML_PARSER", "html.parser")
+parseWorkers = int(os.getenv("PARSE_WORKERS", 0))
+# "record" writes every fetched page to the archive, "replay" serves pages from it offline
+archiveMode = os.getenv("HTTP_ARCHIVE_MODE")
+archivePath = os.getenv("HTTP_ARCHIVE_PATH", "responses.jsonl.gz")
+maxPageSize = int(os.getenv("API_MAX_PAGE_SIZE", 1000))
 
 if not port:
     port = 3000
 
-app = FastAPI() 
-db = Database(path=dbPath)
-scraper = Scraper(dbPath=dbPath)
+# opened by the lifespan, not at import: parse workers import this module again
+db: Database = None
+asyncDb: AsyncDatabase = None
+scraper: Scraper = None
+
+def parseContext() -> multiprocessing.context.BaseContext:
+    """
+    Parse workers come from a fork server that only preloads the page parser, so they
+    don't inherit the threads of this process the way forked workers would
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["scraper.PageParser"])
+    return context
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global db, asyncDb, scraper
+    
+    print("Database path", dbPath)
+    print("Database profile", dbProfile.name)
+    print("PORT", port)
+    
+    client = HttpClient(maxConnections, maxConnectionsPerHost, requestsPerSecond=requestsPerSecond)
+    if archiveMode == "record":
+        client = RecordingClient(ResponseArchive(archivePath), client)
+    elif archiveMode == "replay":
+        client = ReplayClient(ResponseArchive(archivePath))
+    
+    db = Database(path=dbPath, profile=dbProfile, readers=dbReaders)
+    # handlers and the scraper share one executor for their sqlite calls
+    asyncDb = AsyncDatabase(db)
+    scraper = Scraper(
+        db=asyncDb,
+        parser=Parser(
+            client=client,
+            # cache hits would never reach the archive
+            cache=None if archiveMode else ResponseCache(os.getenv("HTTP_CACHE_PATH")),
+            features=htmlParser,
+            # 0 keeps parsing on the event loop
+            parseExecutor=ProcessPoolExecutor(parseWorkers, mp_context=parseContext()) if parseWorkers else None,
+        )
+    )
+    
+    db.initialize()
+    
+    yield
+    
+    # shuts the parse pool down too
+    await scraper.parser.close()
+    await asyncDb.close()
 
-db.initialize()
+app = FastAPI(lifespan=lifespan) 
 
 @app.get("/")
 async def root():
     return { "message": "Hello there mate!" }
 
+def encodeJson(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+async def streamJsonArray(
+    instances: AsyncIterable[Any], toJson: Callable[[Any], Any] = BaseModel.toJson, batchSize: int = 500
+) -> AsyncIterator[str]:
+    """
+    Encodes instances into a JSON array one batch at a time, so a response never holds
+    more than a batch of rows
+    """
+    separator = "["
+    batch = []
+    async for instance in instances:
+        batch.append(encodeJson(toJson(instance)))
+        if len(batch) == batchSize:
+            yield separator + ",".join(batch)
+            separator = ","
+            batch = []
+    
+    if batch:
+        yield separator + ",".join(batch)
+        separator = ","
+    
+    yield "]" if separator == "," else "[]"
+
+# column=value, column.ne/lt/lte/gt/gte=value and column.in=a,b,c filter
+OPERATORS = {"ne": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+PAGING_PARAMETERS = {"order", "fields", "limit", "after"}
+
+def encodeCursor(key: Tuple) -> str:
+    return base64.urlsafe_b64encode(encodeJson(key).encode()).decode()
+
+def decodeCursor(cursor: str, query: Query) -> Tuple:
+    """The sort key in a cursor, which has to be one value per column of the query's sort key"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        key = None
+    
+    if (
+        not isinstance(key, list) or len(key) != len(query.sortKey)
+        or not all(value is None or isinstance(value, (str, int, float)) for value in key)
+    ):
+        raise ValueError(f"Invalid cursor {cursor}")
+    
+    return tuple(key)
+
+def buildQuery(query: Query, parameters: Mapping[str, str]) -> Query:
+    """
+    Applies the request's query parameters: the filters above, order=-year,round_ (- sorts
+    descending), fields=id_,name to project and after=<X-Next-Cursor of the previous page>
+    """
+    for name, value in parameters.items():
+        if name in PAGING_PARAMETERS:
+            continue
+        
+        column, _, operator = name.partition(".")
+        if operator == "in":
+            query = query.whereIn(column, [query.coerce(column, item) for item in value.split(",")])
+        elif not operator or operator in OPERATORS:
+            query = query.where(column, OPERATORS.get(operator, "="), query.coerce(column, value))
+        else:
+            raise ValueError(f"Unknown filter {name}, expected one of {', '.join(OPERATORS)} or in")
+    
+    for column in filter(None, parameters.get("order", "").split(",")):
+        query = query.orderBy(column.lstrip("-"), descending=column.startswith("-"))
+    
+    if parameters.get("fields"):
+        query = query.select(*parameters["fields"].split(","))
+    
+    if parameters.get("after"):
+        query = query.after(decodeCursor(parameters["after"], query))
+    
+    return query
+
+async def queryResponse(table: AsyncTable, request: Request) -> Response:
+    """
+    Whole table as a stream when there are no query parameters, otherwise the matching
+    rows, a page of at most limit rows when it's given with the cursor of the next page
+    in the X-Next-Cursor header
+    """
+    parameters = request.query_params
+    if not parameters:
+        return StreamingResponse(streamJsonArray(table.iterAll()), media_type="application/json")
+    
+    try:
+        query = buildQuery(table.query(), parameters)
+        limit = min(int(parameters["limit"]), maxPageSize) if "limit" in parameters else None
+        if limit is not None and limit < 1:
+            raise ValueError(f"Limit must be positive, got {limit}")
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    
+    toJson = (lambda row: dict(zip(query.columns, row))) if query.projection else BaseModel.toJson
+    
+    if limit is None:
+        return StreamingResponse(streamJsonArray(table.iterQuery(query), toJson), media_type="application/json")
+    
+    items, nextKey = await table.getPage(query, limit)
+    headers = {"X-Next-Cursor": encodeCursor(nextKey)} if nextKey else {}
+    return Response(encodeJson(list(map(toJson, items))), media_type="application/json", headers=headers)
+
 @app.get("/races")
-async def getRaces():
-    races = db.races.getAll()
+async def getRaces(request: Request):
+    return await queryResponse(asyncDb.races, request)
+
+@app.get("/results")
+async def getResults(request: Request):
+    return await queryResponse(asyncDb.results, request)
+
+@app.get("/aliases")
+async def getAliases(request: Request):
+    """The names learned by the scrapers and their ids, e.g. ?reviewed=0&method=fuzzy to review"""
+    return await queryResponse(asyncDb.aliases, request)
+
+@app.put("/aliases/{kind}/{name:path}")
+async def correctAlias(kind: str, name: str, entityId: str):
+    """
+    Resolves name to entityId from now on, the id it already has to mark it as reviewed.
+    Rows scraped before keep the id they were saved with
+    """
+    resolver = EntityResolver.get()
+    try:
+        if resolver.entities(kind).idOf(entityId) is None:
+            raise ValueError(f"Unknown {kind} id {entityId}")
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    
+    # a unit of work of its own, a scrape's transaction that is open can't roll it back
+    async with asyncDb.transaction():
+        alias = await asyncDb.aliases.correct(kind, name, entityId)
+    resolver.learn([alias])
+    
+    return alias.toJson()
+
+@app.delete("/aliases/{kind}/{name:path}")
+async def deleteAlias(kind: str, name: str):
+    """Forgets the alias, the name is matched against the constants again on the next scrape"""
+    try:
+        EntityResolver.get().forget(kind, name)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    
+    async with asyncDb.transaction():
+        await asyncDb.aliases.delete(kind=kind, name=name)
     
-    return races
+    return f"Deleted alias {name} of {kind}"
 
 @app.post("/scrape/races")
 async def scrapeRaces(year: int = 2024, round: int = None):
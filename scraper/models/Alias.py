@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+from .BaseModel import BaseModel
+
+
+@dataclass
+class Alias(BaseModel):
+    """
+    A name as it was scraped and the id it resolved to. method is how it was matched,
+    "exact", "fuzzy" or "manual" for a correction, and reviewed is 1 once someone has
+    checked it
+    """
+    kind: str
+    name: str
+    entityId: str
+    method: str
+    reviewed: int = 0
+
+    KINDS = ("driver", "constructor", "circuit")
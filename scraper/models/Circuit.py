@@ -3,9 +3,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from dataclasses import dataclass
-import json
 from .BaseModel import BaseModel
-from utils import Utils
+from .EntityResolver import EntityResolver
 
 
 @dataclass
@@ -30,18 +29,4 @@ class Circuit(BaseModel):
     
     @staticmethod
     def getCircuitId(name: str):
-        with open("constants/circuits.json") as f:
-            circuits = json.load(f)
-            bestMatch = None
-            bestMatchDistance = 20
-            
-            for circuit in circuits:
-                distance = Utils.editDistance(circuit["name"], name)
-                if distance < bestMatchDistance:
-                    bestMatch = circuit
-                    bestMatchDistance = distance
-                    
-        return bestMatch["id"] if bestMatch else None
-            
-
-    
\ No newline at end of file
+        return EntityResolver.get().circuitId(name)
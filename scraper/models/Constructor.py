@@ -1,7 +1,7 @@
 from dataclasses import dataclass
+from typing import Iterable, List
 from .BaseModel import BaseModel
-import json
-from utils import Utils
+from .EntityResolver import EntityResolver
 
 @dataclass
 class Constructor(BaseModel):
@@ -9,22 +9,13 @@ class Constructor(BaseModel):
     id_: str = None
     
     def __post_init__(self):
-        self.id_ = Constructor.getConstructorId(self.name)
+        self.id_ = self.id_ if self.id_ else Constructor.getConstructorId(self.name)
     
     @staticmethod
     def getConstructorId(name: str) -> str:
-        bestDistance = 30
-        best = None
-        constructors = json.load(open("constants/constructors.json"))
-        for constructor in constructors:
-            names = constructor["names"]
-            for n in names:
-                editDistance = Utils.editDistance(name.lower(), n.lower())
-                if editDistance < bestDistance:
-                    bestDistance = editDistance
-                    best = [constructor["id"], constructor["name"]]
-                    
-        if best is None:
-            raise Exception(f"Constructor not found: {name}")
-                    
-        return best[0]
\ No newline at end of file
+        return EntityResolver.get().constructorId(name)
+    
+    @staticmethod
+    def getConstructorIds(names: Iterable[str]) -> List[str]:
+        """getConstructorId of a whole column of names, each distinct name resolved once"""
+        return EntityResolver.get().constructorIds(names)
\ No newline at end of file
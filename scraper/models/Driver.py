@@ -1,7 +1,7 @@
 from dataclasses import dataclass
+from typing import Callable, Iterable, List
 from .BaseModel import BaseModel
-from functools import lru_cache
-import json
+from .EntityResolver import EntityResolver
 
 @dataclass
 class Driver(BaseModel):
@@ -16,10 +16,10 @@ class Driver(BaseModel):
     
 
     @staticmethod
-    @lru_cache
     def getDriverId(name: str) -> str:
-        with open("constants/drivers.json", "r") as f:
-            drivers = json.load(f)
-            for driver in drivers:
-                if driver["name"] == name:
-                    return driver["id"]
\ No newline at end of file
+        return EntityResolver.get().driverId(name)
+    
+    @staticmethod
+    def getDriverIds(names: Iterable[str], clean: Callable[[str], str] = None) -> List[str]:
+        """getDriverId of a whole column of names, each distinct name resolved once"""
+        return EntityResolver.get().driverIds(names, clean)
\ No newline at end of file
@@ -0,0 +1,239 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from utils import BKTree
+from .Alias import Alias
+
+
+class Entities:
+    """
+    Names and aliases of one constants file with the id each maps to, in file order,
+    plus a dict for exact hits on the normalized name (the first alias wins, like the
+    first best match of a scan does) and a BK-tree for the misses, so a fuzzy lookup
+    only scores the aliases the tree can't rule out. Fuzzy matches are memoized until
+    the file changes
+    """
+    EXACT = "exact"
+    FUZZY = "fuzzy"
+
+    def __init__(
+        self,
+        path: str | Path,
+        aliases: Callable[[List[Dict]], List[Tuple[str, Any]]],
+        normalize: Callable[[str], str],
+        maxDistance: int = None,
+        reloadInterval: float = 1.0,
+    ) -> None:
+        self.path = Path(path)
+        self.normalize = normalize
+        # fuzzy matches must be closer than this, None for exact names only
+        self.maxDistance = maxDistance
+        self.reloadInterval = reloadInterval
+
+        self.__aliases = aliases
+        self.__lock = threading.Lock()
+        # (aliases, exact, tree, fuzzy memo, ids by their text as stored in the database)
+        self.__index: Tuple[List[Tuple[str, Any]], Dict[str, Any], BKTree, Dict[str, Any], Dict[str, Any]] = None
+        self.__mtime: int = None
+        self.__checkedAt = float("-inf")
+
+    def __load(self) -> None:
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self.__mtime:
+            return
+
+        with open(self.path, "r") as f:
+            aliases = [(self.normalize(alias), id_) for alias, id_ in self.__aliases(json.load(f))]
+
+        exact: Dict[str, Any] = {}
+        for alias, id_ in aliases:
+            exact.setdefault(alias, id_)
+
+        tree = BKTree(alias for alias, _ in aliases) if self.maxDistance is not None else None
+
+        # swapped in one assignment, lookups on other threads see the old or the new index
+        self.__index = (aliases, exact, tree, {}, {str(id_): id_ for _, id_ in aliases})
+        self.__mtime = mtime
+
+    def __current(self) -> Tuple[List[Tuple[str, Any]], Dict[str, Any], BKTree, Dict[str, Any], Dict[str, Any]]:
+        # the file is stat'ed at most once per reloadInterval, not on every lookup
+        now = time.monotonic()
+        if now - self.__checkedAt >= self.reloadInterval:
+            with self.__lock:
+                if now - self.__checkedAt >= self.reloadInterval:
+                    self.__load()
+                    self.__checkedAt = now
+
+        return self.__index
+
+    def match(self, name: str) -> Tuple[Any, str]:
+        """The id of name and whether it was an EXACT or a FUZZY match, (None, None) when nothing is close enough"""
+        aliases, exact, tree, fuzzy, _ = self.__current()
+        key = self.normalize(name)
+
+        if key in exact:
+            return exact[key], self.EXACT
+
+        if self.maxDistance is None:
+            return None, None
+
+        if key not in fuzzy:
+            # matches must be closer than maxDistance
+            match = tree.closest(key, self.maxDistance - 1)
+            fuzzy[key] = aliases[match[0]][1] if match else None
+
+        return (fuzzy[key], self.FUZZY) if fuzzy[key] is not None else (None, None)
+
+    def resolve(self, name: str) -> Any:
+        """The id of name, None when nothing is close enough"""
+        return self.match(name)[0]
+
+    def idOf(self, text: str) -> Any:
+        """The id whose text, as the database stores it, is text, None if there isn't one"""
+        return self.__current()[4].get(text)
+
+    def reload(self) -> None:
+        """Re-reads the file on the next lookup whether or not it looks changed"""
+        with self.__lock:
+            self.__mtime = None
+            self.__checkedAt = float("-inf")
+
+
+class EntityResolver:
+    """
+    Resolves scraped driver, constructor and circuit names to their ids from the
+    constants files, loaded once and reloaded when a file changes on disk.
+
+    Aliases learned from the database come first, so a name keeps the id it got the first
+    time, or the one it was corrected to, without being matched again. Names that had to
+    be matched against the constants are queued as new aliases until takePending()
+    """
+    __instance: "EntityResolver" = None
+
+    def __init__(self, constantsPath: str | Path = "constants", reloadInterval: float = 1.0) -> None:
+        constantsPath = Path(constantsPath)
+
+        # drivers only ever matched their exact name
+        self.drivers = Entities(
+            constantsPath / "drivers.json",
+            lambda drivers: [(driver["name"], driver["id"]) for driver in drivers],
+            normalize=str,
+            reloadInterval=reloadInterval,
+        )
+        self.constructors = Entities(
+            constantsPath / "constructors.json",
+            lambda constructors: [
+                (alias, constructor["id"]) for constructor in constructors for alias in constructor["names"]
+            ],
+            normalize=str.lower,
+            maxDistance=30,
+            reloadInterval=reloadInterval,
+        )
+        self.circuits = Entities(
+            constantsPath / "circuits.json",
+            lambda circuits: [(circuit["name"], circuit["id"]) for circuit in circuits],
+            normalize=str,
+            maxDistance=20,
+            reloadInterval=reloadInterval,
+        )
+        self.__entities = {"driver": self.drivers, "constructor": self.constructors, "circuit": self.circuits}
+
+        # (kind, name) -> id of the stored aliases
+        self.__learned: Dict[Tuple[str, str], Any] = {}
+        self.__recorded: Set[Tuple[str, str]] = set()
+        self.__pending: List[Alias] = []
+
+    @staticmethod
+    def get() -> "EntityResolver":
+        """The shared resolver, on the constants folder of the working directory"""
+        if EntityResolver.__instance is None:
+            EntityResolver.__instance = EntityResolver()
+
+        return EntityResolver.__instance
+
+    def entities(self, kind: str) -> Entities:
+        if kind not in self.__entities:
+            raise ValueError(f"Unknown alias kind: {kind}")
+
+        return self.__entities[kind]
+
+    def learn(self, aliases: Iterable[Alias]) -> None:
+        """Resolves the names of the aliases to their ids from now on, ahead of the constants"""
+        for alias in aliases:
+            id_ = self.entities(alias.kind).idOf(alias.entityId)
+            # an id that left the constants still resolves, as the text it was stored as
+            self.__learned[(alias.kind, alias.name)] = alias.entityId if id_ is None else id_
+            self.__recorded.add((alias.kind, alias.name))
+
+    def forget(self, kind: str, name: str) -> None:
+        """Drops the alias of name, it is matched against the constants again"""
+        self.entities(kind)
+        self.__learned.pop((kind, name), None)
+        self.__recorded.discard((kind, name))
+
+    def takePending(self) -> List[Alias]:
+        """The aliases of the names matched since the last call, to be stored"""
+        # the old list is returned whole, appends racing the swap still end up in it
+        pending, self.__pending = self.__pending, []
+
+        return pending
+
+    def requeue(self, aliases: Iterable[Alias]) -> None:
+        """Puts back taken aliases that weren't stored, e.g. rolled back, for the next takePending"""
+        # their names stay recorded, so they aren't queued a second time meanwhile
+        self.__pending.extend(aliases)
+
+    def resolve(self, kind: str, name: str) -> Any:
+        """The id of name, None when nothing is close enough"""
+        key = (kind, name)
+        id_ = self.__learned.get(key)
+        if id_ is not None:
+            return id_
+
+        id_, method = self.entities(kind).match(name)
+        if id_ is not None and key not in self.__recorded:
+            self.__recorded.add(key)
+            self.__pending.append(Alias(kind, name, str(id_), method))
+
+        return id_
+
+    def resolveMany(self, kind: str, names: Iterable[str], clean: Callable[[str], str] = None) -> List[Any]:
+        """
+        The ids of a whole column of names, in order. Each distinct name is cleaned, e.g. of
+        a driver's short code, and resolved once however many rows it's in
+        """
+        names = list(names)
+        ids = {
+            name: self.resolve(kind, clean(name) if clean else name) for name in dict.fromkeys(names)
+        }
+
+        return [ids[name] for name in names]
+
+    def driverId(self, name: str) -> str:
+        return self.resolve("driver", name)
+
+    def driverIds(self, names: Iterable[str], clean: Callable[[str], str] = None) -> List[str]:
+        return self.resolveMany("driver", names, clean)
+
+    def constructorId(self, name: str) -> Hashable:
+        id_ = self.resolve("constructor", name)
+        if id_ is None:
+            raise Exception(f"Constructor not found: {name}")
+
+        return id_
+
+    def constructorIds(self, names: Iterable[str]) -> List[Hashable]:
+        names = list(names)
+        ids = self.resolveMany("constructor", names)
+        for name, id_ in zip(names, ids):
+            if id_ is None:
+                raise Exception(f"Constructor not found: {name}")
+
+        return ids
+
+    def circuitId(self, name: str) -> str:
+        return self.resolve("circuit", name)
@@ -1,7 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields as dataclassFields
+from operator import itemgetter
+from typing import List, Sequence, Tuple, Type
 from .BaseModel import BaseModel
 from .EventType import EventType
 from .Constructor import Constructor
+from .Driver import Driver
 from .RaceEvent import RaceEvent
 
 @dataclass(kw_only=True)
@@ -17,17 +20,69 @@ class Result(BaseModel):
         self.type_ = EventType.getType(RaceEvent.getEventTitle(self.eventId))
 
     @staticmethod
-    def fromDict(**kwargs):
-        type_ = EventType.getType(RaceEvent.getEventTitle(kwargs["eventId"]))
+    def typeFor(eventId: str) -> Type["Result"]:
+        type_ = EventType.getType(RaceEvent.getEventTitle(eventId))
         
         if type_ == EventType.RACE or type_ == EventType.SPRINT_RACE:
-            return RaceResult(**kwargs)
+            return RaceResult
         elif type_ == EventType.PRACTICE:
-            return PracticeResult(**kwargs)
+            return PracticeResult
         elif type_ == EventType.QUALIFYING or type_ == EventType.SPRINT_QUALIFYING:
-            return QualifyingResult(**kwargs)
+            return QualifyingResult
         else:
             raise ValueError("Invalid type")
+    
+    @staticmethod
+    def fromDict(**kwargs):
+        return Result.typeFor(kwargs["eventId"])(**kwargs)
+    
+    @staticmethod
+    def rowsFromTable(
+        eventId: str, columns: Sequence[str], rows: List[Tuple[str, ...]]
+    ) -> Tuple[Type["Result"], List[Tuple]]:
+        """
+        Turns the rows of a parsed results table straight into value tuples in the field
+        order of the event's result type, resolving driver and constructor ids on the way,
+        without building a dict or a Result per row
+        """
+        type_ = Result.typeFor(eventId)
+        
+        # each row gets (eventId, driverId, constructorId, None) appended, then one
+        # itemgetter picks every field from that in one go
+        width = len(columns)
+        extra = {"eventId": width, "driverId": width + 1, "constructorId": width + 2}
+        index = {column: i for i, column in enumerate(columns)}
+        
+        def columnOf(field: str, optional: bool = False) -> int:
+            # only fields defaulting to None can go without a column, the None at the end
+            if field in index:
+                return index[field]
+            if optional:
+                return width + 3
+            
+            raise ValueError(f"The results table of {eventId} has no {field} column")
+        
+        getFields = itemgetter(*(
+            extra[field.name] if field.name in extra else columnOf(field.name, field.default is None)
+            for field in dataclassFields(type_)
+        ))
+        
+        driverIdx = columnOf("driverName")
+        constructorIdx = columnOf("constructorName")
+        
+        # driver cells end with the short name ("Max Verstappen VER"), it's dropped once per
+        # distinct driver rather than once per row
+        driverIds = Driver.getDriverIds(
+            (row[driverIdx] for row in rows), lambda cell: " ".join(cell.split()[:-1])
+        )
+        constructorIds = Constructor.getConstructorIds(row[constructorIdx] for row in rows)
+        
+        values = [
+            getFields(row + (eventId, driverId, constructorId, None))
+            for row, driverId, constructorId in zip(rows, driverIds, constructorIds)
+        ]
+        
+        return type_, values
         
     def __str__(self) -> str:
         return f"{self.position} - {self.driverNumber} - {self.constructorId} - {self.type_}"
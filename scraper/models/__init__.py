@@ -6,4 +6,6 @@ from .Constructor import Constructor
 from .Standings import Standings, DriverStandings, ConstructorStandings
 from .Circuit import Circuit
 from .EventType import EventType
-from .BaseModel import BaseModel
\ No newline at end of file
+from .BaseModel import BaseModel
+from .Alias import Alias
+from .EntityResolver import EntityResolver, Entities
\ No newline at end of file
@@ -0,0 +1,58 @@
+import asyncio
+import copy
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class Coalescer:
+    """
+    Lets concurrent callers asking for the same key share one in-flight future
+    instead of each doing the same work (a.k.a. singleflight)
+    """
+    def __init__(self) -> None:
+        self.__inFlight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+
+        future = self.__inFlight.get(key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            future = asyncio.ensure_future(factory())
+            self.__inFlight[key] = future
+            future.add_done_callback(lambda done: self.__forget(key, done))
+
+        # shielded so one cancelled caller doesn't cancel the work for everyone else
+        return await asyncio.shield(future)
+
+    def __forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self.__inFlight.get(key) is future:
+            del self.__inFlight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced}
+
+    def resetStats(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+
+
+def coalesced(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    Coalesces concurrent calls of an async method with the same arguments through
+    the instance's `coalescer`. Every caller gets its own copy of the result since
+    callers are free to mutate what they get back.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        result = await self.coalescer.do(key, lambda: method(self, *args, **kwargs))
+
+        return copy.deepcopy(result)
+
+    return wrapper
@@ -0,0 +1,152 @@
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .RateLimiter import RateLimiter
+
+
+class HttpResponse:
+    """The parts of an HTTP response the Parser cares about, header names are lower-cased"""
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        text: str,
+        headers: Dict[str, str] = None,
+        encoding: str = "utf-8",
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.text = text
+        self.headers = headers if headers else {}
+        self.encoding = encoding
+
+
+class HttpError(Exception):
+    """Raised when a request still fails with a retryable status after every retry"""
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"GET {url} failed with status {status}")
+        self.url = url
+        self.status = status
+
+
+class HttpClient:
+    """
+    Async HTTP client with a keep-alive connection pool shared by every Parser fetch.
+    The pool bounds the number of open connections globally and per host, so a whole
+    season can be scraped without opening a new TCP/TLS connection for every page.
+
+    Requests to each host also go through a token bucket and an adaptive concurrency
+    limit, and throttled (429), failed (5xx) or timed out requests are retried with
+    jittered exponential backoff.
+    """
+    DEFAULT_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.95 Safari/537.36"
+    }
+
+    def __init__(
+        self,
+        maxConnections: int = 32,
+        maxConnectionsPerHost: int = 8,
+        keepAliveTimeout: float = 30,
+        requestsPerSecond: float = 10,
+        timeout: float = 30,
+        maxRetries: int = 4,
+        backoffBase: float = 0.5,
+        backoffMax: float = 30,
+    ) -> None:
+        self.maxConnections = maxConnections
+        self.maxConnectionsPerHost = maxConnectionsPerHost
+        self.keepAliveTimeout = keepAliveTimeout
+        self.timeout = timeout
+        self.maxRetries = maxRetries
+        self.backoffBase = backoffBase
+        self.backoffMax = backoffMax
+
+        self.rateLimiter = RateLimiter(
+            requestsPerSecond=requestsPerSecond,
+            burst=requestsPerSecond,
+            maxConcurrencyPerHost=maxConnectionsPerHost,
+        )
+
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __getSession(self) -> aiohttp.ClientSession:
+        # sessions are bound to the loop they were created on (asyncio.run makes a new one each time)
+        loop = asyncio.get_running_loop()
+        if self.__session is None or self.__session.closed or self.__loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.maxConnections,
+                limit_per_host=self.maxConnectionsPerHost,
+                keepalive_timeout=self.keepAliveTimeout,
+            )
+            self.__session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self.__loop = loop
+
+        return self.__session
+
+    def __backoff(self, attempt: int, response: Optional[HttpResponse]) -> float:
+        retryAfter = response.headers.get("retry-after") if response else None
+        if retryAfter and retryAfter.isdigit():
+            return min(self.backoffMax, float(retryAfter))
+
+        # "full jitter" so retrying clients don't come back in lockstep
+        return random.uniform(0, min(self.backoffMax, self.backoffBase * 2 ** attempt))
+
+    async def get(self, url: str, headers: Dict[str, str] = None) -> HttpResponse:
+        limiter = self.rateLimiter.host(urlsplit(url).netloc)
+        response, error = None, None
+
+        for attempt in range(self.maxRetries + 1):
+            if attempt:
+                await asyncio.sleep(self.__backoff(attempt - 1, response))
+
+            async with limiter.slot():
+                start = time.monotonic()
+                try:
+                    response, error = await self.__request(url, headers), None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    response, error = None, e
+                    limiter.record(time.monotonic() - start, ok=False)
+                    continue
+
+            throttled = response.status == 429
+            retryable = throttled or response.status >= 500
+            limiter.record(time.monotonic() - start, ok=not retryable, throttled=throttled)
+
+            if not retryable:
+                return response
+
+        if error is not None:
+            raise error
+
+        raise HttpError(url, response.status)
+
+    async def __request(self, url: str, headers: Dict[str, str] = None) -> HttpResponse:
+        session = self.__getSession()
+
+        async with session.get(url, headers=headers) as response:
+            body = await response.read()
+
+            return HttpResponse(
+                url=url,
+                status=response.status,
+                text=body.decode("utf-8", errors="replace"),
+                headers={key.lower(): value for key, value in response.headers.items()},
+            )
+
+    async def close(self) -> None:
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+
+        self.__session = None
+        self.__loop = None
@@ -0,0 +1,244 @@
+import json
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import *
+
+from .TablePlan import TablePlan
+
+
+class PageParser:
+    """
+    Turns the HTML of each kind of formula1.com page into plain dicts and lists.
+    Everything here is a pure function of its arguments so the Parser can run it
+    inline or hand it off to a process pool.
+    """
+    BASE_URL = "https://www.formula1.com"
+
+    # only the parts of each page we actually read get built into a tree
+    SCHEDULE_STRAINER = SoupStrainer("div", class_="f1-inner-wrapper")
+    RACE_STRAINER = SoupStrainer(["script", "img", "a"])
+    RESULTS_STRAINER = SoupStrainer(["h1", "table"])
+    STANDINGS_STRAINER = SoupStrainer("table")
+
+    RESULTS_PROP_MAP = {
+        "pos": "position",
+        "driver": "driverName",
+        "car": "constructorName",
+        "no": "driverNumber",
+        "time/retired": "time",
+        "pts": "points",
+    }
+    DRIVER_STANDINGS_PROP_MAP = {
+        "pos": "position",
+        "driver": "driverName",
+        "car": "constructorName",
+        "pts": "points",
+    }
+    CONSTRUCTOR_STANDINGS_PROP_MAP = {"pos": "position", "team": "constructorName", "pts": "points"}
+
+    @staticmethod
+    def __camelCase(string: str) -> str:
+        if not string or not string.strip():
+            return ""
+
+        split = string.split()
+        res = [split[0].lower()]
+        res.extend([word.capitalize() for word in split[1:]])
+
+        return "".join(res)
+
+    @staticmethod
+    def __propMapper(stat: str, mapper: dict[str, str]) -> str:
+        """Maps the stat to the correct property name in the class
+
+        Args:
+            stat (str): the stat to map
+            mapper (dict[str, str]): the mapper to use
+
+        Returns:
+            str: the mapped property name
+        """
+        if PageParser.__camelCase(stat) in mapper:
+            return mapper[PageParser.__camelCase(stat)]
+
+        return PageParser.__camelCase(stat)
+
+    @staticmethod
+    def __getSoup(html: str, features: str, parseOnly: SoupStrainer = None) -> BeautifulSoup:
+        return BeautifulSoup(html, features, parse_only=parseOnly)
+
+    @staticmethod
+    def parseRaceUrls(html: str, features: str = "html.parser") -> List[str]:
+        soup = PageParser.__getSoup(html, features, PageParser.SCHEDULE_STRAINER)
+
+        wrapperDiv = soup.find("div", class_="f1-inner-wrapper")
+
+        raceUrlAs = wrapperDiv.find_all(
+            "a", href=re.compile(r"^/en/racing/\d{4}/[\w-]+$")
+        )
+        raceUrls = list(map(lambda x: PageParser.BASE_URL + x["href"], raceUrlAs))
+
+        filteredUrls = [url for url in raceUrls if not "pre-season" in url.lower()]
+
+        return filteredUrls
+
+    @staticmethod
+    def parseCircuit(html: str, features: str = "html.parser") -> Dict[str, str]:
+        soup = PageParser.__getSoup(html, features)
+        trackName = str(soup.find("h2", class_="f1-heading").string)
+
+        stats = soup.find_all("span", class_="f1-text")
+
+        circuit = {"name": trackName}
+
+        propMap = {"circuitLength": "length", trackName: "name"}
+
+        for stat in stats:
+            if not stat.string:
+                continue
+            val = stat.next_sibling
+            if not val:
+                continue
+            val = " ".join(val.stripped_strings)
+            circuit[PageParser.__propMapper(stat.string, propMap)] = val
+
+        return circuit
+
+    @staticmethod
+    def __parseEvents(events: list[dict[str, any]]) -> dict[str, str]:
+        events = [
+            {
+                "title": event["name"].split(" - ")[0],
+                "startDate": event["startDate"],
+                "endDate": event["endDate"],
+                "resultLink": None
+            } for event in events
+        ]
+
+        return events
+
+    @staticmethod
+    def compileTablePlan(table: BeautifulSoup, propMap: dict[str, str] = {}) -> TablePlan:
+        """Maps every header of the table to its property name, once per table"""
+        return TablePlan(
+            PageParser.__propMapper(header.lower(), propMap)
+            for header in table.thead.tr.stripped_strings
+        )
+
+    @staticmethod
+    def __parseTable(
+        table: BeautifulSoup,
+        propMap: dict[str, str] = {},
+        initial: dict[str, str] = {},
+    ) -> List[dict[str, str]]:
+        plan = PageParser.compileTablePlan(table, propMap)
+
+        return plan.toDicts(plan.extractRows(table), initial)
+
+    @staticmethod
+    def __parseEventTitle(soup: BeautifulSoup) -> str:
+        title = soup.find("h1").string.split("-")[-1].strip()
+        if title.lower().endswith("result"):
+            title = title.split()[0]
+
+        return title
+
+    @staticmethod
+    def parseEventResults(html: str, eventId: str, features: str = "html.parser") -> List[Dict[str, str]]:
+        soup = PageParser.__getSoup(html, features, PageParser.RESULTS_STRAINER)
+
+        title = PageParser.__parseEventTitle(soup)
+        resultTable = soup.find("table")
+
+        results = PageParser.__parseTable(
+            resultTable,
+            PageParser.RESULTS_PROP_MAP,
+            initial={"eventId": eventId, "eventTitle": title},
+        )
+
+        return results
+
+    @staticmethod
+    def parseEventResultRows(html: str, features: str = "html.parser") -> Dict[str, Any]:
+        """
+        Same table as parseEventResults but left as one tuple per row, in the order of
+        `columns`, for callers that don't need a dict per result
+        """
+        soup = PageParser.__getSoup(html, features, PageParser.RESULTS_STRAINER)
+
+        resultTable = soup.find("table")
+        plan = PageParser.compileTablePlan(resultTable, PageParser.RESULTS_PROP_MAP)
+
+        return {
+            "eventTitle": PageParser.__parseEventTitle(soup),
+            "columns": plan.columns,
+            "rows": plan.extractRows(resultTable),
+        }
+
+    @staticmethod
+    def __isTrackMap(attr: str) -> bool:
+        return attr and ("carbon" in attr or "carbon" in attr.lower())
+
+    @staticmethod
+    def __getYear(url: str) -> int:
+        splitUrl = url.split("/")
+        return int(splitUrl[splitUrl.index("racing") + 1])
+
+    @staticmethod
+    def __parseEventResultLinks(soup: BeautifulSoup) -> tuple[list[str], str]:
+        def isResultLink(link: str) -> bool:
+            link = link.removeprefix("https://www.formula1.com/en/")
+            return bool(re.fullmatch(r'results(?:\.html)?/\d{4}/races/\d+/-?[\w-]+/-?[\w-]+(?:\.html)?/?', link))
+
+        links = soup.findAll("a", href=isResultLink)
+        links = [tag["href"] for tag in links]
+
+        return links, links[0].removeprefix("https://www.formula1.com/en/").split("/")[3]
+
+    @staticmethod
+    def parseRace(html: str, url: str, round_: int, features: str = "html.parser") -> Dict[str, Any]:
+        """Parses a race weekend page, the circuit comes from its own page and is left as None"""
+        soup = PageParser.__getSoup(html, features, PageParser.RACE_STRAINER)
+        year = PageParser.__getYear(url)
+
+        json_ld_tags = soup.findAll("script", type="application/ld+json")
+        raceData = {}
+        for tag in json_ld_tags:
+            jsonData = json.loads(tag.string)
+            if jsonData.get("@type") == "SportsEvent":
+                raceData = jsonData
+                break
+
+        raceLocation = raceData["location"]["address"]
+        raceName = raceData["name"]
+        trackMapImg = soup.find("img", src=PageParser.__isTrackMap)["src"]
+
+        events = PageParser.__parseEvents(raceData["subEvent"])
+        resultLinks, f1RaceId = PageParser.__parseEventResultLinks(soup)
+
+        for idx, event in enumerate(events):
+            event["resultLink"] = resultLinks[-1-idx]
+
+        race = {
+            "f1Id": f1RaceId,
+            "year": year,
+            "round_": round_,
+            "name": raceName,
+            "location": raceLocation,
+            "trackMap": trackMapImg,
+            "circuit": None,
+            "events": events,
+        }
+
+        return race
+
+    @staticmethod
+    def parseStandings(
+        html: str, propMap: dict[str, str] = {}, features: str = "html.parser"
+    ) -> List[dict[str, str]]:
+        soup = PageParser.__getSoup(html, features, PageParser.STANDINGS_STRAINER)
+
+        table = soup.find("table")
+
+        standings = PageParser.__parseTable(table, propMap)
+        return standings
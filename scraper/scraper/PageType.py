@@ -0,0 +1,52 @@
+from enum import Enum
+import re
+
+"""
+EXAMPLES
+
+race weekend:           https://www.formula1.com/en/racing/2024/brazil
+year schedule:          https://www.formula1.com/en/racing/2024
+constructor standings:  https://www.formula1.com/en/results/2024/team
+driver standings:       https://www.formula1.com/en/results/2024/drivers
+circuit:                https://www.formula1.com/en/racing/2023/brazil/circuit
+race result:            https://www.formula1.com/en/results/2023/races/1224/brazil/race-result
+practice result:        https://www.formula1.com/en/results/2023/races/1224/brazil/practice/1
+qualifying result:      https://www.formula1.com/en/results/2023/races/1224/brazil/qualifying
+"""
+
+BASE_URL = "https://www.formula1.com/en/"
+
+
+class PageType(Enum):
+    """The kinds of formula1.com pages the Parser fetches"""
+    YEAR_SCHEDULE = "YR_SCH"
+    DRIVER_STANDINGS = "DRI_STNDGS"
+    CONSTRUCTOR_STANDINGS = "CON_STNDGS"
+    RACE_WEEKEND = "RACE_WKND"
+    CIRCUIT = "CRCT"
+    PRACTICE_RESULT = "PRA_RES"
+    QUALIFYING_RESULT = "QUALI_RES"
+    RACE_RESULT = "RACE_RES"
+
+    @staticmethod
+    def parseType(url: str) -> "PageType":
+        path = re.sub(BASE_URL, "", url)
+
+        if re.fullmatch(r"^racing/\d{4}/[a-zA-Z-]+/?$", path):
+            return PageType.RACE_WEEKEND
+        if re.fullmatch(r"^results/\d{4}/team/?$", path):
+            return PageType.CONSTRUCTOR_STANDINGS
+        if re.fullmatch(r"^results/\d{4}/drivers/?$", path):
+            return PageType.DRIVER_STANDINGS
+        if re.fullmatch(r"^racing/\d{4}/?$", path):
+            return PageType.YEAR_SCHEDULE
+        if re.fullmatch(r"^racing/\d{4}/[a-zA-Z-]+/circuit/?$", path):
+            return PageType.CIRCUIT
+        if re.fullmatch(r"^results/\d{4}/races/\d+/[a-zA-Z-]+/practice/\d+/?$", path):
+            return PageType.PRACTICE_RESULT
+        if re.fullmatch(r"^results/\d{4}/races/\d+/[a-zA-Z-]+/(sprint-|)qualifying/?$", path):
+            return PageType.QUALIFYING_RESULT
+        if re.fullmatch(r"^results/\d{4}/races/\d+/[a-zA-Z-]+/(race|sprint)-result(s|)/?$", path):
+            return PageType.RACE_RESULT
+
+        raise Exception(f"can't parse request type for url: {url}")
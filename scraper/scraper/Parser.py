@@ -1,15 +1,19 @@
-import json
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-import re
-import requests
-from bs4 import BeautifulSoup
-from typing import *
-import time
 import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import *
+
+from .PageParser import PageParser
+from .HttpClient import HttpClient
+from .ResponseCache import ResponseCache
+from .Coalescer import Coalescer, coalesced
+
+T = TypeVar("T")
 
 
 # Where all the dirty work is done, Parser really took one for the team here
@@ -19,251 +23,130 @@ class Parser:
     CONSTRUCTORS_STANDINGS_URL = BASE_URL + "/en/results/{year}/team"
     YEAR_SCHEDULE_URL = BASE_URL + "/en/racing/{year}"
 
-    def __camelCase(self, string: str) -> str:
-        if not string or not string.strip():
-            return ""
+    def __init__(
+        self,
+        client: HttpClient = None,
+        cache: ResponseCache = None,
+        features: str = "html.parser",
+        parseExecutor: Executor = None,
+    ) -> None:
+        # every page fetch goes through this one pooled client
+        self.client = client if client else HttpClient()
+        self.cache = cache
+        # BeautifulSoup tree builder, "lxml" is a lot faster if it's installed
+        self.features = features
+        # parsing is CPU bound, with a process pool it runs off the event loop on every core
+        self.parseExecutor = parseExecutor
+
+        # concurrent scrape tasks ask for the same pages and races over and over
+        self.fetchCoalescer = Coalescer()
+        self.coalescer = Coalescer()
+
+    async def __getHtml(self, url: str, useCache: bool = True) -> str:
+        return await self.fetchCoalescer.do(
+            (url, useCache), lambda: self.__fetchHtml(url, useCache)
+        )
 
-        split = string.split()
-        res = [split[0].lower()]
-        res.extend([word.capitalize() for word in split[1:]])
+    async def __fetchHtml(self, url: str, useCache: bool = True) -> str:
+        if self.cache is None or not useCache:
+            return (await self.client.get(url)).text
 
-        return "".join(res)
+        # the cache is files on disk, its reads and writes stay off the event loop
+        entry = await asyncio.to_thread(self.cache.get, url)
+        if entry and self.cache.isFresh(entry):
+            return entry.text
 
-    def __propMapper(self, stat: str, mapper: dict[str, str]) -> str:
-        """Maps the stat to the correct property name in the class
+        response = await self.client.get(url, headers=entry.conditionalHeaders() if entry else None)
 
-        Args:
-            stat (str): the stat to map
-            mapper (dict[str, str]): the mapper to use
+        if response.status == 304 and entry:
+            await asyncio.to_thread(self.cache.touch, entry)
+            return entry.text
 
-        Returns:
-            str: the mapped property name
-        """
-        if self.__camelCase(stat) in mapper:
-            return mapper[self.__camelCase(stat)]
+        if response.status == 200:
+            await asyncio.to_thread(self.cache.put, url, response)
 
-        return self.__camelCase(stat)
+        return response.text
 
-    async def __getSoup(self, url: str) -> BeautifulSoup:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.95 Safari/537.36"
-        }
-        html = await asyncio.to_thread(requests.get, url, headers=headers)
-        htmlText = html.text.encode(html.encoding).decode("utf-8")
-        soup = BeautifulSoup(htmlText, "html.parser")
+    async def __parse(self, parse: Callable[..., T], *args: Any) -> T:
+        if self.parseExecutor is None:
+            return parse(*args)
 
-        return soup
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parseExecutor, functools.partial(parse, *args))
 
-    async def getRaceUrls(self, year: int, use_cache: bool = True) -> List[str]:
-        # caching shenanigans
-        cache_directory = Path(__file__).parent / "__cache__" / f"{year}_urls.json"
+    async def close(self) -> None:
+        await self.client.close()
 
-        if cache_directory.exists() and use_cache:
-            with open(cache_directory, "r") as file:
-                cache_data = json.load(file)
-                last_updated = cache_data["last_updated"]
-                urls = cache_data["data"]
+        if self.parseExecutor is not None:
+            self.parseExecutor.shutdown(wait=False, cancel_futures=True)
 
-                if time.time() - last_updated < 3600 * 24 * 7 and urls:  # 1 week
-                    print("cache hit")
-                    return urls
+    def stats(self) -> Dict[str, int]:
+        """Counts of page fetches and parsed objects requested vs. shared with an in-flight call"""
+        fetches = self.fetchCoalescer.stats()
+        objects = self.coalescer.stats()
 
-        else:
-            cache_directory.parent.mkdir(parents=True, exist_ok=True)
+        return {
+            "fetches": fetches["calls"],
+            "coalescedFetches": fetches["coalesced"],
+            "objects": objects["calls"],
+            "coalescedObjects": objects["coalesced"],
+        }
 
-        # actual scraping
+    def resetStats(self) -> None:
+        self.fetchCoalescer.resetStats()
+        self.coalescer.resetStats()
 
+    @coalesced
+    async def getRaceUrls(self, year: int, use_cache: bool = True) -> List[str]:
         url = self.YEAR_SCHEDULE_URL.format(year=year)
-        soup = await self.__getSoup(url)
+        html = await self.__getHtml(url, useCache=use_cache)
 
-        wrapperDiv = soup.find("div", class_="f1-inner-wrapper")
-
-        raceUrlAs = wrapperDiv.find_all(
-            "a", href=re.compile(r"^/en/racing/\d{4}/[\w-]+$")
-        )
-        raceUrls = list(map(lambda x: self.BASE_URL + x["href"], raceUrlAs))
-
-        filteredUrls = [url for url in raceUrls if not "pre-season" in url.lower()]
-
-        # more caching shenanigans
-        if use_cache:
-            with open(cache_directory, "w") as file:
-                json.dump({"last_updated": time.time(), "data": filteredUrls}, file)
-
-        return filteredUrls
+        return await self.__parse(PageParser.parseRaceUrls, html, self.features)
 
+    @coalesced
     async def getCircuit(self, raceUrl: str) -> Dict[str, str]:
         url = raceUrl + "/circuit"
+        html = await self.__getHtml(url)
 
-        soup = await self.__getSoup(url)
-        trackName = soup.find("h2", class_="f1-heading").string
-
-        stats = soup.find_all("span", class_="f1-text")
-
-        circuit = {"name": trackName}
-
-        propMap = {"circuitLength": "length", trackName: "name"}
-
-        for stat in stats:
-            if not stat.string:
-                continue
-            val = stat.next_sibling
-            if not val:
-                continue
-            val = " ".join(val.stripped_strings)
-            circuit[self.__propMapper(stat.string, propMap)] = val
-
-        return circuit
-
-    def __parseEvents(self, events: list[dict[str, any]]) -> dict[str, str]:
-        events = [
-            {
-                "title": event["name"].split(" - ")[0],
-                "startDate": event["startDate"],
-                "endDate": event["endDate"],
-                "resultLink": None
-            } for event in events
-        ]
-
-        return events
-
-    def __parseTable(
-        self,
-        table: BeautifulSoup,
-        propMap: dict[str, str] = {},
-        initial: dict[str, str] = {},
-    ) -> List[dict[str, str]]:
-        infos = [ele.lower() for ele in table.thead.tr.stripped_strings]
-
-        tableData: List[dict[str, str]] = []
-        for child in table.tbody.children:
-            if child == "\n":
-                continue
-
-            rowData = []
-            for ch in child.children:
-                joined = " ".join(ch.stripped_strings)
-                if joined:
-                    rowData.append(joined)
-
-            while len(rowData) < len(infos):
-                end = rowData.pop()
-                rowData.append("")
-                rowData.append(end)
-
-            row = initial.copy()
-            for ind, res in enumerate(rowData):
-                row[self.__propMapper(infos[ind].lower(), propMap)] = res
-
-            tableData.append(row)
-
-        return tableData
+        return await self.__parse(PageParser.parseCircuit, html, self.features)
 
+    @coalesced
     async def getEventResults(self, url: str, eventId: str) -> List[Dict[str, str]]:
-        soup = await self.__getSoup(url)
-
-        title = soup.find("h1").string.split("-")[-1].strip()
-        if title.lower().endswith("result"):
-            title = title.split()[0]
-            
-        resultTable = soup.find("table")
-
-        propMap = {
-            "pos": "position",
-            "driver": "driverName",
-            "car": "constructorName",
-            "no": "driverNumber",
-            "time/retired": "time",
-            "pts": "points",
-        }
-
-        results = self.__parseTable(
-            resultTable, propMap, initial={"eventId": eventId, "eventTitle": title}
-        )
+        html = await self.__getHtml(url)
 
-        return results
+        return await self.__parse(PageParser.parseEventResults, html, eventId, self.features)
 
-    def __isTrackMap(self, attr: str) -> bool:
-        return attr and ("carbon" in attr or "carbon" in attr.lower())
+    @coalesced
+    async def getEventResultRows(self, url: str) -> Dict[str, Any]:
+        """The results table as {"eventTitle", "columns", "rows"} with a plain tuple per row"""
+        html = await self.__getHtml(url)
 
-    def __getYear(self, url: str) -> int:
-        splitUrl = url.split("/")
-        return int(splitUrl[splitUrl.index("racing") + 1])
-    
-    def __parseEventResultLinks(self, soup: BeautifulSoup) -> tuple[list[str], str]:
-        def isResultLink(link: str) -> bool:
-            link = link.removeprefix("https://www.formula1.com/en/")
-            return bool(re.fullmatch(r'results(?:\.html)?/\d{4}/races/\d+/-?[\w-]+/-?[\w-]+(?:\.html)?/?', link))
+        return await self.__parse(PageParser.parseEventResultRows, html, self.features)
 
-        links = soup.findAll("a", href=isResultLink)
-        links = [tag["href"] for tag in links]
-
-        return links, links[0].removeprefix("https://www.formula1.com/en/").split("/")[3]
-    
+    @coalesced
     async def getRace(self, url: str, round_: int) -> Dict[str, Any]:
-        soup = await self.__getSoup(url)
-        year = self.__getYear(url)
-        
-        json_ld_tags = soup.findAll("script", type="application/ld+json")
-        raceData = {}
-        for tag in json_ld_tags:
-            jsonData = json.loads(tag.string)
-            if jsonData.get("@type") == "SportsEvent":
-                raceData = jsonData
-                break
-            
-        raceLocation = raceData["location"]["address"]
-        raceName = raceData["name"]
-        trackMapImg = soup.find("img", src=self.__isTrackMap)["src"]
-
-        events = self.__parseEvents(raceData["subEvent"])
-        resultLinks, f1RaceId = self.__parseEventResultLinks(soup)
-        
-        for idx, event in enumerate(events):
-            event["resultLink"] = resultLinks[-1-idx]
-        
-        circuit = await self.getCircuit(url)
-
-        race = {
-            "f1Id": f1RaceId,
-            "year": year,
-            "round_": round_,
-            "name": raceName,
-            "location": raceLocation,
-            "trackMap": trackMapImg,
-            "circuit": circuit,
-            "events": events,
-        }
+        html, circuit = await asyncio.gather(self.__getHtml(url), self.getCircuit(url))
+        race = await self.__parse(PageParser.parseRace, html, url, round_, self.features)
+
+        race["circuit"] = circuit
 
         return race
 
     async def __getStandings(
         self, url: str, propMap: dict[str, str] = {}
     ) -> List[dict[str, str]]:
-        soup = await self.__getSoup(url)
-
-        table = soup.find("table")
+        html = await self.__getHtml(url)
 
-        standings = self.__parseTable(table, propMap)
-        return standings
+        return await self.__parse(PageParser.parseStandings, html, propMap, self.features)
 
+    @coalesced
     async def getDriverStandings(self, year: int) -> List[Dict[str, str]]:
         url = self.DRIVERS_STANDINGS_URL.format(year=year)
-        propMap = {
-            "pos": "position",
-            "driver": "driverName",
-            "car": "constructorName",
-            "pts": "points",
-        }
 
-        driverStandings = await self.__getStandings(url, propMap)
-
-        return driverStandings
+        return await self.__getStandings(url, PageParser.DRIVER_STANDINGS_PROP_MAP)
 
+    @coalesced
     async def getConstructorStandings(self, year: int) -> List[Dict[str, str]]:
         url = self.CONSTRUCTORS_STANDINGS_URL.format(year=year)
-        propMap = {"pos": "position", "team": "constructorName", "pts": "points"}
-
-        constructorStandings = await self.__getStandings(url, propMap)
 
-        return constructorStandings
+        return await self.__getStandings(url, PageParser.CONSTRUCTOR_STANDINGS_PROP_MAP)
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+
+class TokenBucket:
+    """Spaces requests out to `rate` per second, allowing bursts of up to `burst` requests"""
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updatedAt = time.monotonic()
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updatedAt) * self.rate)
+        self.updatedAt = now
+
+    async def acquire(self) -> None:
+        # reserve the token up front (the balance may go negative), callers are served in order
+        self.__refill()
+        self.tokens -= 1
+
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency limit: grows by roughly one slot per window of fast, successful
+    requests and is cut multiplicatively when requests get slow or start failing
+    """
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 16,
+        targetLatency: float = 2.0,
+        slowBackoff: float = 0.9,
+        errorBackoff: float = 0.5,
+    ) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.targetLatency = targetLatency
+        self.slowBackoff = slowBackoff
+        self.errorBackoff = errorBackoff
+
+        self.inFlight = 0
+        self.__waiters: Deque[asyncio.Future] = deque()
+
+    def __capacity(self) -> int:
+        return max(self.minimum, int(self.limit))
+
+    def __wakeUp(self) -> None:
+        free = self.__capacity() - self.inFlight
+        for waiter in self.__waiters:
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    async def acquire(self) -> None:
+        while self.inFlight >= self.__capacity():
+            waiter = asyncio.get_running_loop().create_future()
+            self.__waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # hand the wake up we were given to someone else
+                if waiter.done() and not waiter.cancelled():
+                    self.__wakeUp()
+                raise
+            finally:
+                self.__waiters.remove(waiter)
+
+        self.inFlight += 1
+
+    def release(self) -> None:
+        self.inFlight -= 1
+        self.__wakeUp()
+
+    def record(self, latency: float, ok: bool) -> None:
+        if not ok:
+            self.limit = max(self.minimum, self.limit * self.errorBackoff)
+        elif latency > self.targetLatency:
+            self.limit = max(self.minimum, self.limit * self.slowBackoff)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.__wakeUp()
+
+
+class HostLimiter:
+    """Token bucket and adaptive concurrency limit for a single host"""
+    def __init__(
+        self,
+        requestsPerSecond: float,
+        burst: float,
+        maxConcurrency: int,
+        targetLatency: float,
+    ) -> None:
+        self.maxRate = requestsPerSecond
+        self.minRate = requestsPerSecond / 16
+        self.bucket = TokenBucket(requestsPerSecond, burst)
+        self.concurrency = AdaptiveConcurrencyLimit(
+            initial=max(1, maxConcurrency // 2),
+            maximum=maxConcurrency,
+            targetLatency=targetLatency,
+        )
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+            yield
+        finally:
+            self.concurrency.release()
+
+    def record(self, latency: float, ok: bool, throttled: bool = False) -> None:
+        self.requests += 1
+        self.errors += 0 if ok else 1
+        self.concurrency.record(latency, ok)
+
+        if throttled:
+            # the upstream told us outright we're too fast, slow the request rate down too
+            self.throttled += 1
+            self.bucket.rate = max(self.minRate, self.bucket.rate / 2)
+        elif ok:
+            self.bucket.rate = min(self.maxRate, self.bucket.rate + self.maxRate / 100)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "concurrencyLimit": self.concurrency.limit,
+            "inFlight": self.concurrency.inFlight,
+            "requestsPerSecond": self.bucket.rate,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+        }
+
+
+class RateLimiter:
+    """Keeps a HostLimiter per upstream host"""
+    def __init__(
+        self,
+        requestsPerSecond: float = 10,
+        burst: float = 10,
+        maxConcurrencyPerHost: int = 8,
+        targetLatency: float = 2.0,
+    ) -> None:
+        self.requestsPerSecond = requestsPerSecond
+        self.burst = burst
+        self.maxConcurrencyPerHost = maxConcurrencyPerHost
+        self.targetLatency = targetLatency
+
+        self.hosts: Dict[str, HostLimiter] = {}
+
+    def host(self, host: str) -> HostLimiter:
+        if host not in self.hosts:
+            self.hosts[host] = HostLimiter(
+                self.requestsPerSecond,
+                self.burst,
+                self.maxConcurrencyPerHost,
+                self.targetLatency,
+            )
+
+        return self.hosts[host]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {host: limiter.stats() for host, limiter in self.hosts.items()}
@@ -0,0 +1,85 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, IO, Optional
+
+from .HttpClient import HttpClient, HttpResponse
+
+
+class ArchiveMissError(LookupError):
+    """Raised when replaying a URL that was never recorded"""
+    def __init__(self, url: str) -> None:
+        super().__init__(f"{url} is not in the archive")
+        self.url = url
+
+
+class ResponseArchive:
+    """
+    Gzipped JSON lines file with one fetched page per line. Later lines win, so the
+    same archive can be recorded into again to refresh or extend it.
+    """
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.__file: Optional[IO[str]] = None
+
+    def load(self) -> Dict[str, HttpResponse]:
+        responses = {}
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                responses[record["url"]] = HttpResponse(**record)
+
+        return responses
+
+    def append(self, response: HttpResponse) -> None:
+        if self.__file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.__file = gzip.open(self.path, "at", encoding="utf-8")
+
+        record = {
+            "url": response.url,
+            "status": response.status,
+            "text": response.text,
+            "headers": response.headers,
+            "encoding": response.encoding,
+        }
+        self.__file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+class RecordingClient:
+    """Fetches through a real client and writes every successful response to the archive"""
+    def __init__(self, archive: ResponseArchive, client: HttpClient = None) -> None:
+        self.archive = archive
+        self.client = client if client else HttpClient()
+
+    async def get(self, url: str, headers: Dict[str, str] = None) -> HttpResponse:
+        response = await self.client.get(url, headers=headers)
+        if response.status == 200:
+            self.archive.append(response)
+
+        return response
+
+    async def close(self) -> None:
+        await self.client.close()
+        self.archive.close()
+
+
+class ReplayClient:
+    """Serves every fetch from a recorded archive without touching the network"""
+    def __init__(self, archive: ResponseArchive) -> None:
+        self.archive = archive
+        self.responses = archive.load()
+
+    async def get(self, url: str, headers: Dict[str, str] = None) -> HttpResponse:
+        if url not in self.responses:
+            raise ArchiveMissError(url)
+
+        return self.responses[url]
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,135 @@
+import json
+import os
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from .PageType import PageType
+from .HttpClient import HttpResponse
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class CacheEntry:
+    """A cached page body along with the validators needed to revalidate it"""
+    def __init__(
+        self,
+        url: str,
+        text: str,
+        storedAt: float,
+        etag: str = None,
+        lastModified: str = None,
+    ) -> None:
+        self.url = url
+        self.text = text
+        self.storedAt = storedAt
+        self.etag = etag
+        self.lastModified = lastModified
+
+    def conditionalHeaders(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.lastModified:
+            headers["If-Modified-Since"] = self.lastModified
+
+        return headers
+
+    def toDict(self) -> Dict[str, str]:
+        return {
+            "url": self.url,
+            "text": self.text,
+            "storedAt": self.storedAt,
+            "etag": self.etag,
+            "lastModified": self.lastModified,
+        }
+
+    @staticmethod
+    def fromDict(**kwargs) -> "CacheEntry":
+        return CacheEntry(**kwargs)
+
+
+class ResponseCache:
+    """
+    Disk backed response cache keyed by URL. Entries younger than the TTL of their
+    page type are served without touching the network, stale ones are revalidated
+    with a conditional GET so an unchanged page only costs a 304.
+    """
+    # results of past events practically never change, standings and weekends do
+    TTLS = {
+        PageType.YEAR_SCHEDULE: 7 * DAY,
+        PageType.RACE_WEEKEND: DAY,
+        PageType.CIRCUIT: 30 * DAY,
+        PageType.DRIVER_STANDINGS: 6 * HOUR,
+        PageType.CONSTRUCTOR_STANDINGS: 6 * HOUR,
+        PageType.PRACTICE_RESULT: 30 * DAY,
+        PageType.QUALIFYING_RESULT: 30 * DAY,
+        PageType.RACE_RESULT: 30 * DAY,
+    }
+    DEFAULT_TTL = HOUR
+
+    def __init__(self, directory: str | Path = None, ttls: Dict[PageType, float] = None) -> None:
+        if not directory:
+            directory = Path(__file__).parent / "__cache__" / "responses"
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttls = {**self.TTLS, **ttls} if ttls else self.TTLS
+
+    def __path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    def ttl(self, url: str) -> float:
+        try:
+            return self.ttls.get(PageType.parseType(url), self.DEFAULT_TTL)
+        except Exception:
+            return self.DEFAULT_TTL
+
+    def isFresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.storedAt < self.ttl(entry.url)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        path = self.__path(url)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = CacheEntry.fromDict(**json.load(file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        # guard against hash collisions
+        return entry if entry.url == url else None
+
+    def put(self, url: str, response: HttpResponse) -> CacheEntry:
+        entry = CacheEntry(
+            url=url,
+            text=response.text,
+            storedAt=time.time(),
+            etag=response.headers.get("etag"),
+            lastModified=response.headers.get("last-modified"),
+        )
+        self.__write(entry)
+
+        return entry
+
+    def touch(self, entry: CacheEntry) -> None:
+        """Marks a revalidated (304) entry as fresh again"""
+        entry.storedAt = time.time()
+        self.__write(entry)
+
+    def __write(self, entry: CacheEntry) -> None:
+        path = self.__path(entry.url)
+        tmpPath = path.with_suffix(f".{os.getpid()}.tmp")
+
+        with open(tmpPath, "w", encoding="utf-8") as file:
+            json.dump(entry.toDict(), file)
+
+        os.replace(tmpPath, path)
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
@@ -2,11 +2,13 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from db import Database
+from db import AsyncDatabase, Database, SqliteProfile
 from models import Circuit, Driver, EventType, Race, RaceEvent, Result, DriverStandings
-from models import Constructor, ConstructorStandings
+from models import Alias, Constructor, ConstructorStandings, EntityResolver
 from .Parser import Parser
-from typing import Any, List, Dict, Tuple
+from .ResponseCache import ResponseCache
+from typing import Any, AsyncIterator, List, Dict, Tuple
+from contextlib import asynccontextmanager
 import asyncio
 
 from utils import Utils
@@ -15,10 +17,20 @@ class Scraper:
     """
     Object that scrapes the data from the F1 website and stores it in the database
     """
-    parser = Parser()
-    
-    def __init__(self, dbPath: str = None) -> None:
-        self.db = Database(path=dbPath)
+    def __init__(
+        self,
+        dbPath: str = None,
+        parser: Parser = None,
+        dbProfile: str | SqliteProfile = "performance",
+        db: Database | AsyncDatabase = None,
+    ) -> None:
+        # pass the app's Database in so there is a single writer for the file
+        db = db if db else Database(path=dbPath, profile=dbProfile)
+        # sqlite runs on the database executor, never on the event loop
+        self.db = db if isinstance(db, AsyncDatabase) else AsyncDatabase(db)
+        self.__aliasesLearned = False
+        # the default cache makes its directory, only once a scraper is built
+        self.parser = parser if parser else Parser(cache=ResponseCache())
     
     def __raceDictDigest(self, raceDict: Dict[str, Any]) -> Tuple[Race, List[RaceEvent], Circuit]:
         circuit = raceDict.pop("circuit")
@@ -41,15 +53,62 @@ class Scraper:
         return race, events, circuit
     
     
+    async def __learnAliases(self) -> None:
+        """Has the resolver take the stored aliases before the first name is resolved"""
+        # once per scraper, later ones are queued by the resolver itself; concurrent first
+        # calls may both load them, which is harmless
+        if not self.__aliasesLearned:
+            EntityResolver.get().learn(await self.db.aliases.getAll())
+            self.__aliasesLearned = True
+            
+    
+    async def __recordAliases(self) -> List[Alias]:
+        """Stores the aliases of the names the resolver had to match, for the next scrapes"""
+        aliases = EntityResolver.get().takePending()
+        if aliases:
+            try:
+                await self.db.aliases.record(aliases)
+            except BaseException:
+                EntityResolver.get().requeue(aliases)
+                raise
+        
+        return aliases
+    
+    
+    async def __commitAliases(self) -> None:
+        """Records the aliases and commits them with the writes before, they're queued again if that fails"""
+        aliases = await self.__recordAliases()
+        try:
+            await self.db.commit()
+        except BaseException:
+            EntityResolver.get().requeue(aliases)
+            raise
+    
+    
+    @asynccontextmanager
+    async def __transactionRecordingAliases(self) -> AsyncIterator[None]:
+        """A transaction that records the aliases at its end, they're queued again if it rolls back"""
+        aliases: List[Alias] = []
+        try:
+            async with self.db.transaction():
+                yield
+                aliases = await self.__recordAliases()
+        except BaseException:
+            EntityResolver.get().requeue(aliases)
+            raise
+            
+    
     async def saveAllRaces(self, year: int) -> None:
         """
         Scrapes all Race, RaceEvent and Circuit data for a given year and stores it in the database
         """
+        self.parser.resetStats()
         urls = await self.parser.getRaceUrls(year)
         
         tasks = [self.parser.getRace(url, idx + 1) for idx, url in enumerate(urls)]
             
         racesDicts = await asyncio.gather(*tasks)
+        await self.__learnAliases()
         
         races, events, circuits = [], [], []
         for raceDict in racesDicts:
@@ -58,113 +117,189 @@ class Scraper:
             events.extend(e)
             circuits.append(c)
             
-        self.db.circuits.insertOrUpdateMany(circuits)
-        self.db.races.insertOrUpdateMany(races)
-        self.db.events.insertOrUpdateMany(events)
+        async with self.__transactionRecordingAliases():
+            await self.db.circuits.insertOrUpdateMany(circuits)
+            await self.db.races.insertOrUpdateMany(races)
+            await self.db.events.insertOrUpdateMany(events)
+        
+        self.__printParserStats(f"races of {year}")
         
-        self.db.commit()
         
+    def __printParserStats(self, scrape: str) -> None:
+        stats = self.parser.stats()
+        print(
+            f"Scraped {scrape}: {stats['fetches']} page fetches ({stats['coalescedFetches']} coalesced), "
+            f"{stats['objects']} parsed objects ({stats['coalescedObjects']} coalesced)"
+        )
         
     
     async def saveEventResults(self, url: str, eventId: str) -> None:
         """
         Scrapes the results of a given event and stores it in the database
         """
-        parsedResults = await self.parser.getEventResults(url, eventId)
-        
-        results = []
-        for result in parsedResults:
-            result.pop("eventTitle")
-            driverName = " ".join(result.pop("driverName").split()[:-1])
-            result["driverId"] = Driver.getDriverId(driverName)
-            result["constructorId"] = Constructor.getConstructorId(result.pop("constructorName"))
-            results.append(Result.fromDict(**result))
+        rows = await self.__getEventResultRows(url, eventId)
+        
+        await self.db.results.insertOrUpdateRows(eventId, rows)
+        await self.__commitAliases()
+        
+    
+    async def __getEventResultRows(self, url: str, eventId: str) -> List[Tuple]:
+        """
+        Scrapes the results of an event as upsert rows, saving the drivers and constructors
+        they reference first if any are missing
+        """
+        table = await self.parser.getEventResultRows(url)
+        await self.__learnAliases()
+        
+        # rows go from the parsed table straight to the upsert parameters, no Result objects
+        type_, rows = Result.rowsFromTable(eventId, table["columns"], table["rows"])
+        fields = list(type_.__dataclass_fields__.keys())
+        driverIdx = fields.index("driverId")
+        constructorIdx = fields.index("constructorId")
             
-        allConstructorsExistInDb = all([
-            self.db.constructors.exists(id_=result.constructorId) for result in results
-        ])
+        missingConstructors = await self.db.constructors.missingKeys(row[constructorIdx] for row in rows)
         
-        if not allConstructorsExistInDb:
+        if missingConstructors:
             await self.saveConstructorsAndStandings(RaceEvent.getEventYear(eventId))
             
-        allDriversExistInDb = all([
-            self.db.drivers.exists(id_=result.driverId) for result in results
-        ])
+        missingDrivers = await self.db.drivers.missingKeys(row[driverIdx] for row in rows)
         
-        if not allDriversExistInDb:
+        if missingDrivers:
             await self.saveDriversAndStandings(RaceEvent.getEventYear(eventId))
         
-        self.db.results.insertOrUpdateMany(results)
-        self.db.commit()
+        return rows
     
     
     async def saveRaceResults(self, year: int, round_: int) -> None:
+        weekend = await self.__getRaceResultRows(year, round_)
+        
+        await self.__saveWeekend(weekend)
+        await self.__commitAliases()
+        
+    
+    async def __getRaceResultRows(self, year: int, round_: int) -> List[Tuple[str, List[Tuple]]]:
+        """The eventIds and upsert rows of the weekend's events that have results but none stored"""
         raceUrls = await self.parser.getRaceUrls(year)
         raceUrl = raceUrls[round_ - 1]
         raceId = Race.formatRaceId(year, round_)
         
         parsedEvents = (await self.parser.getRace(raceUrl, round_))["events"]
-        tasks = []
+        eventIds = [RaceEvent.formatEventId(raceId, event["title"]) for event in parsedEvents]
+        missingEventIds = set(await self.db.results.missingKeys(eventIds, ["eventId"]))
+        scrapeEventIds, tasks = [], []
         
-        for event in parsedEvents:
-            eventId = RaceEvent.formatEventId(raceId, event["title"])
+        for event, eventId in zip(parsedEvents, eventIds):
             resultLink = event["resultLink"]
             
             # If it's a future event or we already have the results for the event
-            if not resultLink or self.db.results.exists(eventId=eventId):
+            if not resultLink or eventId not in missingEventIds:
                 continue
             
-            tasks.append(self.saveEventResults(resultLink, eventId))
+            scrapeEventIds.append(eventId)
+            tasks.append(self.__getEventResultRows(resultLink, eventId))
             
-        await asyncio.gather(*tasks)
+        eventRows = await asyncio.gather(*tasks)
+        
+        return list(zip(scrapeEventIds, eventRows))
+    
+    
+    async def __saveWeekend(self, weekend: List[Tuple[str, List[Tuple]]]) -> None:
+        # the weekend is written as one writer job so a failing round rolls back alone,
+        # without another task's writes landing inside its savepoint
+        def saveWeekend(db: Database) -> None:
+            with db.savepoint():
+                for eventId, rows in weekend:
+                    db.results.insertOrUpdateRows(eventId, rows)
+        
+        await self.db.atomic(saveWeekend)
         
     
     async def saveAllResults(self, year: int) -> None:
+        self.parser.resetStats()
         raceUrls = await self.parser.getRaceUrls(year)
         
-        getRounds = []
-        for round_ in range(1, len(raceUrls) + 1):
-            eventId = f"{year}_{round_}_RACE"
-            if not self.db.results.exists(eventId=eventId):
-                getRounds.append(round_)
+        rounds = range(1, len(raceUrls) + 1)
+        missingEventIds = set(await self.db.results.missingKeys(
+            (f"{year}_{round_}_RACE" for round_ in rounds), ["eventId"]
+        ))
+        getRounds = [round_ for round_ in rounds if f"{year}_{round_}_RACE" in missingEventIds]
+        
+        # the season is scraped first so the transaction only holds up other writers for
+        # the writes
+        weekends = await asyncio.gather(
+            *(self.__getRaceResultRows(year, round_) for round_ in getRounds), return_exceptions=True
+        )
+        
+        # one commit for the whole season, rounds that fail are rolled back on their own
+        outcomes: List[BaseException | None] = []
+        async with self.__transactionRecordingAliases():
+            for weekend in weekends:
+                if isinstance(weekend, BaseException):
+                    outcomes.append(weekend)
+                    continue
                 
-        tasks = [self.saveRaceResults(year, round_) for round_ in getRounds]
-        await asyncio.gather(*tasks)
+                try:
+                    await self.__saveWeekend(weekend)
+                    outcomes.append(None)
+                except Exception as error:
+                    outcomes.append(error)
+        
+        failures = [
+            (round_, outcome) for round_, outcome in zip(getRounds, outcomes)
+            if isinstance(outcome, BaseException)
+        ]
+        for round_, error in failures:
+            print(f"Failed to scrape results of {year} round {round_}: {error!r}")
+        
+        self.__printParserStats(f"results of {year}")
+        
+        if failures:
+            raise failures[0][1]
         
             
     async def saveRace(self, year: int, round_: int) -> None:
         urls = await self.parser.getRaceUrls(year)
         
         raceDict = await self.parser.getRace(urls[round_ - 1], round_)
+        await self.__learnAliases()
         
         race, events, circuit = self.__raceDictDigest(raceDict)
         
-        self.db.circuits.insertOrUpdate(circuit)
-        self.db.races.insertOrUpdate(race)
-        self.db.events.insertOrUpdateMany(events)
-        
-        self.db.commit()
+        await self.db.circuits.insertOrUpdate(circuit)
+        await self.db.races.insertOrUpdate(race)
+        await self.db.events.insertOrUpdateMany(events)
+        await self.__commitAliases()
     
     
     async def saveDriversAndStandings(self, year: int) -> List[DriverStandings]:
         standingsDicts = await self.parser.getDriverStandings(year)
+        await self.__learnAliases()
         
-        allConstructorsExistInDb = all([
-            self.db.constructors.exists(name=standingDict["constructorName"]) for standingDict in standingsDicts
-        ])
+        missingConstructors = await self.db.constructors.missingKeys(
+            (standingDict["constructorName"] for standingDict in standingsDicts), ["name"]
+        )
         
-        if not allConstructorsExistInDb:
+        if missingConstructors:
             await self.saveConstructorsAndStandings(year)
         
+        # every name is split and resolved once, for both the drivers and the standings
+        names = [Utils.getNameAndShortName(standingDict["driverName"]) for standingDict in standingsDicts]
+        driverIds = Driver.getDriverIds(name for name, _ in names)
+        constructorIds = Constructor.getConstructorIds(
+            standingDict["constructorName"] for standingDict in standingsDicts
+        )
+        
         drivers = [
             Driver(
-                name=Utils.getNameAndShortName(standingDict["driverName"])[0],
-                shortName=Utils.getNameAndShortName(standingDict["driverName"])[1],
+                name=name,
+                shortName=shortName,
                 nationality=standingDict["nationality"],
-                constructorId=Constructor.getConstructorId(standingDict["constructorName"])
+                constructorId=constructorId,
+                id_=driverId,
             )
             
-            for standingDict in standingsDicts
+            for standingDict, (name, shortName), driverId, constructorId
+            in zip(standingsDicts, names, driverIds, constructorIds)
         ]
         
         standings = [
@@ -172,28 +307,31 @@ class Scraper:
                 year=year,
                 position=standingDict["position"],
                 points=standingDict["points"],
-                driverId=Driver.getDriverId(Utils.getNameAndShortName(standingDict["driverName"])[0]),
-                constructorId=Constructor.getConstructorId(standingDict["constructorName"]),
+                driverId=driverId,
+                constructorId=constructorId,
             )
             
-            for standingDict in standingsDicts
+            for standingDict, driverId, constructorId in zip(standingsDicts, driverIds, constructorIds)
         ]
         
-        self.db.drivers.insertOrUpdateMany(drivers)
-        self.db.driverStandings.insertOrUpdateMany(standings)
-        
-        self.db.commit()
+        await self.db.drivers.insertOrUpdateMany(drivers)
+        await self.db.driverStandings.insertOrUpdateMany(standings)
+        await self.__commitAliases()
     
     
     async def saveConstructorsAndStandings(self, year: int) -> List[ConstructorStandings]:
         standingsDicts = await self.parser.getConstructorStandings(year)
+        await self.__learnAliases()
+        
+        constructorIds = Constructor.getConstructorIds(standing["constructorName"] for standing in standingsDicts)
         
         constructors = [
             Constructor(
                 name=standing["constructorName"],
+                id_=constructorId,
             )
             
-            for standing in standingsDicts
+            for standing, constructorId in zip(standingsDicts, constructorIds)
         ]
         
         standings = [
@@ -201,14 +339,13 @@ class Scraper:
                 year=year,
                 position=standing["position"], 
                 points=standing["points"],
-                constructorId=Constructor.getConstructorId(standing["constructorName"])
+                constructorId=constructorId,
             )
             
-            for standing in standingsDicts
+            for standing, constructorId in zip(standingsDicts, constructorIds)
         ]
         
-        self.db.constructors.insertOrUpdateMany(constructors)
-        self.db.constructorStandings.insertOrUpdateMany(standings)
-        
-        self.db.commit()
+        await self.db.constructors.insertOrUpdateMany(constructors)
+        await self.db.constructorStandings.insertOrUpdateMany(standings)
+        await self.__commitAliases()
         
\ No newline at end of file
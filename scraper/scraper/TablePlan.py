@@ -0,0 +1,55 @@
+from bs4 import BeautifulSoup, NavigableString, Tag
+from typing import *
+
+
+class TablePlan:
+    """
+    The header of a results/standings table compiled once into the property name of
+    every column, so rows can be read straight into tuples without re-mapping each cell
+    """
+    def __init__(self, columns: Iterable[str]) -> None:
+        self.columns = tuple(columns)
+        self.width = len(self.columns)
+
+    @staticmethod
+    def cellText(cell: Tag) -> str:
+        """Same as " ".join(cell.stripped_strings) without the generator machinery"""
+        parts = []
+        for node in cell.descendants:
+            if type(node) is NavigableString:
+                text = node.strip()
+                if text:
+                    parts.append(text)
+
+        return " ".join(parts)
+
+    def extractRow(self, tr: Tag) -> Tuple[str, ...]:
+        # empty cells are dropped and the missing values are padded back in before the
+        # last column, that's the only place the F1 tables leave cells empty
+        cellText = self.cellText
+        values = [
+            text
+            for text in (cellText(cell) for cell in tr.contents if cell.name)
+            if text
+        ]
+
+        missing = self.width - len(values)
+        if missing > 0:
+            values[-1:-1] = [""] * missing
+
+        return tuple(values)
+
+    def extractRows(self, table: BeautifulSoup) -> List[Tuple[str, ...]]:
+        return [self.extractRow(tr) for tr in table.tbody.contents if tr.name == "tr"]
+
+    def toDicts(
+        self, rows: Iterable[Tuple[str, ...]], initial: dict[str, str] = {}
+    ) -> List[dict[str, str]]:
+        columns = self.columns
+        records = []
+        for row in rows:
+            record = initial.copy()
+            record.update(zip(columns, row))
+            records.append(record)
+
+        return records
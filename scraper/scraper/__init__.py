@@ -1,3 +1,11 @@
+from .RateLimiter import RateLimiter, HostLimiter, TokenBucket, AdaptiveConcurrencyLimit
+from .HttpClient import HttpClient, HttpResponse, HttpError
+from .PageType import PageType
+from .ResponseArchive import ResponseArchive, RecordingClient, ReplayClient, ArchiveMissError
+from .ResponseCache import ResponseCache, CacheEntry
+from .Coalescer import Coalescer, coalesced
+from .TablePlan import TablePlan
+from .PageParser import PageParser
 from .Parser import Parser
 from .Scraper import Scraper
         
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Event loop lag while tasks hammer the database: calling Database straight from the
+coroutines, the way handlers and the scraper did, against awaiting the AsyncDatabase
+facade. A ticker task sleeps 1ms at a time and records how late it wakes up, which is
+how long any other request on the loop would have waited. Run from the scraper directory with
+
+    python -m tests.benchmarks.bench_async_db [-t TASKS] [-o OPERATIONS] [-r ROWS]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from db import AsyncDatabase, Database
+from models import ConstructorStandings
+
+TICK = 0.001
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def load(db: Database, asyncDb: AsyncDatabase, tasks: int, operations: int) -> float:
+    def standings(task: int, i: int) -> list[ConstructorStandings]:
+        year = 1000 + task * operations + i
+        return [ConstructorStandings(year, position, 10 - position, "2") for position in range(1, 11)]
+
+    async def syncTask(task: int) -> None:
+        for i in range(operations):
+            db.constructorStandings.insertOrUpdateMany(standings(task, i))
+            db.commit()
+            db.constructorStandings.getAll()
+            await asyncio.sleep(0)
+
+    async def asyncTask(task: int) -> None:
+        for i in range(operations):
+            await asyncDb.constructorStandings.insertOrUpdateMany(standings(task, i))
+            await asyncDb.commit()
+            await asyncDb.constructorStandings.getAll()
+
+    work = asyncTask if asyncDb else syncTask
+    start = time.perf_counter()
+    await asyncio.gather(*(work(task) for task in range(tasks)))
+
+    return time.perf_counter() - start
+
+
+async def measure(mode: str, tasks: int, operations: int, rows: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        db = Database(path=str(Path(directory) / "bench.sqlite3"))
+        db.initialize()
+        db.rawDogg("INSERT INTO constructors VALUES ('Red Bull Racing', '2')")
+        # a table big enough that reading it back takes a while
+        db.constructorStandings.insertMany(
+            [ConstructorStandings(year, 1, 0, "2") for year in range(-rows, 0)]
+        )
+        db.commit()
+        asyncDb = AsyncDatabase(db) if mode == "async" else None
+
+        lags, stop = [], asyncio.Event()
+        tick = asyncio.create_task(ticker(lags, stop))
+        elapsed = await load(db, asyncDb, tasks, operations)
+        stop.set()
+        await tick
+
+        if asyncDb:
+            await asyncDb.close()
+        else:
+            db.close()
+
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "median": statistics.median(lags) * 1000,
+        "p99": lags[int(len(lags) * 0.99)] * 1000,
+        "max": lags[-1] * 1000,
+    }
+
+
+def main(tasks: int, operations: int, rows: int) -> None:
+    print(f"{tasks} tasks x {operations} write/commit/read rounds, {rows} rows read back each round")
+
+    for mode in ("sync", "async"):
+        result = asyncio.run(measure(mode, tasks, operations, rows))
+        print(
+            f"{mode:>6}: {result['elapsed']:6.2f}s loop lag median {result['median']:7.2f}ms"
+            f" p99 {result['p99']:7.2f}ms max {result['max']:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-t", "--tasks", type=int, default=8)
+    argparser.add_argument("-o", "--operations", type=int, default=50)
+    argparser.add_argument("-r", "--rows", type=int, default=5000)
+    args = argparser.parse_args()
+
+    main(args.tasks, args.operations, args.rows)
@@ -0,0 +1,100 @@
+"""
+Threads writing and reading one SQLite file: through a single shared connection behind
+a lock, the way every table shared one cursor before, against the ConnectionManager's
+writer thread and reader pool. Run from the scraper directory with
+
+    python -m tests.benchmarks.bench_connections [-t THREADS] [-o OPERATIONS] [-p PROFILE]
+"""
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from db import ConnectionManager, SingleConnection, SqliteProfile
+
+INSERT = "INSERT INTO laps (driverId, time) VALUES (?, ?)"
+SELECT = "SELECT COUNT(*), MIN(time) FROM laps WHERE driverId = ?"
+
+
+class LockedConnection(SingleConnection):
+    """One connection shared by every thread, each job holding the lock"""
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        super().__init__(conn)
+        self.lock = threading.Lock()
+
+    def read(self, job):
+        with self.lock:
+            return job(self.conn)
+
+    def write(self, job, control: bool = False):
+        with self.lock:
+            return job(self.conn)
+
+    def commit(self) -> None:
+        with self.lock:
+            self.conn.commit()
+
+
+def runThreads(threads: int, work: Callable[[int], None]) -> float:
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return time.perf_counter() - start
+
+
+def measure(connections, threads: int, operations: int) -> tuple[float, float]:
+    connections.write(lambda conn: conn.execute("CREATE TABLE laps (driverId TEXT, time REAL)"))
+    connections.write(lambda conn: conn.execute("CREATE INDEX lapsDriver ON laps (driverId)"))
+    connections.commit()
+
+    def writer(thread: int):
+        for i in range(operations):
+            connections.write(lambda conn: conn.execute(INSERT, (f"{thread}-drv", i * 0.1)))
+            connections.commit()
+
+    def reader(thread: int):
+        for i in range(operations):
+            connections.read(lambda conn: conn.execute(SELECT, (f"{i % threads}-drv",)).fetchone())
+
+    writes = threads * operations / runThreads(threads, writer)
+    reads = threads * operations / runThreads(threads, reader)
+
+    return writes, reads
+
+
+def main(threads: int, operations: int, profile: SqliteProfile) -> None:
+    print(f"{threads} threads x {operations} operations, {profile.name} profile")
+
+    for name in ("shared connection", "connection manager"):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "bench.sqlite3"
+
+            if name == "shared connection":
+                conn = sqlite3.connect(path, check_same_thread=False)
+                profile.apply(conn)
+                connections = LockedConnection(conn)
+            else:
+                connections = ConnectionManager(path, profile, readers=threads)
+
+            writes, reads = measure(connections, threads, operations)
+            connections.close()
+
+        print(f"{name:>19}: {writes:8.0f} committed writes/s {reads:8.0f} reads/s")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-t", "--threads", type=int, default=8)
+    argparser.add_argument("-o", "--operations", type=int, default=500)
+    argparser.add_argument("-p", "--profile", default="performance")
+    args = argparser.parse_args()
+
+    main(args.threads, args.operations, SqliteProfile.get(args.profile))
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of GenericDatabase bulk writes and reads: the old per-row reflection
+and statement formatting against the statements and extractors compiled at
+construction. Run from the scraper directory with
+
+    python -m tests.benchmarks.bench_db [-r ROWS] [-n REPEATS]
+"""
+import argparse
+import sqlite3
+import timeit
+
+from models import DriverStandings
+from db.genericDb import GenericDatabase, PK
+
+
+def makeStandings(rows: int) -> list[DriverStandings]:
+    return [
+        DriverStandings(2000 + i // 25, i % 25 + 1, i % 400, f"{i}-drv", str(i % 10))
+        for i in range(rows)
+    ]
+
+
+def fields(db: GenericDatabase) -> list[str]:
+    return [field for field in db.type.__dataclass_fields__.keys()]
+
+
+def legacyInsertMany(cursor: sqlite3.Cursor, db: GenericDatabase, instances) -> None:
+    """The write path as it was before the compiled statements, kept here as the reference"""
+    values = [tuple(getattr(instance, field) for field in fields(db)) for instance in instances]
+
+    cursor.executemany(db.insertStatement(fields(db)), values)
+
+
+def legacyGetAll(cursor: sqlite3.Cursor, db: GenericDatabase):
+    cursor.execute(f"SELECT * FROM {db.tableName}")
+
+    return [db.type(**dict(zip(fields(db), row))) for row in cursor.fetchall()]
+
+
+def main(rows: int, repeats: int) -> None:
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    db = GenericDatabase[DriverStandings](
+        cursor, DriverStandings, PK(DriverStandings, ["year", "driverId"]), "driverStandings"
+    )
+    db.initialize()
+    standings = makeStandings(rows)
+
+    def clear():
+        cursor.execute(f"DELETE FROM {db.tableName}")
+
+    def timed(func, setup=clear):
+        return min(timeit.repeat(func, setup=setup, number=1, repeat=repeats))
+
+    legacyInsert = timed(lambda: legacyInsertMany(cursor, db, standings))
+    insert = timed(lambda: db.insertMany(standings))
+    upsert = timed(lambda: db.insertOrUpdateMany(standings), setup=lambda: None)
+
+    assert legacyGetAll(cursor, db) == db.getAll()
+    legacyRead = timed(lambda: legacyGetAll(cursor, db), setup=lambda: None)
+    read = timed(db.getAll, setup=lambda: None)
+
+    print(f"{rows} rows, best of {repeats}")
+    for name, best, baseline in (
+        ("legacy insert", legacyInsert, legacyInsert),
+        ("insert", insert, legacyInsert),
+        ("upsert existing", upsert, legacyInsert),
+        ("legacy read", legacyRead, legacyRead),
+        ("read", read, legacyRead),
+    ):
+        print(f"{name:>15}: {best * 1e6 / rows:8.2f} us/row  ({baseline / best:.2f}x)")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-r", "--rows", type=int, default=100_000)
+    argparser.add_argument("-n", "--repeats", type=int, default=3)
+    args = argparser.parse_args()
+
+    main(args.rows, args.repeats)
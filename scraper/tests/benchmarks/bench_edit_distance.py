@@ -0,0 +1,77 @@
+"""
+Fuzzy matching scraped constructor and circuit names against every alias in the
+constants files: the full matrix edit distance, the bit-parallel one, with the
+resolver's cutoff, and batched with the cutoff. Run from the scraper directory with
+
+    python -m tests.benchmarks.bench_edit_distance [-n REPEATS]
+"""
+import argparse
+import json
+import timeit
+
+import models  # before utils, which imports it
+from utils import Utils
+from tests.benchmarks.bench_entity_resolver import CONSTRUCTOR_NAMES
+from tests.utils.test_edit_distance import matrixEditDistance
+
+CIRCUIT_NAMES = [
+    "Bahrain International Circuit", "Jeddah Corniche Circuit", "Albert Park Grand Prix Circuit",
+    "Autodromo Enzo e Dino Ferrari", "Circuit de Monaco", "Circuit de Barcelona-Catalunya",
+    "Silverstone Circuit", "Hungaroring", "Circuit de Spa-Francorchamps", "Marina Bay Street Circuit",
+]
+
+
+def bestMatch(queries: list[str], aliases: list[str], cutoff: int, distances) -> list[int]:
+    """Index of the first closest alias within the cutoff for each query, like the resolver"""
+    matches = []
+    for query in queries:
+        best, bestDistance = None, cutoff
+        for idx, distance in enumerate(distances(query, aliases)):
+            if distance < bestDistance:
+                best, bestDistance = idx, distance
+        matches.append(best)
+
+    return matches
+
+
+def main(repeats: int) -> None:
+    with open("constants/constructors.json") as f:
+        constructors = [alias.lower() for constructor in json.load(f) for alias in constructor["names"]]
+    with open("constants/circuits.json") as f:
+        circuits = [circuit["name"] for circuit in json.load(f)]
+
+    cases = [
+        ("constructors", [name.lower() for name in CONSTRUCTOR_NAMES], constructors, 30),
+        ("circuits", CIRCUIT_NAMES, circuits, 20),
+    ]
+    methods = {
+        "matrix": lambda cutoff: lambda query, aliases: [matrixEditDistance(query, alias) for alias in aliases],
+        "bit-parallel": lambda cutoff: lambda query, aliases: [Utils.editDistance(query, alias) for alias in aliases],
+        "bounded": lambda cutoff: lambda query, aliases: [
+            Utils.editDistance(query, alias, cutoff - 1) for alias in aliases
+        ],
+        "batched": lambda cutoff: lambda query, aliases: Utils.editDistances(query, aliases, cutoff - 1),
+    }
+
+    for name, queries, aliases, cutoff in cases:
+        print(f"{name}: {len(queries)} names x {len(aliases)} aliases")
+        reference = bestMatch(queries, aliases, cutoff, methods["matrix"](cutoff))
+        baseline = None
+
+        for method, distances in methods.items():
+            distances = distances(cutoff)
+            assert bestMatch(queries, aliases, cutoff, distances) == reference, f"{method} matched differently"
+
+            seconds = min(timeit.repeat(
+                lambda: bestMatch(queries, aliases, cutoff, distances), number=1, repeat=repeats
+            )) / len(queries)
+            baseline = baseline or seconds
+            print(f"{method:>14}: {seconds * 1e6:9.1f} us/name {baseline / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-n", "--repeats", type=int, default=5)
+    args = argparser.parse_args()
+
+    main(args.repeats)
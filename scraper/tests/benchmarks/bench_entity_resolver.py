@@ -0,0 +1,96 @@
+"""
+Time per results row to resolve the driver and constructor ids: re-reading and
+scanning the constants files on every call, the way the models did, against the
+EntityResolver, row by row and a table of TABLE_SIZE rows at a time. Run from the
+scraper directory with
+
+    python -m tests.benchmarks.bench_entity_resolver [-r ROWS] [-t TABLE_SIZE]
+"""
+import argparse
+import json
+import time
+
+from models import EntityResolver
+from utils import Utils
+
+# how the results tables spell them, most are not an exact alias
+CONSTRUCTOR_NAMES = [
+    "Red Bull Racing Honda RBPT", "Ferrari", "Mercedes", "Aston Martin Aramco Mercedes",
+    "McLaren Mercedes", "Alpine Renault", "Williams Mercedes", "Haas Ferrari",
+    "Alfa Romeo Ferrari", "AlphaTauri Honda RBPT",
+]
+
+
+def legacyDriverId(name: str) -> str:
+    with open("constants/drivers.json", "r") as f:
+        for driver in json.load(f):
+            if driver["name"] == name:
+                return driver["id"]
+
+
+def legacyConstructorId(name: str):
+    bestDistance = 30
+    best = None
+    for constructor in json.load(open("constants/constructors.json")):
+        for n in constructor["names"]:
+            editDistance = Utils.editDistance(name.lower(), n.lower())
+            if editDistance < bestDistance:
+                bestDistance = editDistance
+                best = constructor["id"]
+
+    return best
+
+
+def makeRows(rows: int) -> list[tuple[str, str]]:
+    with open("constants/drivers.json", "r") as f:
+        drivers = [driver["name"] for driver in json.load(f)][-20:]
+
+    return [(drivers[i % len(drivers)], CONSTRUCTOR_NAMES[i // 2 % len(CONSTRUCTOR_NAMES)]) for i in range(rows)]
+
+
+def timeRows(rows, driverId, constructorId) -> tuple[float, list]:
+    start = time.perf_counter()
+    ids = [(driverId(driver), constructorId(constructor)) for driver, constructor in rows]
+
+    return (time.perf_counter() - start) / len(rows), ids
+
+
+def timeTables(rows, tableSize: int, resolver: EntityResolver) -> tuple[float, list]:
+    start = time.perf_counter()
+    ids = []
+    for first in range(0, len(rows), tableSize):
+        table = rows[first:first + tableSize]
+        ids.extend(zip(
+            resolver.driverIds(driver for driver, _ in table),
+            resolver.constructorIds(constructor for _, constructor in table),
+        ))
+
+    return (time.perf_counter() - start) / len(rows), ids
+
+
+def main(rows: int, tableSize: int) -> None:
+    table = makeRows(rows)
+    resolver = EntityResolver()
+
+    legacy, legacyIds = timeRows(table, legacyDriverId, legacyConstructorId)
+    cold, resolvedIds = timeRows(table, resolver.driverId, resolver.constructorId)
+    warm, _ = timeRows(table, resolver.driverId, resolver.constructorId)
+    batched, batchedIds = timeTables(table, tableSize, resolver)
+
+    assert resolvedIds == legacyIds, "the resolver disagrees with the legacy lookups"
+    assert batchedIds == legacyIds, "the batches disagree with the legacy lookups"
+
+    print(f"{rows} rows")
+    print(f"{'legacy':>16}: {legacy * 1e6:10.1f} us/row")
+    print(f"{'resolver, cold':>16}: {cold * 1e6:10.1f} us/row")
+    print(f"{'resolver, warm':>16}: {warm * 1e6:10.1f} us/row")
+    print(f"{'batched, warm':>16}: {batched * 1e6:10.1f} us/row, {tableSize} rows per table")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-r", "--rows", type=int, default=400)
+    argparser.add_argument("-t", "--table-size", type=int, default=20)
+    args = argparser.parse_args()
+
+    main(args.rows, args.table_size)
@@ -0,0 +1,78 @@
+"""
+Fuzzy lookup latency as the alias list grows: scoring every alias with the batched
+edit distance against searching the BKTree, both with the constructors' cutoff.
+Aliases are made up team names, queries are aliases with a few typos. Run from the
+scraper directory with
+
+    python -m tests.benchmarks.bench_fuzzy_index [-s SIZES ...] [-q QUERIES]
+"""
+import argparse
+import random
+import time
+
+import models  # before utils, which imports it
+from utils import BKTree, Utils
+
+WORDS = [
+    "racing", "team", "f1", "formula", "one", "scuderia", "motorsport", "grand", "prix",
+    "honda", "mercedes", "ferrari", "renault", "ford", "cosworth", "petronas", "aramco",
+    "red", "bull", "blue", "green", "lotus", "tyrrell", "brabham", "march", "arrows",
+]
+CUTOFF = 30
+
+
+def makeAliases(count: int, rng: random.Random) -> list[str]:
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) + f" {i}" for i in range(count)]
+
+
+def misspell(alias: str, rng: random.Random) -> str:
+    chars = list(alias)
+    for _ in range(rng.randint(1, 3)):
+        position = rng.randrange(len(chars))
+        chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+
+    return "".join(chars)
+
+
+def scan(word: str, aliases: list[str]):
+    best = None
+    for idx, distance in enumerate(Utils.editDistances(word, aliases, CUTOFF - 1)):
+        if distance < CUTOFF and (best is None or distance < best[1]):
+            best = (idx, distance)
+
+    return best
+
+
+def main(sizes: list[int], queries: int) -> None:
+    rng = random.Random(42)
+    print(f"{queries} lookups per size, cutoff {CUTOFF}")
+
+    for size in sizes:
+        aliases = makeAliases(size, rng)
+        start = time.perf_counter()
+        tree = BKTree(aliases)
+        build = time.perf_counter() - start
+        words = [misspell(rng.choice(aliases), rng) for _ in range(queries)]
+
+        start = time.perf_counter()
+        expected = [scan(word, aliases) for word in words]
+        scanned = (time.perf_counter() - start) / queries
+
+        start = time.perf_counter()
+        found = [tree.closest(word, CUTOFF - 1) for word in words]
+        searched = (time.perf_counter() - start) / queries
+
+        assert found == expected, "the tree found different matches than the scan"
+        print(
+            f"{size:>7} aliases: scan {scanned * 1e3:8.2f} ms, tree {searched * 1e3:8.2f} ms "
+            f"({scanned / searched:5.1f}x), tree built in {build:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-s", "--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    argparser.add_argument("-q", "--queries", type=int, default=50)
+    args = argparser.parse_args()
+
+    main(args.sizes, args.queries)
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark of results table row extraction: the old per-cell header mapping
+against the compiled TablePlan. Run from the scraper directory with
+
+    python -m tests.benchmarks.bench_parse_table [-r ROWS] [-n REPEATS]
+"""
+import argparse
+import timeit
+
+from bs4 import BeautifulSoup
+
+from scraper.PageParser import PageParser
+
+HEADERS = ["Pos", "No", "Driver", "Car", "Laps", "Time / Retired", "Pts"]
+
+
+def makeTable(rows: int) -> BeautifulSoup:
+    header = "".join(f"<th>{header}</th>" for header in HEADERS)
+    body = "".join(
+        "<tr>"
+        f"<td><p>{i + 1}</p></td><td><p>{i % 99}</p></td>"
+        f"<td><p><span>Max</span> <span>Verstappen</span><span>VER</span></p></td>"
+        f"<td><p>Red Bull Racing Honda RBPT</p></td><td><p>57</p></td>"
+        f"<td><p>{'' if i % 7 else '1:33:56.736'}</p></td><td><p>{i % 26}</p></td>"
+        "</tr>\n"
+        for i in range(rows)
+    )
+    html = f"<table><thead><tr>{header}</tr></thead><tbody>\n{body}</tbody></table>"
+
+    return BeautifulSoup(html, "html.parser").find("table")
+
+
+def camelCase(string: str) -> str:
+    if not string or not string.strip():
+        return ""
+
+    split = string.split()
+    res = [split[0].lower()]
+    res.extend([word.capitalize() for word in split[1:]])
+
+    return "".join(res)
+
+
+def propMapper(stat: str, mapper: dict[str, str]) -> str:
+    if camelCase(stat) in mapper:
+        return mapper[camelCase(stat)]
+
+    return camelCase(stat)
+
+
+def legacyParseTable(table, propMap={}, initial={}):
+    """The row loop as it was before the column plan, kept here as the reference"""
+    infos = [ele.lower() for ele in table.thead.tr.stripped_strings]
+
+    tableData = []
+    for child in table.tbody.children:
+        if child == "\n":
+            continue
+
+        rowData = []
+        for ch in child.children:
+            joined = " ".join(ch.stripped_strings)
+            if joined:
+                rowData.append(joined)
+
+        while len(rowData) < len(infos):
+            end = rowData.pop()
+            rowData.append("")
+            rowData.append(end)
+
+        row = initial.copy()
+        for ind, res in enumerate(rowData):
+            row[propMapper(infos[ind].lower(), propMap)] = res
+
+        tableData.append(row)
+
+    return tableData
+
+
+def planParseTable(table, propMap={}, initial={}):
+    plan = PageParser.compileTablePlan(table, propMap)
+
+    return plan.toDicts(plan.extractRows(table), initial)
+
+
+def main(rows: int, repeats: int) -> None:
+    table = makeTable(rows)
+    propMap = PageParser.RESULTS_PROP_MAP
+    initial = {"eventId": "2023_1_RACE", "eventTitle": "RACE"}
+
+    assert legacyParseTable(table, propMap, initial) == planParseTable(table, propMap, initial)
+
+    plan = PageParser.compileTablePlan(table, propMap)
+    timings = {
+        "legacy dicts": lambda: legacyParseTable(table, propMap, initial),
+        "plan dicts": lambda: planParseTable(table, propMap, initial),
+        "plan tuples": lambda: plan.extractRows(table),
+    }
+
+    print(f"{rows} rows, best of {repeats}")
+    baseline = None
+    for name, func in timings.items():
+        best = min(timeit.repeat(func, number=1, repeat=repeats))
+        baseline = baseline if baseline else best
+        print(f"{name:>14}: {best * 1e6 / rows:8.2f} us/row  ({baseline / best:.2f}x)")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-r", "--rows", type=int, default=5000)
+    argparser.add_argument("-n", "--repeats", type=int, default=5)
+    args = argparser.parse_args()
+
+    main(args.rows, args.repeats)
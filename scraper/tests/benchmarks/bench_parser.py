@@ -0,0 +1,173 @@
+"""
+Benchmarks every public Parser call against the stored HTML fixtures (see
+tests/test_data/prepare_data.py) through MockRequests, so only parsing is timed.
+Reports per-call latency, pages/sec and peak memory and compares them with a stored
+baseline, exiting non-zero when any call regressed. A baseline has to be recorded first,
+without one the run fails unless --allow-missing-baseline is given. Run from the scraper
+directory:
+
+    python -m tests.benchmarks.bench_parser --save-baseline    # once, on your machine
+    python -m tests.benchmarks.bench_parser                    # after every parser change
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import *
+from unittest.mock import patch
+
+from scraper.Parser import Parser
+from scraper.HttpClient import HttpClient
+from tests.infrastructure.mocks import MockRequests
+
+CONFIG_PATH = "tests/test_data/config/2023_config.json"
+BASELINE_PATH = "tests/benchmarks/baselines/parser.json"
+
+RACE_URL = "https://www.formula1.com/en/racing/2023/brazil"
+RESULTS_URL = "https://www.formula1.com/en/results/2023/races/1224/brazil"
+
+# name -> (pages fetched per call, the call)
+CASES: Dict[str, Tuple[int, Callable[[Parser], Awaitable[Any]]]] = {
+    "getRaceUrls": (1, lambda parser: parser.getRaceUrls(2023, use_cache=False)),
+    "getRace": (2, lambda parser: parser.getRace(RACE_URL, 1)),
+    "getCircuit": (1, lambda parser: parser.getCircuit(RACE_URL)),
+    "getEventResults[practice]": (
+        1, lambda parser: parser.getEventResults(f"{RESULTS_URL}/practice/1", "2023_1_PRACTICE_1")
+    ),
+    "getEventResults[qualifying]": (
+        1, lambda parser: parser.getEventResults(f"{RESULTS_URL}/qualifying", "2023_1_QUALIFYING")
+    ),
+    "getEventResults[race]": (
+        1, lambda parser: parser.getEventResults(f"{RESULTS_URL}/race-result", "2023_1_RACE")
+    ),
+    "getDriverStandings": (1, lambda parser: parser.getDriverStandings(2023)),
+    "getConstructorStandings": (1, lambda parser: parser.getConstructorStandings(2023)),
+}
+
+
+async def timeCase(parser: Parser, call: Callable[[Parser], Awaitable[Any]], repeats: int) -> List[float]:
+    await call(parser)  # warm up
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await call(parser)
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+async def peakMemory(parser: Parser, call: Callable[[Parser], Awaitable[Any]]) -> int:
+    tracemalloc.start()
+    try:
+        await call(parser)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def measure(features: str, repeats: int) -> Dict[str, Dict[str, float]]:
+    parser = Parser(features=features)
+    results = {}
+
+    for name, (pages, call) in CASES.items():
+        timings = await timeCase(parser, call, repeats)
+        median = statistics.median(timings)
+        results[name] = {
+            "median": median,
+            "best": min(timings),
+            "pagesPerSecond": pages / median,
+            "peakMemory": await peakMemory(parser, call),
+        }
+
+    await parser.close()
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float
+) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        for metric in ("median", "peakMemory"):
+            allowed = baseline[name][metric] * (1 + tolerance)
+            if result[metric] > allowed:
+                regressions.append(
+                    f"{name} {metric}: {result[metric]:.6g} > {baseline[name][metric]:.6g} (+{tolerance:.0%})"
+                )
+
+    return regressions
+
+
+def report(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'call':>28} {'median ms':>10} {'best ms':>10} {'pages/s':>9} {'peak KiB':>9} {'vs base':>8}")
+    for name, result in results.items():
+        change = ""
+        if name in baseline:
+            change = f"{result['median'] / baseline[name]['median'] - 1:+.1%}"
+
+        print(
+            f"{name:>28} {result['median'] * 1e3:10.2f} {result['best'] * 1e3:10.2f}"
+            f" {result['pagesPerSecond']:9.1f} {result['peakMemory'] / 1024:9.0f} {change:>8}"
+        )
+
+
+def main(args: argparse.Namespace) -> int:
+    mockRequests = MockRequests(config=args.config)
+    with patch.object(HttpClient, "get", new=mockRequests.getAsync):
+        results = asyncio.run(measure(args.features, args.repeats))
+
+    baselinePath = Path(args.baseline)
+    if args.save_baseline:
+        baselinePath.parent.mkdir(parents=True, exist_ok=True)
+        baselinePath.write_text(json.dumps({
+            "python": platform.python_version(),
+            "features": args.features,
+            "results": results,
+        }, indent=4))
+        report(results, {})
+        print("Saved baseline to", baselinePath)
+        return 0
+
+    if not baselinePath.exists():
+        report(results, {})
+        print(f"No baseline at {baselinePath}, run with --save-baseline to record one")
+        return 0 if args.allow_missing_baseline else 2
+
+    stored = json.loads(baselinePath.read_text())
+    if stored["features"] != args.features:
+        print(f"Baseline was recorded with {stored['features']}, not {args.features}")
+        return 2
+
+    report(results, stored["results"])
+    regressions = compare(results, stored["results"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} parser regression(s):")
+        for regression in regressions:
+            print("  " + regression)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-c", "--config", default=CONFIG_PATH)
+    argparser.add_argument("-b", "--baseline", default=BASELINE_PATH)
+    argparser.add_argument("-f", "--features", default="html.parser")
+    argparser.add_argument("-n", "--repeats", type=int, default=20)
+    argparser.add_argument("-t", "--tolerance", type=float, default=0.25)
+    argparser.add_argument("--save-baseline", action="store_true")
+    argparser.add_argument(
+        "--allow-missing-baseline", action="store_true", help="only report when no baseline is recorded"
+    )
+
+    sys.exit(main(argparser.parse_args()))
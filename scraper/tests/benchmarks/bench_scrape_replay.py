@@ -0,0 +1,57 @@
+"""
+Replays a recorded response archive (see tests/test_data/record_archive.py) through
+the whole Scraper into a throwaway database, with no network. Run from the scraper
+directory:
+
+    python -m tests.benchmarks.bench_scrape_replay tests/test_data/archives/2023.jsonl.gz -y 2023
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from scraper import Parser, Scraper, ResponseArchive, ReplayClient
+
+
+async def replay(
+    archivePath: Path, years: list[int], features: str, workers: int, withResults: bool = True
+) -> None:
+    executor = ProcessPoolExecutor(workers) if workers else None
+    parser = Parser(
+        client=ReplayClient(ResponseArchive(archivePath)),
+        features=features,
+        parseExecutor=executor,
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        scraper = Scraper(dbPath=str(Path(directory) / "db.sqlite3"), parser=parser)
+        await scraper.db.initialize()
+
+        start = time.perf_counter()
+        fetches = 0
+        for year in years:
+            await scraper.saveAllRaces(year)
+            fetches += parser.stats()["fetches"]
+            if withResults:
+                await scraper.saveAllResults(year)
+                fetches += parser.stats()["fetches"]
+        elapsed = time.perf_counter() - start
+
+        await scraper.db.close()
+
+    await parser.close()
+    print(f"{len(years)} season(s): {elapsed:.2f}s, {fetches} page fetches, {fetches / elapsed:.1f} pages/s")
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("archive", type=Path)
+    argparser.add_argument("-y", "--years", type=int, nargs="+", required=True)
+    argparser.add_argument("-f", "--features", default="html.parser")
+    argparser.add_argument("-w", "--workers", type=int, default=0)
+    argparser.add_argument("--races-only", action="store_true")
+    args = argparser.parse_args()
+
+    asyncio.run(replay(args.archive, args.years, args.features, args.workers, not args.races_only))
@@ -0,0 +1,108 @@
+"""
+Concurrent read/write throughput of each SQLite profile: one writer thread upserting
+standings in small committed batches, like a scrape, while reader threads query the
+same file on their own connections, like the API. Run from the scraper directory with
+
+    python -m tests.benchmarks.bench_sqlite_profile [-s SECONDS] [-r READERS]
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from models import DriverStandings
+from db import SqliteProfile, PROFILES
+from db.genericDb import GenericDatabase, PK
+
+BATCH = 50
+
+
+def connect(path: Path, profile: SqliteProfile) -> tuple[sqlite3.Connection, GenericDatabase]:
+    # default 5s busy handler, the same as Database gets from sqlite3.connect
+    conn = sqlite3.connect(path)
+    profile.apply(conn)
+    db = GenericDatabase[DriverStandings](
+        conn.cursor(), DriverStandings, PK(DriverStandings, ["year", "driverId"]), "driverStandings"
+    )
+
+    return conn, db
+
+
+def run(profile: SqliteProfile, seconds: float, readers: int) -> dict[str, float]:
+    directory = tempfile.TemporaryDirectory()
+    path = Path(directory.name) / "bench.sqlite3"
+
+    conn, db = connect(path, profile)
+    db.initialize()
+    conn.commit()
+    conn.close()
+
+    stop = threading.Event()
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def writer():
+        conn, db = connect(path, profile)
+        i = 0
+        while not stop.is_set():
+            standings = [
+                DriverStandings(2000 + i % 50, n + 1, i % 400, f"{n}-drv", str(n % 10))
+                for n in range(BATCH)
+            ]
+            try:
+                db.insertOrUpdateMany(standings)
+                conn.commit()
+                with lock:
+                    counts["writes"] += BATCH
+            except sqlite3.OperationalError:
+                conn.rollback()
+                with lock:
+                    counts["errors"] += 1
+            i += 1
+        conn.close()
+
+    def reader():
+        conn, db = connect(path, profile)
+        while not stop.is_set():
+            try:
+                db.getByKeysMany(year=random.randrange(2000, 2050))
+                with lock:
+                    counts["reads"] += 1
+            except sqlite3.OperationalError:
+                with lock:
+                    counts["errors"] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    directory.cleanup()
+
+    return {name: count / seconds for name, count in counts.items()}
+
+
+def main(seconds: float, readers: int) -> None:
+    print(f"1 writer, {readers} readers, {seconds}s per profile")
+    for name, profile in PROFILES.items():
+        result = run(profile, seconds, readers)
+        print(
+            f"{name:>12}: {result['writes']:10.0f} rows written/s {result['reads']:8.0f} reads/s"
+            f" {result['errors']:6.1f} lock errors/s"
+        )
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-s", "--seconds", type=float, default=5)
+    argparser.add_argument("-r", "--readers", type=int, default=4)
+    args = argparser.parse_args()
+
+    main(args.seconds, args.readers)
@@ -0,0 +1,36 @@
+import unittest
+from hamcrest import assert_that, equal_to, contains_inanyorder
+
+from db import Database
+from models import Alias
+
+
+class TestAliasDatabase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = Database(path=":memory:")
+        self.db.initialize()
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_recording_should_keep_the_stored_aliases(self):
+        corrected = self.db.aliases.correct("constructor", "Red Bull Racing Honda RBPT", "2")
+
+        self.db.aliases.record([
+            Alias("constructor", "Red Bull Racing Honda RBPT", "9", "fuzzy"),
+            Alias("driver", "Max Verstappen", "368-ves", "exact"),
+        ])
+
+        assert_that(self.db.aliases.getAll(), contains_inanyorder(
+            corrected, Alias("driver", "Max Verstappen", "368-ves", "exact"),
+        ))
+
+    def test_corrections_should_replace_learned_aliases(self):
+        self.db.aliases.record([Alias("circuit", "Jeddah", "sa-2021", "fuzzy")])
+
+        self.db.aliases.correct("circuit", "Jeddah", "sa-2022")
+
+        assert_that(
+            self.db.aliases.getByKeys(kind="circuit", name="Jeddah"),
+            equal_to(Alias("circuit", "Jeddah", "sa-2022", "manual", 1)),
+        )
@@ -0,0 +1,182 @@
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from hamcrest import assert_that, equal_to, instance_of, only_contains
+
+from db import AsyncDatabase, Database
+from models import ConstructorStandings, EntityResolver
+from scraper import Scraper
+
+
+class TestAsyncDatabase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = AsyncDatabase(Database(path=str(Path(self.directory.name) / "db.sqlite3")))
+        await self.db.rawDogg("CREATE TABLE laps (id INTEGER PRIMARY KEY)")
+
+    async def asyncTearDown(self) -> None:
+        await self.db.close()
+        self.directory.cleanup()
+
+    async def test_concurrent_writes_should_all_land(self):
+        await asyncio.gather(*(self.db.rawDogg(f"INSERT INTO laps VALUES ({i})") for i in range(50)))
+        await self.db.commit()
+
+        assert_that(await self.db.rawDogg("SELECT COUNT(*) FROM laps"), equal_to([(50,)]))
+
+    async def test_table_iterators_should_stream_every_row(self):
+        await self.db.initialize()
+        await self.db.rawDogg("INSERT INTO constructors VALUES ('Red Bull Racing', '2')")
+        standings = [ConstructorStandings(2023, i, 100 - i, "2") for i in range(1, 8)]
+        await self.db.constructorStandings.insertMany(standings)
+        await self.db.commit()
+
+        streamed = [standing async for standing in self.db.constructorStandings.iterAll(batchSize=3)]
+
+        assert_that(streamed, equal_to(standings))
+
+    async def test_streams_outnumbering_the_readers_should_not_block_other_calls(self):
+        await self.db.initialize()
+        await self.db.rawDogg("INSERT INTO constructors VALUES ('Red Bull Racing', '2')")
+        standings = [ConstructorStandings(2023, i, 100 - i, "2") for i in range(1, 8)]
+        await self.db.constructorStandings.insertMany(standings)
+        await self.db.commit()
+
+        streams = [
+            self.db.constructorStandings.iterAll(batchSize=2)
+            for _ in range(self.db.sync.connections.maxReaders + 2)
+        ]
+        firsts = await asyncio.wait_for(asyncio.gather(*(anext(stream) for stream in streams)), 5)
+        await asyncio.wait_for(self.db.rawDogg("INSERT INTO laps VALUES (1)"), 5)
+        await asyncio.wait_for(self.db.commit(), 5)
+
+        rests = [[standing async for standing in stream] for stream in streams]
+
+        assert_that([[first] + rest for first, rest in zip(firsts, rests)], only_contains(standings))
+        assert_that(await self.db.rawDogg("SELECT COUNT(*) FROM laps"), equal_to([(1,)]))
+
+    async def test_writers_waiting_on_a_transaction_should_not_starve_readers(self):
+        await self.db.initialize()
+        opened, done = asyncio.Event(), asyncio.Event()
+
+        async def unit():
+            async with self.db.transaction():
+                await self.db.rawDogg("INSERT INTO laps VALUES (0)")
+                opened.set()
+                await done.wait()
+
+        transaction = asyncio.create_task(unit())
+        await opened.wait()
+        writers = [
+            asyncio.create_task(self.db.rawDogg(f"INSERT INTO laps VALUES ({id_})"))
+            for id_ in range(1, self.db.sync.connections.maxReaders + 4)
+        ]
+        await asyncio.sleep(0.05)
+
+        assert_that(await asyncio.wait_for(self.db.constructorStandings.getAll(), 5), equal_to([]))
+
+        done.set()
+        await asyncio.wait_for(asyncio.gather(transaction, *writers), 5)
+        await self.db.commit()
+        assert_that(await self.db.rawDogg("SELECT COUNT(*) FROM laps"), equal_to([(len(writers) + 1,)]))
+
+    async def test_failing_transaction_should_roll_back(self):
+        async def failingUnit():
+            async with self.db.transaction():
+                await self.db.rawDogg("INSERT INTO laps VALUES (1)")
+                await self.db.commit()
+                raise RuntimeError("scrape failed")
+
+        with self.assertRaises(RuntimeError):
+            await failingUnit()
+
+        assert_that(await self.db.rawDogg("SELECT COUNT(*) FROM laps"), equal_to([(0,)]))
+
+    async def test_concurrent_transactions_should_only_roll_back_the_failing_one(self):
+        async def unit(id_: int, fail: bool):
+            async with self.db.transaction():
+                await self.db.rawDogg(f"INSERT INTO laps VALUES ({id_})")
+                await asyncio.sleep(0.05)
+                await self.db.commit()
+                if fail:
+                    raise RuntimeError("scrape failed")
+
+        outcomes = await asyncio.gather(unit(1, False), unit(2, True), return_exceptions=True)
+
+        assert_that(outcomes[0], equal_to(None))
+        assert_that(outcomes[1], instance_of(RuntimeError))
+        assert_that(await self.db.rawDogg("SELECT id FROM laps"), equal_to([(1,)]))
+
+    async def test_writes_outside_a_transaction_should_wait_for_it(self):
+        started = asyncio.Event()
+
+        async def failingUnit():
+            async with self.db.transaction():
+                await self.db.rawDogg("INSERT INTO laps VALUES (1)")
+                started.set()
+                await asyncio.sleep(0.05)
+                raise RuntimeError("scrape failed")
+
+        async def write():
+            await started.wait()
+            await self.db.rawDogg("INSERT INTO laps VALUES (2)")
+            await self.db.commit()
+
+        await asyncio.gather(failingUnit(), write(), return_exceptions=True)
+
+        assert_that(await self.db.rawDogg("SELECT id FROM laps"), equal_to([(2,)]))
+
+    async def test_atomic_job_should_run_on_the_sync_database(self):
+        def job(db: Database) -> int:
+            with db.savepoint():
+                db.rawDogg("INSERT INTO laps VALUES (1)")
+            return len(db.rawDogg("SELECT id FROM laps"))
+
+        assert_that(await self.db.atomic(job), equal_to(1))
+
+
+class StandingsParser:
+    async def getConstructorStandings(self, year: int):
+        return [{"position": 1, "points": 860, "constructorName": "Red Bull Racing"}]
+
+
+class TestInMemoryAsyncDatabase(unittest.IsolatedAsyncioTestCase):
+    async def test_in_memory_database_should_be_usable_from_the_executor(self):
+        db = AsyncDatabase(Database(":memory:"))
+        await db.rawDogg("CREATE TABLE laps (id INTEGER PRIMARY KEY)")
+        async with db.transaction():
+            await db.rawDogg("INSERT INTO laps VALUES (1)")
+
+        assert_that(await db.rawDogg("SELECT COUNT(*) FROM laps"), equal_to([(1,)]))
+        await db.close()
+
+    async def test_scraper_should_store_into_an_in_memory_database(self):
+        scraper = Scraper(dbPath=":memory:", parser=StandingsParser())
+        await scraper.db.initialize()
+        await scraper.saveConstructorsAndStandings(2023)
+
+        assert_that(await scraper.db.rawDogg("SELECT year, points FROM constructorStandings"), equal_to([(2023, 860)]))
+        await scraper.db.close()
+
+    async def test_aliases_rolled_back_should_be_recorded_by_the_next_scrape(self):
+        scraper = Scraper(dbPath=":memory:", parser=StandingsParser())
+        await scraper.db.initialize()
+
+        async def failingCommit():
+            await scraper.db.run(scraper.db.sync.connections.conn.rollback)
+            raise sqlite3.OperationalError("disk I/O error")
+
+        # a resolver of its own so the name is matched, and its alias queued, here
+        with patch.object(EntityResolver, "get", return_value=EntityResolver()):
+            with patch.object(scraper.db, "commit", new=failingCommit):
+                with self.assertRaises(sqlite3.OperationalError):
+                    await scraper.saveConstructorsAndStandings(2023)
+
+            assert_that(await scraper.db.rawDogg("SELECT COUNT(*) FROM aliases"), equal_to([(0,)]))
+            await scraper.saveConstructorsAndStandings(2023)
+
+        assert_that(await scraper.db.rawDogg("SELECT name FROM aliases"), equal_to([("Red Bull Racing",)]))
+        await scraper.db.close()
@@ -0,0 +1,74 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from hamcrest import assert_that, equal_to, calling, raises, contains_exactly
+
+from db import ConnectionManager, SqliteProfile
+
+
+class TestConnectionManager(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.connections = ConnectionManager(
+            Path(self.directory.name) / "db.sqlite3", SqliteProfile.get("performance"), readers=2
+        )
+        self.connections.write(lambda conn: conn.execute("CREATE TABLE laps (id INTEGER PRIMARY KEY)"))
+
+    def tearDown(self) -> None:
+        self.connections.close()
+        self.directory.cleanup()
+
+    def count(self) -> int:
+        return self.connections.read(lambda conn: conn.execute("SELECT COUNT(*) FROM laps").fetchone()[0])
+
+    def test_only_the_transaction_owner_should_read_its_uncommitted_writes(self):
+        claim = self.connections.claim()
+        self.connections.begin()
+        self.connections.write(lambda conn: conn.execute("INSERT INTO laps VALUES (1)"))
+
+        counts = []
+        reader = threading.Thread(target=lambda: counts.append(self.count()))
+        reader.start()
+        reader.join()
+
+        assert_that(self.count(), equal_to(1))
+        assert_that(counts, contains_exactly(0))
+
+        self.connections.end(commit=True)
+        self.connections.release(claim)
+        assert_that(self.count(), equal_to(1))
+
+    def test_reads_outside_a_transaction_should_only_see_committed_writes(self):
+        self.connections.write(lambda conn: conn.execute("INSERT INTO laps VALUES (1)"))
+        assert_that(self.count(), equal_to(0))
+
+        self.connections.commit()
+        assert_that(self.count(), equal_to(1))
+
+    def test_committed_reads_should_run_on_read_only_connections(self):
+        self.connections.commit()
+
+        assert_that(
+            calling(self.connections.read).with_args(lambda conn: conn.execute("INSERT INTO laps VALUES (1)")),
+            raises(sqlite3.OperationalError),
+        )
+
+    def test_writes_from_many_threads_should_all_be_committed(self):
+        def writer(start: int):
+            for id_ in range(start, start + 50):
+                self.connections.write(lambda conn: conn.execute("INSERT INTO laps VALUES (?)", (id_,)))
+                self.connections.commit()
+
+        threads = [threading.Thread(target=writer, args=(i * 50,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert_that(self.count(), equal_to(200))
+        assert_that(
+            calling(self.connections.write).with_args(lambda conn: conn.execute("INSERT INTO laps VALUES (1)")),
+            raises(sqlite3.IntegrityError),
+        )
@@ -0,0 +1,73 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from hamcrest import assert_that, equal_to, calling, raises
+
+from db import Database
+
+
+class TestDatabaseTransactions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.directory.name) / "db.sqlite3")
+        self.db = Database(path=self.path)
+        self.db.rawDogg("CREATE TABLE laps (id INTEGER PRIMARY KEY)")
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.directory.cleanup()
+
+    def committedRows(self) -> int:
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM laps").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_commits_inside_a_transaction_should_be_deferred_to_its_end(self):
+        with self.db.transaction():
+            self.db.rawDogg("INSERT INTO laps VALUES (1)")
+            self.db.commit()
+            assert_that(self.committedRows(), equal_to(0))
+
+        assert_that(self.committedRows(), equal_to(1))
+
+    def test_failing_savepoint_should_roll_back_alone(self):
+        def failingRound():
+            with self.db.savepoint():
+                self.db.rawDogg("INSERT INTO laps VALUES (2)")
+                raise RuntimeError("round failed")
+
+        with self.db.transaction():
+            with self.db.savepoint():
+                self.db.rawDogg("INSERT INTO laps VALUES (1)")
+            assert_that(calling(failingRound), raises(RuntimeError))
+
+        assert_that(self.db.rawDogg("SELECT id FROM laps"), equal_to([(1,)]))
+        assert_that(self.committedRows(), equal_to(1))
+
+    def test_concurrent_transactions_should_not_roll_each_other_back(self):
+        inside = threading.Event()
+
+        def failingUnit():
+            inside.wait()
+            with self.db.transaction():
+                self.db.rawDogg("INSERT INTO laps VALUES (2)")
+                raise RuntimeError("scrape failed")
+
+        thread = threading.Thread(target=lambda: assert_that(calling(failingUnit), raises(RuntimeError)))
+        thread.start()
+
+        with self.db.transaction():
+            self.db.rawDogg("INSERT INTO laps VALUES (1)")
+            inside.set()
+            # the other transaction waits for this one rather than joining it
+            thread.join(0.2)
+            assert_that(thread.is_alive(), equal_to(True))
+            self.db.commit()
+            assert_that(self.committedRows(), equal_to(0))
+
+        thread.join()
+        assert_that(self.committedRows(), equal_to(1))
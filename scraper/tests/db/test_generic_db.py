@@ -0,0 +1,66 @@
+import sqlite3
+import unittest
+from dataclasses import dataclass
+from hamcrest import assert_that, equal_to, contains_inanyorder
+
+from models import BaseModel
+from db.genericDb import GenericDatabase, PK
+
+
+@dataclass
+class Lap(BaseModel):
+    eventId: str
+    driverId: str
+    time: str
+    position: int = None
+
+
+class TestGenericDatabase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = sqlite3.connect(":memory:")
+        self.db = GenericDatabase[Lap](
+            self.conn.cursor(), Lap, PK(Lap, ["eventId", "driverId"]), "laps"
+        )
+        self.db.initialize()
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_insert_or_update_many_should_insert_new_and_update_existing_rows(self):
+        self.db.insertOrUpdateMany([Lap("e1", "d1", "1:30", 1), Lap("e1", "d2", "1:31", 2)])
+        self.db.insertOrUpdateMany([Lap("e1", "d2", "1:29", 1), Lap("e2", "d1", "1:40", 1)])
+
+        assert_that(
+            self.db.getAll(),
+            contains_inanyorder(
+                Lap("e1", "d1", "1:30", 1),
+                Lap("e1", "d2", "1:29", 1),
+                Lap("e2", "d1", "1:40", 1),
+            ),
+        )
+
+    def test_insert_or_update_rows_should_keep_the_last_row_per_key(self):
+        self.db.insertOrUpdateRows([("e1", "d1", "1:30", 2), ("e1", "d1", "1:28", 1)])
+
+        assert_that(self.db.getAll(), equal_to([Lap("e1", "d1", "1:28", 1)]))
+
+    def test_iter_all_should_stream_every_row_across_batches(self):
+        laps = [Lap("e1", f"d{i}", "1:30", i) for i in range(7)]
+        self.db.insertMany(laps)
+
+        assert_that(list(self.db.iterAll(batchSize=3)), equal_to(laps))
+        assert_that(
+            list(self.db.iterByKeys(batchSize=2, raw=True, eventId="e1", position=3)),
+            equal_to([("e1", "d3", "1:30", 3)]),
+        )
+
+    def test_missing_keys_should_return_the_keys_without_rows_in_order(self):
+        self.db.insertMany([Lap("e1", "d1", "1:30", 1), Lap("e1", "d2", "1:31", 2)])
+        self.db.MAX_PARAMETERS = 6
+
+        keys = [("e2", "d1"), ("e1", "d2"), ("e1", "d3"), ("e2", "d1"), ("e1", "d1")]
+
+        assert_that(self.db.missingKeys(keys), equal_to([("e2", "d1"), ("e1", "d3")]))
+        assert_that(
+            self.db.existsMany(["d1", "d3"], ["driverId"]), equal_to([True, False])
+        )
@@ -0,0 +1,82 @@
+import sqlite3
+import unittest
+from hamcrest import assert_that, equal_to, calling, raises
+
+from db.genericDb import GenericDatabase, PK
+from tests.db.test_generic_db import Lap
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = sqlite3.connect(":memory:")
+        self.db = GenericDatabase[Lap](
+            self.conn.cursor(), Lap, PK(Lap, ["eventId", "driverId"]), "laps"
+        )
+        self.db.initialize()
+        self.laps = [
+            Lap(f"e{event}", f"d{driver}", f"1:{30 + driver}", (driver * 7 + event) % 5)
+            for event in range(4) for driver in range(6)
+        ]
+        self.db.insertMany(self.laps)
+
+    def tearDown(self) -> None:
+        self.conn.close()
+
+    def test_filters_should_combine_ranges_and_in_lists(self):
+        query = self.db.query().where("position", ">=", 2).whereIn("eventId", ["e1", "e3"])
+
+        assert_that(
+            list(self.db.iterQuery(query)),
+            equal_to([lap for lap in self.laps if lap.position >= 2 and lap.eventId in ("e1", "e3")]),
+        )
+
+    def test_projection_should_return_the_selected_columns(self):
+        query = self.db.query().where("driverId", "=", "d2").orderBy("position").select("eventId", "position")
+
+        assert_that(
+            self.db.getPage(query, 2),
+            equal_to(([("e1", 0), ("e2", 1)], (1, "e2", "d2"))),
+        )
+
+    def test_pages_should_cover_every_row_once_in_order(self):
+        query = self.db.query().orderBy("position", descending=True).orderBy("time")
+        expected = sorted(self.laps, key=lambda lap: (-lap.position, lap.time, lap.eventId, lap.driverId))
+
+        pages, nextKey = [], None
+        while True:
+            page, nextKey = self.db.getPage(query.after(nextKey) if nextKey else query, 5)
+            pages.append(page)
+            if nextKey is None:
+                break
+
+        assert_that([lap for page in pages for lap in page], equal_to(expected))
+        assert_that(len(pages), equal_to(5))
+
+    def test_pages_should_not_stop_at_null_sort_values(self):
+        unplaced = [Lap(f"e{event}", "d9", "DNF") for event in range(4)]
+        self.db.insertMany(unplaced)
+
+        for descending in (False, True):
+            query = self.db.query().orderBy("position", descending=descending)
+            placed = sorted(
+                self.laps,
+                key=lambda lap: (-lap.position if descending else lap.position, lap.eventId, lap.driverId),
+            )
+            # SQLite sorts NULLs first, so last when descending
+            expected = placed + unplaced if descending else unplaced + placed
+
+            pages, nextKey = [], None
+            while True:
+                page, nextKey = self.db.getPage(query.after(nextKey) if nextKey else query, 3)
+                pages.extend(page)
+                if nextKey is None:
+                    break
+
+            assert_that(pages, equal_to(expected))
+
+    def test_unknown_columns_and_operators_should_be_rejected(self):
+        query = self.db.query()
+
+        assert_that(calling(query.where).with_args("speed; DROP TABLE laps", "=", 1), raises(ValueError))
+        assert_that(calling(query.where).with_args("position", "LIKE", 1), raises(ValueError))
+        assert_that(calling(query.coerce).with_args("position", "first"), raises(ValueError))
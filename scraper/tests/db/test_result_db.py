@@ -0,0 +1,65 @@
+import unittest
+from hamcrest import assert_that, equal_to, contains_inanyorder, has_item, has_items
+
+from db import Database
+from models import PracticeResult, QualifyingResult, RaceResult
+
+
+class TestResultDatabaseView(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = Database(path=":memory:")
+        self.db.initialize()
+        # the drivers, constructors and events the results point to don't matter here
+        self.db.rawDogg("PRAGMA foreign_keys = 0")
+
+        self.results = [
+            RaceResult(eventId="2022_1_RACE", position=1, driverId="368-ves", driverNumber=1, laps=57,
+                       constructorId="2", points=25, time="1:33:56"),
+            RaceResult(eventId="2023_1_RACE", position=1, driverId="4-lec", driverNumber=16, laps=57,
+                       constructorId="3", points=25, time="1:33:56"),
+            QualifyingResult(eventId="2023_1_QUALIFYING", position=1, driverId="368-ves", driverNumber=1,
+                             laps=18, constructorId="2", q1="1:31", q2="1:30", q3="1:29"),
+            PracticeResult(eventId="2023_1_PRACTICE_1", position=2, driverId="368-ves", driverNumber=1,
+                           laps=20, constructorId="2", time="1:32", gap="+0.1"),
+        ]
+        self.db.results.insertMany(self.results)
+
+    def tearDown(self) -> None:
+        self.db.close()
+
+    def test_history_should_return_every_result_type(self):
+        assert_that(
+            self.db.results.getByDriverId("368-ves"),
+            contains_inanyorder(self.results[0], self.results[2], self.results[3]),
+        )
+        assert_that(
+            self.db.results.getByConstructorId("2", year=2023),
+            contains_inanyorder(self.results[2], self.results[3]),
+        )
+
+    def test_exists_without_event_should_search_every_table(self):
+        assert_that(self.db.results.exists(driverId="4-lec"), equal_to(True))
+        assert_that(self.db.results.exists(driverId="4-lec", constructorId="2"), equal_to(False))
+
+    def test_insert_or_update_should_upsert_into_the_event_table(self):
+        updated = QualifyingResult(eventId="2023_1_QUALIFYING", position=2, driverId="368-ves", driverNumber=1,
+                                   laps=19, constructorId="2", q1="1:31", q2="1:30", q3="1:30")
+        added = QualifyingResult(eventId="2023_1_QUALIFYING", position=1, driverId="4-lec", driverNumber=16,
+                                 laps=18, constructorId="3", q1="1:31", q2="1:30", q3="1:29")
+
+        assert_that(self.db.results.insertOrUpdate(updated), equal_to(1))
+        assert_that(self.db.results.insertOrUpdate(added), equal_to(0))
+        assert_that(self.db.results.getByEventId("2023_1_QUALIFYING"), contains_inanyorder(updated, added))
+
+    def test_history_queries_should_use_the_composite_indexes(self):
+        plan = self.db.rawDogg(
+            "EXPLAIN QUERY PLAN SELECT * FROM results "
+            "WHERE driverId = '368-ves' AND eventId >= '2023_' AND eventId < '2023`'"
+        )
+        details = [row[-1] for row in plan]
+
+        assert_that(details, has_items(*(
+            f"SEARCH {table} USING INDEX {table}DriverEventIndex (driverId=? AND eventId>? AND eventId<?)"
+            for table in ("raceResults", "qualifyingResults", "practiceResults")
+        )))
+        assert_that(details, has_item("SCAN results"))
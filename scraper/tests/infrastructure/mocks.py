@@ -1,57 +1,10 @@
-from enum import Enum
-import re
 from pathlib import Path
 import os
 import json
 
-"""
-EXAMPLES
+from scraper.PageType import PageType
 
-race weekend:           https://www.formula1.com/en/racing/2024/brazil
-year schedule:          https://www.formula1.com/en/racing/2024
-constructor standings:  https://www.formula1.com/en/results/2024/team
-driver standings:       https://www.formula1.com/en/results/2024/drivers
-circuit:                https://www.formula1.com/en/racing/2023/brazil/circuit
-race result:            https://www.formula1.com/en/results/2023/races/1224/brazil/race-result
-practice result:        https://www.formula1.com/en/results/2023/races/1224/brazil/practice/1
-qualifying result:      https://www.formula1.com/en/results/2023/races/1224/brazil/qualifying
-"""
-        
-BASE_URL = "https://www.formula1.com/en/"
-
-
-class RequestType(Enum):
-    YEAR_SCHEDULE = "YR_SCH"
-    DRIVER_STANDINGS = "DRI_STNDGS"
-    CONSTRUCTROR_STANDINGS = "CON_STNDGS"
-    RACE_WEEKEND = "RACE_WKND"
-    CIRCUIT = "CRCT"
-    PRACTICE_RESULT = "PRA_RES"
-    QUALIFYING_RESULT = "QUALI_RES"
-    RACE_RESULT = "RACE_RES"
-    
-    @staticmethod
-    def parseType(url: str) -> "RequestType":
-        path = re.sub(BASE_URL, "", url)
-
-        if re.fullmatch(r"^racing/\d{4}/[a-zA-Z-]+/?$", path):
-            return RequestType.RACE_WEEKEND
-        if re.fullmatch(r"^results/\d{4}/team/?$", path):
-            return RequestType.CONSTRUCTROR_STANDINGS
-        if re.fullmatch(r"^results/\d{4}/drivers/?$", path):
-            return RequestType.DRIVER_STANDINGS
-        if re.fullmatch(r"^racing/\d{4}/?$", path):
-            return RequestType.YEAR_SCHEDULE
-        if re.fullmatch(r"^racing/\d{4}/[a-zA-Z-]+/circuit/?$", path):
-            return RequestType.CIRCUIT
-        if re.fullmatch(r"^results/\d{4}/races/\d+/[a-zA-Z-]+/practice/\d+/?$", path):
-            return RequestType.PRACTICE_RESULT
-        if re.fullmatch(r"^results/\d{4}/races/\d+/[a-zA-Z-]+/(sprint-|)qualifying/?$", path):
-            return RequestType.QUALIFYING_RESULT
-        if re.fullmatch(r"^results/\d{4}/races/\d+/[a-zA-Z-]+/(race|sprint)-result(s|)/?$", path):
-            return RequestType.RACE_RESULT
-
-        raise Exception(f"can't parse request type for url: {url}")
+RequestType = PageType
 
 
 class MockConfig:
@@ -69,9 +22,11 @@ class MockConfig:
             
 
 class MockResponse:
-    def __init__(self, text: str, encoding: str):
+    def __init__(self, text: str, encoding: str, status: int = 200, headers: dict[str, str] = None):
         self.text = text
         self.encoding = encoding
+        self.status = status
+        self.headers = headers if headers else {}
         
     @staticmethod
     def fromFile(path: str | Path, encoding: str = "utf-8"):
@@ -90,7 +45,7 @@ class MockRequests:
         self.typeMap = {
             RequestType.YEAR_SCHEDULE: MockResponse.fromFile(*self.config.schedulePage),
             RequestType.DRIVER_STANDINGS: MockResponse.fromFile(*self.config.driverStandingsPage),
-            RequestType.CONSTRUCTROR_STANDINGS: MockResponse.fromFile(*self.config.constructorStandingsPage),
+            RequestType.CONSTRUCTOR_STANDINGS: MockResponse.fromFile(*self.config.constructorStandingsPage),
             RequestType.RACE_WEEKEND: MockResponse.fromFile(*self.config.regularWeekendPage),
             RequestType.CIRCUIT: MockResponse.fromFile(*self.config.circuitPage),
             RequestType.RACE_RESULT: MockResponse.fromFile(*self.config.raceResultPage),
@@ -107,5 +62,8 @@ class MockRequests:
         
         return self.typeMap[reqType]
     
+    async def getAsync(self, url: str, headers: dict[str, any] = None) -> MockResponse:
+        return self.get(url, headers)
+    
     def getSprintRace(self) -> MockResponse:
         return MockResponse(*self.config.sprintWeekendPage)
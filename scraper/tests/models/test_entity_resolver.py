@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+from hamcrest import assert_that, equal_to, none, calling, raises
+
+from models import Alias, EntityResolver
+from utils import Utils
+
+
+def bruteForce(name: str, aliases: list[tuple[str, int]], maxDistance: int):
+    best, bestDistance = None, maxDistance
+    for alias, id_ in aliases:
+        distance = Utils.editDistance(name.lower(), alias.lower())
+        if distance < bestDistance:
+            best, bestDistance = id_, distance
+
+    return best
+
+
+class TestEntityResolver(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        self.constructors = [
+            {"names": ["red bull", "red bull racing"], "name": ["Red Bull"], "id": 2},
+            {"names": ["ferrari", "scuderia ferrari"], "name": ["Ferrari"], "id": 3},
+            # a duplicate alias, the first constructor keeps it
+            {"names": ["haas", "ferrari"], "name": ["Haas"], "id": 8},
+        ]
+        self.write("constructors.json", self.constructors)
+        self.write("drivers.json", [{"id": "368-ves", "name": "Max Verstappen"}])
+        self.write("circuits.json", [{"id": "sa-2021", "name": "Jeddah Corniche Circuit"}])
+        self.resolver = EntityResolver(self.path, reloadInterval=0)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, entries: list) -> None:
+        path = self.path / name
+        with open(path, "w") as f:
+            json.dump(entries, f)
+        # a new mtime even if the test rewrites it within the filesystem's time resolution
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_should_match_a_scan_over_every_alias(self):
+        aliases = [(alias, c["id"]) for c in self.constructors for alias in c["names"]]
+        names = ["Ferrari", "FERRARI", "Red Bull Racing Honda RBPT", "Haas Ferrari", "Scuderia", "rb", "x" * 40]
+
+        for name in names:
+            expected = bruteForce(name, aliases, 30)
+            if expected is None:
+                assert_that(calling(self.resolver.constructorId).with_args(name), raises(Exception))
+            else:
+                assert_that(self.resolver.constructorId(name), equal_to(expected))
+
+    def test_drivers_should_only_match_exact_names(self):
+        assert_that(self.resolver.driverId("Max Verstappen"), equal_to("368-ves"))
+        assert_that(self.resolver.driverId("Max Verstapen"), none())
+        assert_that(self.resolver.circuitId("Jeddah Corniche"), equal_to("sa-2021"))
+
+    def test_should_reload_when_a_file_changes(self):
+        assert_that(self.resolver.constructorId("Red Bull Racing Honda"), equal_to(2))
+
+        self.write("constructors.json", [{"names": ["red bull racing honda"], "name": ["RBR"], "id": 9}])
+
+        assert_that(self.resolver.constructorId("Red Bull Racing Honda"), equal_to(9))
+
+    def test_stored_aliases_should_come_before_the_constants(self):
+        assert_that(self.resolver.constructorId("Red Bull Racing Honda"), equal_to(2))
+        assert_that(self.resolver.driverId("Max Verstappen"), equal_to("368-ves"))
+        assert_that(self.resolver.driverId("Max Verstapen"), none())
+
+        assert_that(self.resolver.takePending(), equal_to([
+            Alias("constructor", "Red Bull Racing Honda", "2", "fuzzy"),
+            Alias("driver", "Max Verstappen", "368-ves", "exact"),
+        ]))
+
+        self.resolver.learn([Alias("constructor", "Red Bull Racing Honda", "3", "manual", 1)])
+        assert_that(self.resolver.constructorId("Red Bull Racing Honda"), equal_to(3))
+
+        self.resolver.forget("constructor", "Red Bull Racing Honda")
+        assert_that(self.resolver.constructorId("Red Bull Racing Honda"), equal_to(2))
+        assert_that(self.resolver.takePending(), equal_to([
+            Alias("constructor", "Red Bull Racing Honda", "2", "fuzzy"),
+        ]))
+
+    def test_requeued_aliases_should_be_taken_again_once(self):
+        self.resolver.constructorId("Red Bull Racing Honda")
+        taken = self.resolver.takePending()
+
+        self.resolver.requeue(taken)
+        self.resolver.constructorId("Red Bull Racing Honda")
+
+        assert_that(self.resolver.takePending(), equal_to(taken))
+        assert_that(self.resolver.takePending(), equal_to([]))
+
+    def test_batches_should_resolve_each_distinct_name_once(self):
+        names = ["Ferrari", "Red Bull Racing", "Ferrari", "Haas F1", "Red Bull Racing", "Ferrari"]
+
+        with patch.object(self.resolver.constructors, "match", wraps=self.resolver.constructors.match) as match:
+            ids = self.resolver.constructorIds(names)
+
+        assert_that(ids, equal_to([self.resolver.constructorId(name) for name in names]))
+        assert_that(match.call_count, equal_to(3))
+
+        cells = ["Max Verstappen VER", "Lando Norris NOR", "Max Verstappen VER"]
+        assert_that(
+            self.resolver.driverIds(cells, lambda cell: cell.rsplit(" ", 1)[0]),
+            equal_to(["368-ves", None, "368-ves"]),
+        )
+        assert_that(calling(self.resolver.constructorIds).with_args(["Ferrari", "x" * 40]), raises(Exception))
@@ -0,0 +1,30 @@
+import unittest
+from unittest.mock import patch
+from hamcrest import assert_that, equal_to, calling, raises
+
+from models import Constructor, Driver, RaceResult, Result
+
+
+COLUMNS = ("position", "driverNumber", "driverName", "constructorName", "laps", "time", "points")
+ROW = ("1", "1", "Max Verstappen VER", "Red Bull Racing", "71", "1:56:48.894", "25")
+
+
+class TestResult(unittest.TestCase):
+    def test_rows_from_table_should_follow_the_field_order(self):
+        with (
+            patch.object(Driver, "getDriverIds", return_value=["368-ves"]),
+            patch.object(Constructor, "getConstructorIds", return_value=[2]),
+        ):
+            type_, rows = Result.rowsFromTable("2023_20_RACE", COLUMNS, [ROW])
+
+        assert_that(type_, equal_to(RaceResult))
+        assert_that(rows, equal_to([("2023_20_RACE", "1", "368-ves", "1", "71", 2, "25", "1:56:48.894")]))
+
+    def test_rows_from_table_should_reject_a_table_missing_a_required_column(self):
+        columns = tuple(column for column in COLUMNS if column != "laps")
+        row = tuple(cell for column, cell in zip(COLUMNS, ROW) if column != "laps")
+
+        assert_that(
+            calling(Result.rowsFromTable).with_args("2023_20_RACE", columns, [row]),
+            raises(ValueError, "no laps column"),
+        )
@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from hamcrest import assert_that, equal_to, has_entries, is_not, same_instance
+
+from scraper.Parser import Parser
+from scraper.HttpClient import HttpClient, HttpResponse
+
+
+SCHEDULE_HTML = (
+    '<div class="f1-inner-wrapper">'
+    '<a href="/en/racing/2023/bahrain"></a>'
+    '<a href="/en/racing/2023/saudi-arabia"></a>'
+    "</div>"
+)
+
+
+class SlowUpstream:
+    def __init__(self):
+        self.count = 0
+
+    async def get(self, url: str, headers: dict[str, str] = None) -> HttpResponse:
+        self.count += 1
+        await asyncio.sleep(0.01)
+
+        return HttpResponse(url, 200, SCHEDULE_HTML)
+
+
+class TestCoalescer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parser = Parser()
+        self.upstream = SlowUpstream()
+
+    def test_concurrent_callers_should_share_one_fetch(self):
+        async def scrape():
+            return await asyncio.gather(*(self.parser.getRaceUrls(2023) for _ in range(5)))
+
+        with patch.object(HttpClient, "get", new=self.upstream.get):
+            results = asyncio.run(scrape())
+
+        assert_that(self.upstream.count, equal_to(1))
+        assert_that(results[1], equal_to(results[0]))
+        assert_that(results[1], is_not(same_instance(results[0])))
+        assert_that(
+            self.parser.stats(),
+            has_entries({"objects": 5, "coalescedObjects": 4, "fetches": 1, "coalescedFetches": 0}),
+        )
+
+    def test_sequential_callers_should_not_be_coalesced(self):
+        with patch.object(HttpClient, "get", new=self.upstream.get):
+            asyncio.run(self.parser.getRaceUrls(2023))
+            asyncio.run(self.parser.getRaceUrls(2023))
+
+        assert_that(self.upstream.count, equal_to(2))
+        assert_that(self.parser.stats(), has_entries({"coalescedObjects": 0}))
@@ -12,6 +12,7 @@ from hamcrest import (
 )
 
 from scraper.Parser import Parser
+from scraper.HttpClient import HttpClient
 from tests.infrastructure.mocks import MockRequests
 from tests.infrastructure.matchers import (
     is_circuit,
@@ -20,6 +21,7 @@ from tests.infrastructure.matchers import (
     has_unique_values,
 )
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 
 
 mockRequests = MockRequests(config="tests/test_data/config/2023_config.json")
@@ -30,7 +32,7 @@ class TestParser(unittest.TestCase):
         self.parser = Parser()
         self.year = 2023
 
-    @patch("requests.get", new=mockRequests.get)
+    @patch.object(HttpClient, "get", new=mockRequests.getAsync)
     def test_get_race_should_return_all_race_urls(self):
         urls = asyncio.run(self.parser.getRaceUrls(self.year, use_cache=False))
 
@@ -45,14 +47,14 @@ class TestParser(unittest.TestCase):
             ),
         )
 
-    @patch("requests.get", new=mockRequests.get)
+    @patch.object(HttpClient, "get", new=mockRequests.getAsync)
     def test_get_circuit_should_return_circuit_info(self):
         url = "https://www.formula1.com/en/racing/2023/brazil"
         circuit = asyncio.run(self.parser.getCircuit(url))
 
         assert_that(circuit, is_circuit())
 
-    @patch("requests.get", new=mockRequests.get)
+    @patch.object(HttpClient, "get", new=mockRequests.getAsync)
     def test_get_race_should_return_race_info(self):
         url = "https://www.formula1.com/en/racing/2023/brazil"
         round_ = 4
@@ -74,7 +76,7 @@ class TestParser(unittest.TestCase):
             ),
         )
 
-    @patch("requests.get", new=mockRequests.get)
+    @patch.object(HttpClient, "get", new=mockRequests.getAsync)
     def test_get_practice_1_event_results_should_return_full_standings(self):
         url = "https://www.formula1.com/en/results/2023/races/1224/brazil/practice/1"
         eventId = "2024_10_PRACTICE_1"
@@ -105,7 +107,7 @@ class TestParser(unittest.TestCase):
             ),
         )
 
-    @patch("requests.get", new=mockRequests.get)
+    @patch.object(HttpClient, "get", new=mockRequests.getAsync)
     def test_get_qualifying_event_results_should_return_full_standings(self):
         url = "https://www.formula1.com/en/results/2023/races/1224/brazil/qualifying"
         eventId = "2024_10_QUALIFYING"
@@ -137,7 +139,7 @@ class TestParser(unittest.TestCase):
             ),
         )
 
-    @patch("requests.get", new=mockRequests.get)
+    @patch.object(HttpClient, "get", new=mockRequests.getAsync)
     def test_get_race_event_results_should_return_full_standings(self):
         url = "https://www.formula1.com/en/results/2023/races/1224/brazil/race-result"
         eventId = "2024_10_RACE"
@@ -214,3 +216,21 @@ class TestParser(unittest.TestCase):
                 ),
             ),
         )
+
+
+class TestParserLxml(TestParser):
+    """Same expectations with the lxml tree builder"""
+    def setUp(self) -> None:
+        self.parser = Parser(features="lxml")
+        self.year = 2023
+
+
+class TestParserProcessPool(TestParser):
+    """Same expectations with parsing offloaded to worker processes"""
+    def setUp(self) -> None:
+        self.executor = ProcessPoolExecutor(max_workers=2)
+        self.parser = Parser(parseExecutor=self.executor)
+        self.year = 2023
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from hamcrest import assert_that, equal_to, greater_than, less_than_or_equal_to
+
+from scraper.RateLimiter import AdaptiveConcurrencyLimit, HostLimiter
+
+
+class TestAdaptiveConcurrencyLimit(unittest.TestCase):
+    def test_limit_should_grow_additively_and_shrink_multiplicatively(self):
+        limit = AdaptiveConcurrencyLimit(initial=4, maximum=16, targetLatency=1)
+
+        for _ in range(4):
+            limit.record(0.1, ok=True)
+        assert_that(limit.limit, greater_than(4.9))
+
+        limit.record(0.1, ok=False)
+        assert_that(limit.limit, less_than_or_equal_to(2.5))
+
+        for _ in range(10):
+            limit.record(0.1, ok=False)
+        assert_that(limit.limit, equal_to(1))
+
+    def test_in_flight_requests_should_never_exceed_the_limit(self):
+        limit = AdaptiveConcurrencyLimit(initial=3, maximum=3)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            await limit.acquire()
+            peak = max(peak, limit.inFlight)
+            await asyncio.sleep(0.001)
+            limit.release()
+
+        async def run():
+            await asyncio.gather(*(request() for _ in range(30)))
+
+        asyncio.run(run())
+
+        assert_that(peak, equal_to(3))
+        assert_that(limit.inFlight, equal_to(0))
+
+
+class TestHostLimiter(unittest.TestCase):
+    def test_throttling_should_halve_the_request_rate(self):
+        limiter = HostLimiter(requestsPerSecond=8, burst=8, maxConcurrency=4, targetLatency=1)
+
+        limiter.record(0.1, ok=False, throttled=True)
+
+        assert_that(limiter.bucket.rate, equal_to(4))
+        assert_that(limiter.stats()["throttled"], equal_to(1))
@@ -0,0 +1,61 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from hamcrest import assert_that, equal_to, calling, raises
+
+from scraper.HttpClient import HttpResponse
+from scraper.ResponseArchive import ResponseArchive, RecordingClient, ReplayClient, ArchiveMissError
+
+
+class FakeClient:
+    def __init__(self, status: int = 200) -> None:
+        self.status = status
+
+    async def get(self, url, headers=None):
+        return HttpResponse(url, self.status, f"<html>{url}</html>", {"etag": '"1"'})
+
+    async def close(self):
+        pass
+
+
+class TestResponseArchive(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "archive.jsonl.gz"
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_replay_should_serve_what_was_recorded(self):
+        async def record():
+            client = RecordingClient(ResponseArchive(self.path), FakeClient())
+            await client.get("https://example.com/a")
+            await client.get("https://example.com/b")
+            await client.close()
+
+        asyncio.run(record())
+
+        replay = ReplayClient(ResponseArchive(self.path))
+        response = asyncio.run(replay.get("https://example.com/b"))
+
+        assert_that(response.text, equal_to("<html>https://example.com/b</html>"))
+        assert_that(response.headers, equal_to({"etag": '"1"'}))
+
+    def test_failed_responses_should_not_be_recorded(self):
+        async def record():
+            client = RecordingClient(ResponseArchive(self.path), FakeClient(status=404))
+            await client.get("https://example.com/a")
+            await client.close()
+
+        archive = ResponseArchive(self.path)
+        archive.append(HttpResponse("https://example.com/b", 200, ""))
+        archive.close()
+        asyncio.run(record())
+
+        replay = ReplayClient(ResponseArchive(self.path))
+
+        assert_that(
+            calling(asyncio.run).with_args(replay.get("https://example.com/a")),
+            raises(ArchiveMissError),
+        )
@@ -0,0 +1,100 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from hamcrest import assert_that, equal_to, has_entries, none
+
+from scraper.Parser import Parser
+from scraper.HttpClient import HttpClient, HttpResponse
+from scraper.ResponseCache import ResponseCache, DAY
+from scraper.PageType import PageType
+
+
+SCHEDULE_URL = "https://www.formula1.com/en/racing/2023"
+SCHEDULE_HTML = (
+    '<div class="f1-inner-wrapper">'
+    '<a href="/en/racing/2023/bahrain"></a>'
+    '<a href="/en/racing/2023/saudi-arabia"></a>'
+    "</div>"
+)
+
+
+class FakeUpstream:
+    def __init__(self):
+        self.requests: list[tuple[str, dict[str, str]]] = []
+
+    async def get(self, url: str, headers: dict[str, str] = None) -> HttpResponse:
+        headers = headers if headers else {}
+        self.requests.append((url, headers))
+
+        if headers.get("If-None-Match") == '"v1"':
+            return HttpResponse(url, 304, "")
+
+        return HttpResponse(url, 200, SCHEDULE_HTML, {"etag": '"v1"'})
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.directory.name)
+        self.upstream = FakeUpstream()
+        self.parser = Parser(cache=self.cache)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_fresh_entry_should_be_served_without_network(self):
+        with patch.object(HttpClient, "get", new=self.upstream.get):
+            first = asyncio.run(self.parser.getRaceUrls(2023))
+            second = asyncio.run(self.parser.getRaceUrls(2023))
+
+        assert_that(second, equal_to(first))
+        assert_that(len(self.upstream.requests), equal_to(1))
+
+    def test_stale_entry_should_be_revalidated_with_etag(self):
+        with patch.object(HttpClient, "get", new=self.upstream.get):
+            first = asyncio.run(self.parser.getRaceUrls(2023))
+
+            entry = self.cache.get(SCHEDULE_URL)
+            with patch("time.time", return_value=entry.storedAt - 8 * DAY):
+                self.cache.touch(entry)
+
+            second = asyncio.run(self.parser.getRaceUrls(2023))
+
+        assert_that(second, equal_to(first))
+        assert_that(len(self.upstream.requests), equal_to(2))
+        assert_that(self.upstream.requests[1][1], has_entries({"If-None-Match": '"v1"'}))
+
+    def test_use_cache_false_should_bypass_the_cache(self):
+        with patch.object(HttpClient, "get", new=self.upstream.get):
+            asyncio.run(self.parser.getRaceUrls(2023, use_cache=False))
+
+        assert_that(self.cache.get(SCHEDULE_URL), none())
+        assert_that(len(self.upstream.requests), equal_to(1))
+
+    def test_ttl_should_depend_on_page_type(self):
+        resultUrl = "https://www.formula1.com/en/results/2023/races/1224/brazil/race-result"
+
+        assert_that(self.cache.ttl(resultUrl), equal_to(ResponseCache.TTLS[PageType.RACE_RESULT]))
+        assert_that(self.cache.ttl("https://example.com"), equal_to(ResponseCache.DEFAULT_TTL))
+
+    def test_cache_files_should_be_read_and_written_off_the_event_loop(self):
+        threads = []
+
+        def recording(method):
+            def record(*args):
+                threads.append(threading.current_thread())
+                return method(*args)
+
+            return record
+
+        with (
+            patch.object(HttpClient, "get", new=self.upstream.get),
+            patch.object(self.cache, "get", new=recording(self.cache.get)),
+            patch.object(self.cache, "put", new=recording(self.cache.put)),
+        ):
+            asyncio.run(self.parser.getRaceUrls(2023))
+
+        assert_that(len(threads), equal_to(2))
+        assert_that(threading.main_thread() in threads, equal_to(False))
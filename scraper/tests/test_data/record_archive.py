@@ -0,0 +1,45 @@
+"""
+Records every page a full scrape of the given seasons fetches into a response
+archive, so the same scrape can be replayed offline with ReplayClient. Run from
+the scraper directory:
+
+    python -m tests.test_data.record_archive -y 2022 2023
+"""
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+
+from scraper import Parser, Scraper, ResponseArchive, RecordingClient
+
+ARCHIVE_PATH = "tests/test_data/archives"
+
+
+async def record(years: list[int], archivePath: Path, withResults: bool) -> None:
+    parser = Parser(client=RecordingClient(ResponseArchive(archivePath)))
+
+    # the scrape needs somewhere to write, we only care about what it fetched
+    with tempfile.TemporaryDirectory() as directory:
+        scraper = Scraper(dbPath=str(Path(directory) / "db.sqlite3"), parser=parser)
+        await scraper.db.initialize()
+
+        for year in years:
+            await scraper.saveAllRaces(year)
+            if withResults:
+                await scraper.saveAllResults(year)
+
+        await scraper.db.close()
+
+    await parser.close()
+
+
+if __name__ == "__main__":
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("-y", "--years", type=int, nargs="+", required=True)
+    argparser.add_argument("-o", "--output", type=Path, default=None)
+    argparser.add_argument("--races-only", action="store_true")
+    args = argparser.parse_args()
+
+    output = args.output if args.output else Path(ARCHIVE_PATH) / f"{'_'.join(map(str, args.years))}.jsonl.gz"
+    asyncio.run(record(args.years, output, not args.races_only))
+    print("Recorded archive", output)
@@ -0,0 +1,37 @@
+import random
+import unittest
+from hamcrest import assert_that, equal_to, none
+
+import models  # before utils, which imports it
+from utils import BKTree, Utils
+
+
+def scan(word: str, words: list[str], maxDistance: int):
+    best = None
+    for idx, candidate in enumerate(words):
+        distance = Utils.editDistance(word, candidate)
+        if distance <= maxDistance and (best is None or distance < best[1]):
+            best = (idx, distance)
+
+    return best
+
+
+class TestBKTree(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(11)
+        self.words = ["red bull", "red bull racing", "ferrari", "haas", "ferrari", "alpine"] + [
+            "".join(rng.choice("abcde ") for _ in range(rng.randint(2, 15))) for _ in range(300)
+        ]
+        self.queries = ["red bul", "ferari", "xyz", ""] + [
+            "".join(rng.choice("abcdef ") for _ in range(rng.randint(0, 15))) for _ in range(300)
+        ]
+        self.tree = BKTree(self.words)
+
+    def test_should_find_what_a_scan_finds(self):
+        for maxDistance in (0, 2, 29):
+            for query in self.queries:
+                assert_that(self.tree.closest(query, maxDistance), equal_to(scan(query, self.words, maxDistance)))
+
+    def test_repeated_word_should_keep_its_first_index(self):
+        assert_that(self.tree.closest("ferrari", 0), equal_to((2, 0)))
+        assert_that(BKTree().closest("ferrari", 5), none())
@@ -0,0 +1,57 @@
+import random
+import unittest
+from hamcrest import assert_that, equal_to
+
+import models  # before utils, which imports it
+from utils import Utils
+
+
+def matrixEditDistance(word1: str, word2: str) -> int:
+    """The full matrix version editDistance replaced, as the reference"""
+    dp = [[0] * (len(word2) + 1) for _ in range(len(word1) + 1)]
+    for i in range(len(word1) + 1):
+        dp[i][0] = i
+    for j in range(len(word2) + 1):
+        dp[0][j] = j
+
+    for i in range(1, len(word1) + 1):
+        for j in range(1, len(word2) + 1):
+            if word1[i - 1] == word2[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1]
+            else:
+                dp[i][j] = min(dp[i - 1][j - 1], dp[i - 1][j], dp[i][j - 1]) + 1
+
+    return dp[-1][-1]
+
+
+class TestEditDistance(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(7)
+        self.pairs = [
+            (
+                "".join(rng.choice("abc ") for _ in range(rng.randint(0, 70))),
+                "".join(rng.choice("abcd") for _ in range(rng.randint(0, 70))),
+            )
+            for _ in range(500)
+        ] + [("", ""), ("red bull racing", "Red Bull Racing Honda RBPT"), ("kitten", "sitting")]
+
+    def test_should_match_the_full_matrix(self):
+        for word1, word2 in self.pairs:
+            assert_that(Utils.editDistance(word1, word2), equal_to(matrixEditDistance(word1, word2)))
+
+    def test_bounded_distance_should_be_exact_up_to_the_bound(self):
+        for maxDistance in (0, 3, 20):
+            for word1, word2 in self.pairs:
+                assert_that(
+                    Utils.editDistance(word1, word2, maxDistance),
+                    equal_to(min(matrixEditDistance(word1, word2), maxDistance + 1)),
+                )
+
+    def test_batch_should_match_one_by_one(self):
+        word = self.pairs[0][0]
+        candidates = [word2 for _, word2 in self.pairs]
+
+        assert_that(
+            Utils.editDistances(word, candidates, 10),
+            equal_to([Utils.editDistance(word, candidate, 10) for candidate in candidates]),
+        )
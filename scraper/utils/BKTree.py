@@ -0,0 +1,81 @@
+from typing import Iterable, List, Tuple
+
+from . import Utils
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over words under edit distance: each child hangs off its parent
+    at its distance to the parent word, so the triangle inequality rules out whole
+    subtrees whose distance doesn't fall within the search radius of the word's distance
+    to the parent. Words keep the index they were added with, and a repeated word keeps
+    its first index
+    """
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        # a node is [word, index, {distance: child}]
+        self.root: list = None
+        self.size = 0
+
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> int:
+        """Adds word with the next index and returns the index"""
+        index = self.size
+        self.size += 1
+
+        if self.root is None:
+            self.root = [word, index, {}]
+            return index
+
+        node = self.root
+        while True:
+            distance = Utils.editDistance(word, node[0])
+            if distance == 0:
+                return index
+
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [word, index, {}]
+                return index
+
+            node = child
+
+    def closest(self, word: str, maxDistance: int) -> Tuple[int, int]:
+        """
+        (index, distance) of the closest word within maxDistance, the one added first among
+        equally close words, exactly what a scan over the words in order finds, or None
+        """
+        if self.root is None:
+            return None
+
+        best: Tuple[int, int] = None
+        radius = maxDistance
+        # nodes with a lower bound of their distance to word, from the triangle inequality
+        stack: List[Tuple[list, int]] = [(self.root, 0)]
+
+        while stack:
+            node, lowerBound = stack.pop()
+            # the radius may have shrunk since the node was pushed
+            if lowerBound > radius:
+                continue
+
+            children = node[2]
+            # exact up to the farthest child, which is all the pruning needs
+            bound = radius + max(children, default=0)
+            distance = Utils.editDistance(word, node[0], bound)
+
+            if distance <= radius and (best is None or (distance, node[1]) < (best[1], best[0])):
+                best = (node[1], distance)
+                # ties stay in, an earlier word at the same distance may still turn up
+                radius = distance
+
+            if distance > bound:
+                continue
+
+            # nearest distances last, so they are popped first and shrink the radius early
+            for key in sorted(children, key=lambda key: -abs(key - distance)):
+                if abs(key - distance) <= radius:
+                    stack.append((children[key], abs(key - distance)))
+
+        return best
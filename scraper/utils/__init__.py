@@ -10,29 +10,75 @@ from models import BaseModel
 
 class Utils:
     @staticmethod
-    def editDistance(word1: str, word2: str) -> int:
+    def editDistance(word1: str, word2: str, maxDistance: int = None) -> int:
         '''
-        Calculates the minimum number of operations required to convert word1 to word2
+        Calculates the minimum number of operations required to convert word1 to word2.
+        With maxDistance, any distance above it comes back as maxDistance + 1, which lets
+        the comparison stop as soon as it can no longer end up within maxDistance
         '''
-        m = len(word1)
-        n = len(word2)
-
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-
-        for i in range(1, m + 1):
-            dp[i][0] = i
-
-        for j in range(1, n + 1):
-            dp[0][j] = j
+        return Utils.editDistances(word1, [word2], maxDistance)[0]
+    
+    @staticmethod
+    def editDistances(word: str, candidates: list[str], maxDistance: int = None) -> list[int]:
+        '''
+        editDistance from word to each candidate. Uses Myers' bit-parallel algorithm, a
+        column of the distance matrix is a pair of bit vectors updated in a few integer
+        operations per character, with word's character masks built once for every candidate
+        '''
+        m = len(word)
+        if m == 0:
+            return [
+                len(candidate) if maxDistance is None else min(len(candidate), maxDistance + 1)
+                for candidate in candidates
+            ]
         
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if word1[i - 1] == word2[j - 1]:
-                    dp[i][j] = dp[i - 1][j - 1]
-                else:
-                    dp[i][j] = min(dp[i - 1][j - 1], dp[i - 1][j], dp[i][j - 1]) + 1
-
-        return dp[m][n]
+        full = (1 << m) - 1
+        last = 1 << (m - 1)
+        # bit i of masks[c] is set where word[i] == c
+        masks: dict[str, int] = {}
+        for i, char in enumerate(word):
+            masks[char] = masks.get(char, 0) | (1 << i)
+        
+        # no bound is the same as a bound nothing can exceed
+        bound = maxDistance if maxDistance is not None else m + max(map(len, candidates), default=0)
+        
+        distances = []
+        for candidate in candidates:
+            n = len(candidate)
+            if abs(m - n) > bound:
+                distances.append(bound + 1)
+                continue
+            
+            # vertical deltas between rows of the current column, all +1 in column 0
+            positive, negative = full, 0
+            score = m
+            remaining = n
+            for char in candidate:
+                remaining -= 1
+                eq = masks.get(char, 0)
+                xv = eq | negative
+                xh = (((eq & positive) + positive) ^ positive) | eq
+                horizontalPositive = negative | (~(xh | positive) & full)
+                horizontalNegative = positive & xh
+                
+                if horizontalPositive & last:
+                    score += 1
+                elif horizontalNegative & last:
+                    score -= 1
+                
+                # each remaining character lowers the distance by one at most
+                if score - remaining > bound:
+                    score = bound + 1
+                    break
+                
+                # the row above the word always grows by one per column
+                horizontalPositive = ((horizontalPositive << 1) | 1) & full
+                positive = ((horizontalNegative << 1) & full) | (~(xv | horizontalPositive) & full)
+                negative = horizontalPositive & xv
+            
+            distances.append(min(score, bound + 1))
+            
+        return distances
     
     @staticmethod
     def topologicalSort(graph: dict[str, list[str]]) -> list[str]:
@@ -97,4 +143,6 @@ class Utils:
         shortName = name[-1]
         name = " ".join(name[:-1])
         
-        return name, shortName
\ No newline at end of file
+        return name, shortName
+
+from .BKTree import BKTree